@@ -0,0 +1,126 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import json
+import timeit
+from datetime import datetime
+
+import falcon
+from falcon.testing import create_environ
+from marshmallow import Schema, fields
+from peewee import CharField, DateTimeField, Model, SqliteDatabase
+
+from wrf.api.base import BaseAPI
+from wrf.framework.falcon import FalconFrameworkComponent
+from wrf.orm.peewee import PeeweeORMComponent
+from wrf.pagination.base import PagePaginationComponent
+from wrf.permission.base import AllowAuthenticatedPermissionComponent
+from wrf.schema.marshmallow import MarshmallowSchemaComponent
+
+db = SqliteDatabase(':memory:')
+
+
+class User(Model):
+    created = DateTimeField(default=datetime.now)
+    first_name = CharField()
+    last_name = CharField()
+
+    class Meta:
+        database = db
+
+
+class UserSchema(Schema):
+    first_name = fields.String(required=True)
+    last_name = fields.String(required=True)
+
+    class Meta:
+        dump_only = ('id', 'created')
+        fields = dump_only + ('first_name', 'last_name')
+
+
+class BenchAPI(BaseAPI):
+    orm_component_class = PeeweeORMComponent
+    schema_component_class = MarshmallowSchemaComponent
+    framework_component_class = FalconFrameworkComponent
+    pagination_component_class = PagePaginationComponent
+    permission_component_class = AllowAuthenticatedPermissionComponent
+
+    model_class = User
+    schema_class = UserSchema
+
+    def get_current_user(self):
+        return {'name': 'Benchmark'}
+
+    def get_queryset(self):
+        return User.select()
+
+
+def setup_database(rows=1000):
+    db.connect(reuse_if_open=True)
+    db.drop_tables([User])
+    db.create_tables([User])
+    with db.atomic():
+        User.insert_many([{'first_name': 'First {}'.format(i), 'last_name': 'Last {}'.format(i)} for i in range(rows)]).execute()
+
+
+def request_factory(method='GET', path='/', query_string='', body=None):
+    '''
+    Returns a callable building fresh `(request, response)` pairs. The WSGI environ is built only once, as
+    `create_environ` alone is way slower than what is being measured here.
+    '''
+    body = json.dumps(body).encode('utf-8') if body is not None else b''
+    environ = create_environ(method=method, path=path, query_string=query_string, headers={'Content-Type': 'application/json'})
+    environ['CONTENT_LENGTH'] = str(len(body))
+    response_options = falcon.ResponseOptions()  # Its constructor reloads the mimetypes database: build it only once.
+
+    def make_request():
+        request_environ = dict(environ, **{'wsgi.input': io.BytesIO(body)})
+        return falcon.Request(request_environ), falcon.Response(options=response_options)
+
+    return make_request
+
+
+def measure(func, number=1000, repeat=5):
+    '''
+    Returns the best time (in microseconds) taken by a single `func()` call.
+    '''
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def report(title, results):
+    print(title)
+    for name, value in results:
+        print('  {:<40} {:>10.2f} us'.format(name, value))
+
+
+def save_results(path, results):
+    '''
+    Saves `(name, microseconds)` results as a JSON object, to be compared with later runs (see `compare_results`).
+    '''
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'unit': 'us', 'results': dict(results)}, indent=2, sort_keys=True))
+
+
+def load_results(path):
+    with io.open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare_results(baseline, results, tolerance=1.2):
+    '''
+    Prints how `results` compare to the `baseline` ones, and returns the names of the benchmarks slower than
+    `tolerance` times their baseline.
+    '''
+    regressions = []
+    print('Compared to baseline (tolerance: {:.0%} slower)'.format(tolerance - 1))
+    for name, value in results:
+        if name not in baseline:
+            print('  {:<40} {:>10} (new)'.format(name, ''))
+            continue
+        ratio = value / baseline[name]
+        flag = ''
+        if ratio > tolerance:
+            regressions.append(name)
+            flag = '  <- slower'
+        print('  {:<40} {:>9.2f}x{}'.format(name, ratio, flag))
+    return regressions
@@ -0,0 +1,151 @@
+'''
+Cost of each component method, measured in isolation (on in-memory SQLite data), to tell whether a change makes the hot
+paths of a request slower.
+
+Results can be saved as JSON and compared with a previous run, e.g.:
+
+    python -m benchmarks.components --save baseline.json
+    (upgrade or change wrf)
+    python -m benchmarks.components --compare baseline.json
+
+When comparing, the exit status is 1 if any benchmark got slower than the given tolerance (20% by default).
+
+Usage: python -m benchmarks.components [--save PATH] [--compare PATH] [--tolerance RATIO] [--filter TEXT]
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import sys
+
+import falcon
+from chalice.app import Request as ChaliceRequest
+from django.conf import settings
+from pyramid.testing import DummyRequest
+
+from wrf.base import Context
+from wrf.framework.chalice import ChaliceFrameworkComponent
+from wrf.framework.django import DjangoFrameworkComponent
+from wrf.framework.falcon import FalconFrameworkComponent
+from wrf.framework.flask import FlaskFrameworkComponent
+from wrf.framework.pyramid import PyramidFrameworkComponent
+from wrf.schema.compiled import CompiledSchemaComponent
+
+from .common import BenchAPI, User, compare_results, load_results, measure, report, request_factory, save_results, setup_database
+
+if not settings.configured:
+    settings.configure()  # `HttpResponse` needs settings (just the defaults).
+
+
+def init_api(make_request, api_method_name='list'):
+    api = BenchAPI(*make_request())
+    api.init_context(api_method_name)
+    return api
+
+
+def orchestration_benchmarks():
+    make_request = request_factory()
+
+    def init_context():
+        BenchAPI(*make_request()).init_context('list')
+
+    api = init_api(make_request)
+
+    def check_permission():
+        api.permission_component.check_permission()
+
+    instance = User.get_by_id(1)
+
+    def check_permission_instance():
+        api.permission_component.check_permission(instance)
+
+    yield 'api.init_context', init_context, 20000
+    yield 'permission.check_permission', check_permission, 100000
+    yield 'permission.check_permission(instance)', check_permission_instance, 100000
+
+
+def orm_benchmarks():
+    orm = init_api(request_factory()).orm_component
+    queryset = User.select()
+
+    def get_object_once():
+        orm.clear_identity_map()
+        orm.get_object(queryset, 500)
+
+    yield 'orm.get_object', lambda: orm.get_object(queryset, 500), 2000
+    yield 'orm.get_object (first fetch)', get_object_once, 2000
+    yield 'orm.fetch_object', lambda: orm.fetch_object(queryset, 500), 2000
+    yield 'orm.count_queryset', lambda: orm.count_queryset(queryset), 2000
+
+
+def schema_benchmarks():
+    api = init_api(request_factory())
+    schema = api.schema_component
+    compiled_schema = CompiledSchemaComponent(api.context)
+    instances = list(User.select().limit(100))
+    data = {'first_name': 'Filipe', 'last_name': 'Waitman'}
+
+    yield 'schema.serialize', lambda: schema.serialize(instances[0]), 10000
+    yield 'schema.serialize(100 rows)', lambda: schema.serialize(instances, many=True), 200
+    yield 'schema.deserialize', lambda: schema.deserialize(data), 10000
+    yield 'compiled_schema.serialize', lambda: compiled_schema.serialize(instances[0]), 10000
+    yield 'compiled_schema.serialize(100 rows)', lambda: compiled_schema.serialize(instances, many=True), 200
+
+
+def pagination_benchmarks():
+    make_request = request_factory(query_string='page=3&per_page=20')
+
+    def paginate():
+        api = init_api(make_request)
+        api.pagination_component.paginate(api.schema_component, api.get_queryset())
+
+    yield 'pagination.paginate(20 of 1000 rows)', paginate, 500
+
+
+def framework_benchmarks():
+    data = {'count': 2, 'results': [{'id': i, 'first_name': 'First', 'last_name': 'Last', 'created': None} for i in range(20)]}
+    falcon_response_options = falcon.ResponseOptions()
+    chalice_request = ChaliceRequest({}, {}, {}, 'GET', b'', {}, {}, False)
+
+    def context(request=None, response=None):
+        return Context({'request': request, 'response': response})
+
+    components = [
+        ('chalice', lambda: ChaliceFrameworkComponent(context(chalice_request)).create_response(data, 200)),
+        ('django', lambda: DjangoFrameworkComponent(context()).create_response(data, 200)),
+        ('falcon', lambda: FalconFrameworkComponent(
+            context(response=falcon.Response(options=falcon_response_options))).create_response(data, 200)),
+        ('flask', lambda: FlaskFrameworkComponent(context()).create_response(data, 200)),
+        ('pyramid', lambda: PyramidFrameworkComponent(context(DummyRequest())).create_response(data, 200)),
+    ]
+    for name, func in components:
+        yield 'framework.create_response({})'.format(name), func, 2000
+
+
+BENCHMARKS = (orchestration_benchmarks, orm_benchmarks, schema_benchmarks, pagination_benchmarks, framework_benchmarks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--save', metavar='PATH', help='save the results (as JSON) to PATH')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results with the ones saved to PATH')
+    parser.add_argument('--tolerance', type=float, default=1.2, help='slowdown ratio tolerated when comparing')
+    parser.add_argument('--filter', default='', help='only run the benchmarks whose name contains this')
+    args = parser.parse_args(argv)
+
+    setup_database(rows=1000)
+    results = []
+    for benchmarks in BENCHMARKS:
+        for name, func, number in benchmarks():
+            if args.filter in name:
+                results.append((name, measure(func, number=number)))
+
+    report('Component methods', results)
+    if args.save:
+        save_results(args.save, results)
+    if args.compare:
+        return 1 if compare_results(load_results(args.compare), results, args.tolerance) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+'''
+Per-request overhead of building components on demand (current behavior) versus eagerly building all of them.
+
+Two numbers are reported for each method: the orchestration cost alone (context initialization plus the components the
+method actually uses) and the full request, which is dominated by the database and thus much noisier.
+
+Usage: python -m benchmarks.lazy_components
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from wrf.api.base import COMPONENT_NAMES
+
+from .common import BenchAPI, db, measure, report, request_factory, setup_database
+
+USED_COMPONENTS = {
+    'retrieve': ('orm', 'permission', 'schema', 'framework'),
+    'delete': ('orm', 'permission', 'framework'),
+}
+
+
+class EagerAPI(BenchAPI):
+    def pre_request(self):
+        # Mimics the former `init_context`, which built every component no matter what.
+        for name in COMPONENT_NAMES:
+            getattr(self, '{}_component'.format(name))
+
+
+def main():
+    setup_database(rows=10)
+    make_request = request_factory()
+
+    def orchestration(api_class, method):
+        def call():
+            api = api_class(*make_request())
+            api.init_context(method)
+            api.pre_request()
+            for name in USED_COMPONENTS[method]:
+                getattr(api, '{}_component'.format(name))
+        return call
+
+    def full_request(api_class, method):
+        def call():
+            request, response = make_request()
+            with db.atomic() as transaction:
+                getattr(api_class(request, response), method)(1)
+                transaction.rollback()
+        return call
+
+    results = []
+    for method in ('retrieve', 'delete'):
+        eager = measure(orchestration(EagerAPI, method), number=20000)
+        lazy = measure(orchestration(BenchAPI, method), number=20000)
+        results.append(('{} orchestration (eager)'.format(method), eager))
+        results.append(('{} orchestration (lazy)'.format(method), lazy))
+        results.append(('{} full request (eager)'.format(method), measure(full_request(EagerAPI, method))))
+        results.append(('{} full request (lazy)'.format(method), measure(full_request(BenchAPI, method))))
+
+    report('Lazy component construction', results)
+
+
+if __name__ == '__main__':
+    main()
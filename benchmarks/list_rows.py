@@ -0,0 +1,108 @@
+'''
+Gain of listing plain rows (`BaseAPI.list_rows`) instead of model instances, for each ORM (on in-memory SQLite data).
+
+Usage: python -m benchmarks.list_rows
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from datetime import datetime
+from functools import partial
+
+import django
+from django.conf import settings
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from wrf.orm.sqlalchemy import SQLAlchemyORMComponent
+from wrf.schema.compiled import CompiledSchemaComponent
+
+from .common import BenchAPI, measure, report, request_factory, setup_database
+
+if not settings.configured:
+    settings.configure(DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}})
+    django.setup()
+
+from django.db import connection, models  # noqa  # isort:skip
+
+from wrf.orm.django import DjangoORMComponent  # noqa  # isort:skip
+
+ROWS = 1000
+
+MODES = (
+    ('instances', {}),
+    ('rows', {'list_rows': True}),
+    ('compiled rows', {'list_rows': True, 'schema_component_class': CompiledSchemaComponent}),
+)
+
+Base = declarative_base()
+engine = create_engine('sqlite://')
+session = sessionmaker(bind=engine)()
+
+
+class SQLAlchemyUser(Base):
+    __tablename__ = 'user'
+
+    id = Column(Integer, primary_key=True)
+    created = Column(DateTime, default=datetime.now)
+    first_name = Column(String)
+    last_name = Column(String)
+
+
+class DjangoUser(models.Model):
+    created = models.DateTimeField(default=datetime.now)
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = 'benchmarks'
+
+
+class SQLAlchemyBenchAPI(BenchAPI):
+    orm_component_class = partial(SQLAlchemyORMComponent, session=session)
+    model_class = SQLAlchemyUser
+
+    def get_queryset(self):
+        return session.query(SQLAlchemyUser).order_by(SQLAlchemyUser.id)
+
+
+class DjangoBenchAPI(BenchAPI):
+    orm_component_class = DjangoORMComponent
+    model_class = DjangoUser
+
+    def get_queryset(self):
+        return DjangoUser.objects.order_by('id')
+
+
+def setup_sqlalchemy():
+    Base.metadata.create_all(engine)
+    session.add_all(SQLAlchemyUser(first_name='First {}'.format(i), last_name='Last {}'.format(i)) for i in range(ROWS))
+    session.commit()
+
+
+def setup_django():
+    with connection.schema_editor() as schema_editor:
+        schema_editor.create_model(DjangoUser)
+    DjangoUser.objects.bulk_create(
+        [DjangoUser(first_name='First {}'.format(i), last_name='Last {}'.format(i)) for i in range(ROWS)])
+
+
+def main():
+    setup_database(rows=ROWS)
+    setup_sqlalchemy()
+    setup_django()
+    results = []
+
+    for orm_name, api_class in (('peewee', BenchAPI), ('sqlalchemy', SQLAlchemyBenchAPI), ('django', DjangoBenchAPI)):
+        for per_page in (100, 1000):
+            make_request = request_factory(query_string='per_page={}'.format(per_page))
+            for mode, attributes in MODES:
+                mode_api_class = type(api_class.__name__, (api_class,), attributes)
+                timing = measure(lambda: mode_api_class(*make_request()).list(), number=max(5, 2000 // per_page))
+                results.append(('{} {} rows ({})'.format(orm_name, per_page, mode), timing))
+
+    report('Listing rows instead of instances', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+'''
+Gain of reusing schema instances (`SchemaCache`) when serializing list endpoints.
+
+Usage: python -m benchmarks.schema_cache
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from wrf.schema.marshmallow import MarshmallowSchemaComponent
+
+from .common import BenchAPI, User, UserSchema, measure, report, request_factory, setup_database
+
+
+class UncachedSchemaComponent(MarshmallowSchemaComponent):
+    schema_cache = None
+
+
+class UncachedBenchAPI(BenchAPI):
+    schema_component_class = UncachedSchemaComponent
+
+
+def main():
+    setup_database(rows=1000)
+    context = {'schema_class': UserSchema}
+    results = []
+
+    for rows in (1, 100, 500):
+        instances = list(User.select().limit(rows))
+        for name, component_class in (('uncached', UncachedSchemaComponent), ('cached', MarshmallowSchemaComponent)):
+            component = component_class(context)
+            timing = measure(lambda: component.serialize(instances, many=True), number=max(10, 2000 // rows))
+            results.append(('serialize {} rows ({})'.format(rows, name), timing))
+
+    make_request = request_factory(query_string='per_page=500')
+    for name, api_class in (('uncached', UncachedBenchAPI), ('cached', BenchAPI)):
+        timing = measure(lambda: api_class(*make_request()).list(), number=20)
+        results.append(('list endpoint, 500 rows ({})'.format(name), timing))
+
+    report('Schema instance cache', results)
+
+
+if __name__ == '__main__':
+    main()
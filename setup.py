@@ -1,5 +1,3 @@
-import sys
-
 from setuptools import find_packages, setup
 
 from wrf import VERSION
@@ -8,16 +6,8 @@ BASE_CVS_URL = 'https://github.com/filwaitman/whatever-rest-framework'
 
 
 def get_tests_require():
-    django_1x_version = 'Django==1.11.23'
-    django_2x_version = 'Django==2.2.3'
-    lines = [x.strip().split(' ;')[0] for x in open('requirements_test.txt').readlines() if x]
-
-    if sys.version_info.major < 3:
-        lines.remove(django_2x_version)
-    else:
-        lines.remove(django_1x_version)
-
-    return lines
+    # Environment markers (e.g. `Django==2.2.3 ; python_version >= '3.0'`) are left for setuptools to evaluate
+    return [x.strip() for x in open('requirements_test.txt').readlines() if x.strip()]
 
 
 setup(
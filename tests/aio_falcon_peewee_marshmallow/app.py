@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from marshmallow import Schema, fields, validate
+from peewee import CharField, DateTimeField, Model, SqliteDatabase
+
+from wrf.api.aio import AsyncBaseAPI, async_api_view
+from wrf.framework.falcon import FalconFrameworkComponent
+from wrf.orm.peewee import PeeweeORMComponent
+from wrf.pagination.base import PagePaginationComponent
+from wrf.permission.base import AllowAuthenticatedPermissionComponent
+from wrf.schema.marshmallow import MarshmallowSchemaComponent
+
+# ORM calls run in executor threads: a shared-cache in-memory database is visible from all of them.
+db = SqliteDatabase('file:wrf_aio?mode=memory&cache=shared', uri=True)
+
+
+class UserSchema(Schema):
+    first_name = fields.String(required=True, validate=validate.Length(1))
+    last_name = fields.String(required=True, validate=validate.Length(1))
+
+    class Meta:
+        dump_only = ('id', 'created')
+        fields = dump_only + ('first_name', 'last_name')
+
+
+class User(Model):
+    created = DateTimeField(default=datetime.now)
+    first_name = CharField()
+    last_name = CharField()
+
+    class Meta:
+        database = db
+
+
+class MyBaseAPI(AsyncBaseAPI):
+    orm_component_class = PeeweeORMComponent
+    schema_component_class = MarshmallowSchemaComponent
+    framework_component_class = FalconFrameworkComponent
+    pagination_component_class = PagePaginationComponent
+    permission_component_class = AllowAuthenticatedPermissionComponent
+
+    def get_current_user(self):
+        return {'name': 'Filipe'}
+
+
+class UserAPI(MyBaseAPI):
+    model_class = User
+    schema_class = UserSchema
+
+    def get_queryset(self):
+        return User.select()
+
+    @async_api_view()
+    async def doublename(self, pk):
+        instance = await self.call_orm('get_object', self.get_queryset(), pk)
+        self.check_permissions(instance)
+        data = {'doubled': instance.first_name * 2}
+        return self.framework_component.create_response(data, 200)
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import threading
+
+import falcon
+import pytest
+from falcon.testing import create_environ
+
+from wrf.base import Context
+from wrf.orm.aio import BaseAsyncORMComponent
+from wrf.orm.peewee import PeeweeORMComponent
+from wrf.permission.base import AllowAuthenticatedPermissionComponent
+
+from .app import MyBaseAPI, User, UserAPI, db
+
+
+@pytest.fixture(autouse=True)
+def _setup():
+    db.connect(reuse_if_open=True)  # Keeps the shared in-memory database alive.
+    db.drop_tables([User])
+    db.create_tables([User])
+    yield
+    db.close()
+
+
+def _create_user(**data):
+    return User.create(**data)
+
+
+def _call(method_name, *args, **kwargs):
+    request = falcon.Request(create_environ(
+        method=kwargs.pop('method', 'GET'),
+        query_string=kwargs.pop('query_string', ''),
+        body=json.dumps(kwargs.pop('data', {})),
+        headers={'Content-Type': 'application/json'},
+    ))
+    response = falcon.Response()
+    coroutine = getattr(UserAPI(request, response=response), method_name)(*args)
+    asyncio.get_event_loop().run_until_complete(coroutine)
+    return response
+
+
+def test_list_users():
+    _create_user(first_name='Filipe', last_name='Waitman')
+    _create_user(first_name='John', last_name='Doe')
+
+    response = _call('list', query_string='per_page=1')
+    assert response.status == falcon.HTTP_200
+    assert response.media['count'] == 2
+    assert response.media['next_page'] is not None
+    assert response.media['results'][0]['first_name'] == 'Filipe'
+
+
+def test_create():
+    response = _call('create', method='POST', data={'first_name': 'Filipe', 'last_name': 'Waitman'})
+    assert response.status == falcon.HTTP_201
+    assert response.media['first_name'] == 'Filipe'
+    assert User.select().where(User.id == response.media['id']).count() == 1
+
+
+def test_create_errors():
+    response = _call('create', method='POST', data={'first_name': 'Filipe'})
+    assert response.status == falcon.HTTP_400
+    assert response.media == {'last_name': ['Missing data for required field.'], 'status_code': 400}
+
+
+def test_retrieve(mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    check_permission = mocker.spy(AllowAuthenticatedPermissionComponent, 'check_permission')
+
+    response = _call('retrieve', user.id)
+    assert response.status == falcon.HTTP_200
+    assert response.media['first_name'] == 'Filipe'
+    assert check_permission.call_count == 1
+
+    response = _call('retrieve', 999)
+    assert response.status == falcon.HTTP_404
+
+
+def test_update():
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    response = _call('update', user.id, method='PATCH', data={'last_name': 'New'})
+    assert response.status == falcon.HTTP_200
+    assert response.media['last_name'] == 'New'
+    assert User.get_by_id(user.id).last_name == 'New'
+
+
+def test_delete():
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    response = _call('delete', user.id, method='DELETE')
+    assert response.status == falcon.HTTP_204
+    assert User.select().where(User.id == user.id).count() == 0
+
+
+def test_bulk_update():
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    john = _create_user(first_name='John', last_name='Doe')
+
+    data = [{'pk': filipe.id, 'fields': {'last_name': 'New'}}, {'pk': john.id, 'fields': {'last_name': 'New'}}]
+    response = _call('bulk_update', method='PATCH', data=data)
+    assert response.status == falcon.HTTP_200
+    assert response.media == {'updated': 2}
+    assert [user.last_name for user in User.select()] == ['New', 'New']
+
+    response = _call('bulk_update', method='PATCH', data=[{'pk': filipe.id, 'fields': {'last_name': ''}}])
+    assert response.status == falcon.HTTP_400
+
+
+def test_bulk_delete(mocker):
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    _create_user(first_name='John', last_name='Doe')
+    _create_user(first_name='Jane', last_name='Doe')
+
+    response = _call('bulk_delete', method='DELETE', data=[filipe.id, 9999])
+    assert response.status == falcon.HTTP_200
+    assert response.media == {'deleted': 1}
+
+    # Rows are fetched (off the event loop) for permissions that look at them
+    mocker.patch.object(AllowAuthenticatedPermissionComponent, 'instance_dependent', True)
+    check_permissions = mocker.spy(AllowAuthenticatedPermissionComponent, 'check_permissions')
+    response = _call('bulk_delete', method='DELETE', data={'filter': {'last_name': 'Doe'}})
+    assert response.status == falcon.HTTP_200
+    assert response.media == {'deleted': 2}
+    assert sorted(user.first_name for user in check_permissions.call_args[0][1]) == ['Jane', 'John']
+    assert User.select().count() == 0
+
+
+def test_bulk_views_are_coroutines():
+    request = falcon.Request(create_environ(method='DELETE', body='[]', headers={'Content-Type': 'application/json'}))
+    for method_name in ('bulk_update', 'bulk_delete'):
+        coroutine = getattr(UserAPI(request, response=falcon.Response()), method_name)()
+        assert asyncio.iscoroutine(coroutine)
+        asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def test_permissions(mocker):
+    mocker.patch.object(MyBaseAPI, 'get_current_user', return_value=None)
+    response = _call('list')
+    assert response.status == falcon.HTTP_401
+
+
+def test_custom_view():
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    response = _call('doublename', user.id)
+    assert response.status == falcon.HTTP_200
+    assert response.media == {'doubled': 'FilipeFilipe'}
+
+
+def test_sync_orm_runs_in_executor(mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    threads = []
+    get_object = PeeweeORMComponent.get_object
+
+    def _get_object(self, queryset, pk):
+        threads.append(threading.current_thread())
+        return get_object(self, queryset, pk)
+
+    mocker.patch.object(PeeweeORMComponent, 'get_object', _get_object)
+    response = _call('retrieve', user.id)
+    assert response.status == falcon.HTTP_200
+    assert len(threads) == 1
+    assert threads[0] is not threading.current_thread()
+
+
+def test_sync_orm_runs_in_a_single_thread_per_request(mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    threads = []
+
+    def record_thread(method_name):
+        method = getattr(PeeweeORMComponent, method_name)
+
+        def _method(self, *args, **kwargs):
+            threads.append(threading.current_thread())
+            return method(self, *args, **kwargs)
+        mocker.patch.object(PeeweeORMComponent, method_name, _method)
+
+    record_thread('get_object')
+    record_thread('update_object')
+    mocker.patch.object(AllowAuthenticatedPermissionComponent, 'instance_dependent', True)
+    shutdown_executor = mocker.spy(UserAPI, 'shutdown_executor')
+
+    response = _call('update', user.id, method='PATCH', data={'last_name': 'Doe'})
+    assert response.status == falcon.HTTP_200
+    assert len(threads) == 2
+    assert threads[0] is threads[1] is not threading.current_thread()
+    assert shutdown_executor.call_count == 1
+
+
+def test_concurrent_requests():
+    users = [_create_user(first_name='User {}'.format(i), last_name='Doe') for i in range(20)]
+
+    async def retrieve(pk):
+        request = falcon.Request(create_environ())
+        response = falcon.Response()
+        await UserAPI(request, response=response).retrieve(pk)
+        return response
+
+    coroutines = [retrieve(user.id) for user in users]
+    responses = asyncio.get_event_loop().run_until_complete(asyncio.gather(*coroutines))
+    assert [response.media['first_name'] for response in responses] == [user.first_name for user in users]
+
+
+def test_async_identity_map():
+    fetched = []
+
+    class AsyncORMComponent(BaseAsyncORMComponent):
+        def get_queryset_key(self, queryset):
+            return queryset
+
+        async def fetch_object(self, queryset, pk):
+            fetched.append(pk)
+            return object()
+
+        async def delete_object(self, instance):
+            self.clear_identity_map()
+
+    async def use(orm):
+        instance = await orm.get_object('all', 1)
+        assert await orm.get_object('all', 1) is instance
+        assert await orm.get_object('filtered', 1) is not instance
+        await orm.delete_object(instance)
+        assert await orm.get_object('all', 1) is not instance
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(use(AsyncORMComponent(Context({'model_class': User}))))
+    assert fetched == [1, 1, 1]
+
+    orm = AsyncORMComponent(Context({'model_class': User}), identity_map=False)
+    loop.run_until_complete(asyncio.gather(orm.get_object('all', 1), orm.get_object('all', 1)))
+    assert fetched == [1, 1, 1, 1, 1]
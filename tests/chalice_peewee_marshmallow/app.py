@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import partial
 
 from chalice import Chalice
 from marshmallow import Schema, fields, validate
@@ -53,6 +54,7 @@ class MyBaseAPI(BaseAPI):
 class UserAPI(MyBaseAPI):
     model_class = User
     schema_class = UserSchema
+    dynamic_components = ('pagination',)
 
     def get_queryset(self):
         return User.select()
@@ -91,6 +93,10 @@ class UserAPI(MyBaseAPI):
     def list_nopagination(self):
         return self._list()
 
+    @api_view(pagination_component_class=partial(NoPaginationComponent, stream=True, chunk_size=2))
+    def list_streaming(self):
+        return self._list()
+
     def get_pagination_component_class(self, api_method_name):
         if self.request.query_params.get('paginate') == 'f':
             return NoPaginationComponent
@@ -153,6 +159,12 @@ def no_pagination_list():
     return UserAPI(app.current_request).list_nopagination()
 
 
+@app.route('/api/users/streaming', methods=['GET'])
+def streaming_list():
+    db.create_tables([User])
+    return UserAPI(app.current_request).list_streaming()
+
+
 @app.route('/api/users/exception/handled', methods=['GET'])
 def handled_exception_list():
     db.create_tables([User])
@@ -260,6 +260,18 @@ def test_no_pagination_list_via_query_params():
     assert response.json[0]['last_name'] == 'Waitman'
 
 
+def test_streaming_list():
+    # Chalice does not support streaming: the whole list is sent at once.
+    for first_name in ('Filipe', 'John', 'Jane'):
+        _create_user(first_name=first_name, last_name='Doe')
+
+    response = _get_response('GET', '/api/users/streaming')
+    assert response.status_code == 200
+    assert [item['first_name'] for item in response.json] == ['Filipe', 'John', 'Jane']
+    assert 'id' in response.json[0]
+    assert 'created' in response.json[0]
+
+
 def test_exception_behavior():
     response = _get_response('GET', '/api/users/exception/handled')
     assert response.status_code == 499
@@ -0,0 +1,11 @@
+import sys
+
+collect_ignore = []
+
+if sys.version_info < (3, 5):
+    # Async/await syntax
+    collect_ignore.extend([
+        'aio_falcon_peewee_marshmallow',
+        'django_django_marshmallow/test_orm_aio.py',
+        'flask_sqlalchemy_marshmallow/test_orm_aio.py',
+    ])
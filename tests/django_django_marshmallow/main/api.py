@@ -6,12 +6,12 @@ from wrf.api.base import BaseAPI, api_view
 from wrf.base import APIError
 from wrf.framework.django import DjangoFrameworkComponent
 from wrf.orm.django import DjangoORMComponent
-from wrf.pagination.base import NoPaginationComponent, PagePaginationComponent
+from wrf.pagination.base import CursorPaginationComponent, NoPaginationComponent, PagePaginationComponent
 from wrf.permission.base import AllowAllPermissionComponent, AllowAuthenticatedPermissionComponent, ReadOnlyPermissionComponent
 from wrf.schema.marshmallow import MarshmallowSchemaComponent
 
-from .models import User
-from .schemas import UserSchema
+from .models import Post, User
+from .schemas import PostSchema, UserSchema, UserWithPostsSchema
 
 
 class MyBaseAPI(BaseAPI):
@@ -20,6 +20,7 @@ class MyBaseAPI(BaseAPI):
     framework_component_class = DjangoFrameworkComponent
     pagination_component_class = PagePaginationComponent
     permission_component_class = AllowAuthenticatedPermissionComponent
+    fields_param = 'fields'
 
     def get_current_user(self):
         # `bool(request.user)` is `True` for unauthenticated users. Shame on django.
@@ -29,6 +30,7 @@ class MyBaseAPI(BaseAPI):
 class UserAPI(MyBaseAPI):
     model_class = User
     schema_class = UserSchema
+    dynamic_components = ('pagination',)
 
     def get_queryset(self):
         return User.objects.all()
@@ -71,12 +73,44 @@ class UserAPI(MyBaseAPI):
     def list_nopagination(self):
         return self._list()
 
+    @api_view(pagination_component_class=partial(NoPaginationComponent, stream=True, chunk_size=2))
+    def list_streaming(self):
+        return self._list()
+
+    @api_view(pagination_component_class=partial(CursorPaginationComponent, ordering=('last_name', 'id'), default_per_page=2))
+    def list_cursor(self):
+        return self._list()
+
+    @api_view(pagination_component_class=partial(CursorPaginationComponent, ordering=('created', 'id'), default_per_page=2))
+    def list_cursor_by_created(self):
+        return self._list()
+
     def get_pagination_component_class(self, api_method_name):
         if self.request.GET.get('paginate') == 'f':
             return NoPaginationComponent
+        if self.request.GET.get('count_mode'):
+            return partial(PagePaginationComponent, count_mode=self.request.GET['count_mode'], count_cap=2)
         return super(UserAPI, self).get_pagination_component_class(api_method_name)
 
 
+class ConditionalUserAPI(UserAPI):
+    validator_field = 'updated'
+
+
+class UserWithPostsAPI(UserAPI):
+    schema_class = UserWithPostsSchema
+    eager_load = ('posts',)
+
+
+class PostAPI(MyBaseAPI):
+    model_class = Post
+    schema_class = PostSchema
+    eager_load = ('author',)
+
+    def get_queryset(self):
+        return Post.objects.all()
+
+
 class CustomDispatchMixin(object):
     def dispatch(self, request, *args, **kwargs):
         custom = '{}_{}'.format(request.method.lower(), kwargs['action'])
@@ -104,6 +138,33 @@ class UserListCustomAPI(CustomDispatchMixin, View):
     def get_no_pagination(self, request, *args, **kwargs):
         return UserAPI(request).list_nopagination()
 
+    def get_streaming(self, request, *args, **kwargs):
+        return UserAPI(request).list_streaming()
+
+    def get_cursor(self, request, *args, **kwargs):
+        return UserAPI(request).list_cursor()
+
+    def get_cursor_by_created(self, request, *args, **kwargs):
+        return UserAPI(request).list_cursor_by_created()
+
+    def get_conditional(self, request, *args, **kwargs):
+        return ConditionalUserAPI(request).list()
+
+    def get_with_posts(self, request, *args, **kwargs):
+        return UserWithPostsAPI(request).list()
+
+    def get_posts(self, request, *args, **kwargs):
+        return PostAPI(request).list()
+
+    def post_bulk(self, request, *args, **kwargs):
+        return UserAPI(request).bulk_create()
+
+    def patch_bulk(self, request, *args, **kwargs):
+        return UserAPI(request).bulk_update()
+
+    def delete_bulk(self, request, *args, **kwargs):
+        return UserAPI(request).bulk_delete()
+
     def get_exception_handled(self, request, *args, **kwargs):
         return UserAPI(request).handled_exception()
 
@@ -131,3 +192,9 @@ class UserDetailCustomAPI(CustomDispatchMixin, View):
 
     def get_doublename_open(self, request, pk, *args, **kwargs):
         return UserAPI(request).doublename_open(pk)
+
+    def get_conditional(self, request, pk, *args, **kwargs):
+        return ConditionalUserAPI(request).retrieve(pk)
+
+    def get_with_posts(self, request, pk, *args, **kwargs):
+        return UserWithPostsAPI(request).retrieve(pk)
@@ -3,5 +3,11 @@ from django.db import models
 
 class User(models.Model):
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
     first_name = models.CharField(max_length=63)
     last_name = models.CharField(max_length=63)
+
+
+class Post(models.Model):
+    title = models.CharField(max_length=63)
+    author = models.ForeignKey(User, related_name='posts', on_delete=models.CASCADE)
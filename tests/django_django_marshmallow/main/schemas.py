@@ -6,5 +6,23 @@ class UserSchema(Schema):
     last_name = fields.String(required=True, validate=validate.Length(1))
 
     class Meta:
-        dump_only = ('id', 'created')
+        dump_only = ('id', 'created', 'updated')
         fields = dump_only + ('first_name', 'last_name')
+
+
+class PostSchema(Schema):
+    author = fields.Nested(UserSchema, only=('first_name', 'last_name'))
+
+    class Meta:
+        fields = ('id', 'title', 'author')
+
+
+class UserWithPostsSchema(UserSchema):
+    # Marshmallow would call the related manager, instead of its `all` method
+    posts = fields.Method('get_posts')
+
+    class Meta(UserSchema.Meta):
+        fields = UserSchema.Meta.fields + ('posts',)
+
+    def get_posts(self, user):
+        return PostSchema(many=True, only=('id', 'title')).dump(user.posts.all()).data
@@ -1,7 +1,9 @@
 import json
 import os
+from datetime import timedelta
 
 import django
+import mock
 import pytest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_django_marshmallow.settings')
@@ -9,8 +11,16 @@ django.setup()
 
 from django.contrib.auth.models import User as DjangoUser  # noqa  # isort:skip
 from django.core.management import call_command  # noqa  # isort:skip
+from django.db import connection  # noqa  # isort:skip
+from django.db.models import QuerySet  # noqa  # isort:skip
 from django.test import TestCase  # noqa  # isort:skip
-from main.models import User  # noqa  # isort:skip
+from django.test.utils import CaptureQueriesContext  # noqa  # isort:skip
+from django.utils import timezone  # noqa  # isort:skip
+from main.api import MyBaseAPI  # noqa  # isort:skip
+from main.models import Post, User  # noqa  # isort:skip
+
+from wrf.base import APIError  # noqa  # isort:skip
+from wrf.orm.django import DjangoORMComponent  # noqa  # isort:skip
 
 call_command('migrate')
 
@@ -19,6 +29,21 @@ def _create_user(**data):
     return User.objects.create(**data)
 
 
+def _create_post(**data):
+    return Post.objects.create(**data)
+
+
+def _app_queries(queries):
+    '''
+    Leaves out queries issued by the session and auth middlewares.
+    '''
+    return [query['sql'] for query in queries if '"main_' in query['sql']]
+
+
+def _names():
+    return list(User.objects.order_by('first_name').values_list('first_name', 'last_name'))
+
+
 def _as_json(payload):
     return {
         'data': json.dumps(payload),
@@ -83,6 +108,105 @@ class DjangoDjangoMarshmallowTestCase(TestCase):
         assert response.status_code == 400
         assert response.json() == {'first_name': ['Missing data for required field.'], 'status_code': 400}
 
+    def test_bulk_create(self):
+        data = [
+            {'first_name': 'Filipe', 'last_name': 'Waitman'},
+            {'first_name': 'John', 'last_name': 'Doe'},
+        ]
+
+        response = self.client.post('/api/users/bulk/', **_as_json(data))
+        assert response.status_code == 201
+        assert [item['first_name'] for item in response.json()] == ['Filipe', 'John']
+        created = [(item['id'], item['first_name']) for item in response.json()]
+        assert created == list(User.objects.order_by('id').values_list('id', 'first_name'))
+        assert 'created' in response.json()[0]
+        assert User.objects.count() == 2
+
+    def test_bulk_create_errors(self):
+        data = [
+            {'first_name': 'Filipe', 'last_name': 'Waitman'},
+            {'first_name': 'John'},
+            {'first_name': '', 'last_name': 'Doe'},
+        ]
+
+        response = self.client.post('/api/users/bulk/', **_as_json(data))
+        assert response.status_code == 400
+        assert response.json() == {
+            '1': {'last_name': ['Missing data for required field.']},
+            '2': {'first_name': ['Shorter than minimum length 1.']},
+            'status_code': 400,
+        }
+        assert User.objects.count() == 0
+
+        response = self.client.post('/api/users/bulk/', **_as_json({'first_name': 'Filipe', 'last_name': 'Waitman'}))
+        assert response.status_code == 400
+        assert response.json() == {'_schema': ['Invalid input type.'], 'status_code': 400}
+
+    def test_bulk_update(self):
+        filipe, john, jane = [_create_user(first_name=first_name, last_name='Waitman') for first_name in ('Filipe', 'John', 'Jane')]
+        data = [
+            {'pk': filipe.id, 'fields': {'last_name': 'Doe'}},
+            {'pk': john.id, 'fields': {'last_name': 'Doe'}},
+            {'pk': jane.id, 'fields': {'first_name': 'Janet'}},
+            {'pk': 9999, 'fields': {'first_name': 'Nobody'}},
+        ]
+
+        response = self.client.patch('/api/users/bulk/', **_as_json(data))
+        assert response.status_code == 200
+        assert response.json() == {'updated': 3}
+        assert _names() == [('Filipe', 'Doe'), ('Janet', 'Waitman'), ('John', 'Doe')]
+        # `auto_now` fields are updated, as `save` would do
+        assert all(User.objects.get(pk=user.pk).updated > user.updated for user in (filipe, john, jane))
+
+    def test_bulk_update_errors(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+        data = [
+            {'pk': user.id, 'fields': {'last_name': 'Doe'}},
+            {'pk': user.id, 'fields': {'first_name': ''}},
+            {'fields': {'first_name': 'John'}},
+        ]
+
+        response = self.client.patch('/api/users/bulk/', **_as_json(data))
+        assert response.status_code == 400
+        assert response.json() == {
+            '1': {'first_name': ['Shorter than minimum length 1.']},
+            '2': {'_schema': ['Expected an object with "pk" and "fields".']},
+            'status_code': 400,
+        }
+        assert _names() == [('Filipe', 'Waitman')]
+
+    def test_bulk_delete(self):
+        filipe = _create_user(first_name='Filipe', last_name='Waitman')
+        _create_user(first_name='John', last_name='Doe')
+        _create_user(first_name='Jane', last_name='Doe')
+
+        response = self.client.delete('/api/users/bulk/', **_as_json([filipe.id, 9999]))
+        assert response.status_code == 200
+        assert response.json() == {'deleted': 1}
+        assert _names() == [('Jane', 'Doe'), ('John', 'Doe')]
+
+        response = self.client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': 'Doe'}}))
+        assert response.status_code == 200
+        assert response.json() == {'deleted': 2}
+        assert _names() == []
+
+    def test_bulk_delete_errors(self):
+        response = self.client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': 'Doe', 'password': 'x'}}))
+        assert response.status_code == 400
+        assert response.json() == {'filter': {'password': ['Unknown field.']}, 'status_code': 400}
+
+        response = self.client.delete('/api/users/bulk/', **_as_json({'filter': {}}))
+        assert response.status_code == 400
+        assert response.json() == {'_schema': ['Expected a list of pks or a non-empty "filter" object.'], 'status_code': 400}
+
+        response = self.client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': ''}}))
+        assert response.status_code == 400
+        assert response.json() == {'filter': {'last_name': ['Shorter than minimum length 1.']}, 'status_code': 400}
+
+        response = self.client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': 'Doe', 'created': 'x'}}))
+        assert response.status_code == 400
+        assert response.json() == {'filter': {'created': ['Not filterable.']}, 'status_code': 400}
+
     def test_retrieve(self):
         user = _create_user(first_name='Filipe', last_name='Waitman')
 
@@ -100,6 +224,128 @@ class DjangoDjangoMarshmallowTestCase(TestCase):
         assert response.status_code == 404
         assert response.json() == {'status_code': 404}
 
+    def test_sparse_fieldsets(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/?fields=first_name,id')
+            assert response.status_code == 200
+            assert response.json()['results'] == [{'id': user.id, 'first_name': 'Filipe'}]
+
+            response = self.client.get('/api/users/{}/?fields=last_name'.format(user.id))
+            assert response.status_code == 200
+            assert response.json() == {'last_name': 'Waitman'}
+        selects = [query['sql'] for query in queries if 'main_user' in query['sql'] and 'COUNT(' not in query['sql']]
+        assert len(selects) == 2
+        assert all('created' not in sql for sql in selects)
+
+        response = self.client.get('/api/users/?fields=first_name,password')
+        assert response.status_code == 400
+        assert response.json() == {'fields': {'password': ['Unknown field.']}, 'status_code': 400}
+
+    def test_eager_load(self):
+        for first_name in ('Filipe', 'John', 'Jane'):
+            user = _create_user(first_name=first_name, last_name='Waitman')
+            for title in ('First', 'Second'):
+                _create_post(title=title, author=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/posts/?per_page=10')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 6
+        assert response.json()['results'][0]['author'] == {'first_name': 'Filipe', 'last_name': 'Waitman'}
+        assert len(_app_queries(queries)) == 2  # count and the page, with authors joined
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/with_posts/')
+        assert response.status_code == 200
+        assert [[post['title'] for post in item['posts']] for item in response.json()['results']] == [['First', 'Second']] * 3
+        assert len(_app_queries(queries)) == 3  # count, the page and all their posts
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/{}/with_posts/'.format(user.id))
+        assert response.status_code == 200
+        assert [post['title'] for post in response.json()['posts']] == ['First', 'Second']
+        assert len(_app_queries(queries)) == 2
+
+        response = self.client.get('/api/users/posts/?fields=title')
+        assert response.status_code == 200
+        assert response.json()['results'][0] == {'title': 'First'}
+
+    def test_list_rows(self):
+        for first_name, last_name in [('A', 'Smith'), ('B', 'Doe'), ('C', 'Doe')]:
+            user = _create_user(first_name=first_name, last_name=last_name)
+            _create_post(title='Title', author=user)
+        urls = ['/api/users/', '/api/users/?fields=first_name,id', '/api/users/no_pagination/', '/api/users/cursor/',
+                '/api/users/streaming/', '/api/users/with_posts/', '/api/users/posts/']
+
+        def get_json(url):
+            response = self.client.get(url)
+            assert response.status_code == 200
+            return json.loads(b''.join(response.streaming_content) if response.streaming else response.content)
+
+        expected = [get_json(url) for url in urls]
+
+        results = []
+        rows_queryset = DjangoORMComponent.rows_queryset
+
+        def recording_rows_queryset(orm, queryset, attributes):
+            results.append(rows_queryset(orm, queryset, attributes))
+            return results[-1]
+
+        with mock.patch.object(MyBaseAPI, 'list_rows', True), \
+                mock.patch.object(DjangoORMComponent, 'rows_queryset', recording_rows_queryset):
+            assert [get_json(url) for url in urls] == expected
+        # Instances are used for posts (`author` is not a column), while users with posts (`posts` is a method field)
+        # don't even try rows
+        assert [result is not None for result in results] == [True] * 5 + [False]
+
+    def test_conditional_list(self):
+        _create_user(first_name='Filipe', last_name='Waitman')
+
+        response = self.client.get('/api/users/conditional/')
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert 'Last-Modified' in response
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/conditional/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b''
+        assert len(_app_queries(queries)) == 1
+
+        _create_user(first_name='John', last_name='Doe')
+        response = self.client.get('/api/users/conditional/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+        etag = response['ETag']
+
+        # Same rows, but one of them modified
+        user = User.objects.get(first_name='John')
+        response = self.client.patch('/api/users/{}/'.format(user.id), **_as_json({'last_name': 'New'}))
+        assert response.status_code == 200
+        response = self.client.get('/api/users/conditional/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_conditional_retrieve(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+        url = '/api/users/{}/conditional/'.format(user.id)
+
+        response = self.client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        response = self.client.patch('/api/users/{}/'.format(user.id), **_as_json({'last_name': 'New'}))
+        assert response.status_code == 200
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert response.json()['last_name'] == 'New'
+
     def test_update(self):
         user = _create_user(first_name='Filipe', last_name='Waitman')
         data = {
@@ -118,6 +364,49 @@ class DjangoDjangoMarshmallowTestCase(TestCase):
         instance = User.objects.filter(id=response_json['id']).get()
         assert instance.last_name == 'New'
 
+    def test_update_only_changed_fields(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch('/api/users/{}/'.format(user.id), **_as_json({'first_name': 'Filipe', 'last_name': 'New'}))
+            assert response.status_code == 200
+            response = self.client.patch('/api/users/{}/'.format(user.id), **_as_json({'last_name': 'New'}))
+            assert response.status_code == 200
+            assert response.json()['last_name'] == 'New'
+
+            # Changes done to the instance before `update_object` are saved too
+            orm = DjangoORMComponent({'model_class': User})
+            instance = orm.get_object(User.objects.all(), user.id)
+            instance.first_name = 'John'
+            orm.update_object(instance, {'last_name': 'Doe'})
+
+        updates = [sql for sql in _app_queries(queries) if sql.startswith('UPDATE')]
+        assert len(updates) == 2  # Nothing changed on the second request
+        assert '"last_name"' in updates[0] and '"first_name"' not in updates[0] and '"created"' not in updates[0]
+        assert '"first_name"' in updates[1] and '"created"' not in updates[1]
+        assert _names() == [('John', 'Doe')]
+
+        # Instances not fetched by the component are saved as a whole
+        instance = User.objects.get(pk=user.id)
+        with mock.patch.object(User, 'save') as save:
+            DjangoORMComponent({'model_class': User}).update_object(instance, {'first_name': 'Jane'})
+        save.assert_called_once_with(update_fields=None)
+
+    def test_identity_map_by_queryset(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+        orm = DjangoORMComponent({'model_class': User})
+
+        with CaptureQueriesContext(connection) as queries:
+            instance = orm.get_object(User.objects.filter(last_name='Waitman'), user.id)
+            assert orm.get_object(User.objects.filter(last_name='Waitman'), user.id) is instance
+            with pytest.raises(APIError):
+                orm.get_object(User.objects.filter(last_name='Doe'), user.id)
+            # Querysets that can't match anything are not remembered
+            for _ in range(2):
+                with pytest.raises(APIError):
+                    orm.get_object(User.objects.filter(pk__in=[]), user.id)
+        assert len(_app_queries(queries)) == 2
+
     def test_update_errors(self):
         user = _create_user(first_name='Filipe', last_name='Waitman')
         data = {
@@ -138,6 +427,24 @@ class DjangoDjangoMarshmallowTestCase(TestCase):
         assert response.status_code == 204
         assert User.objects.filter(id=user.id).count() == 0
 
+    def test_delete_without_fetching(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+        post = _create_post(title='Post', author=user)
+
+        # Posts are deleted in cascade, as `Model.delete` would
+        response = self.client.delete('/api/users/{}/'.format(user.id))
+        assert response.status_code == 204
+        assert not Post.objects.filter(id=post.id).exists()
+
+        response = self.client.delete('/api/users/{}/'.format(user.id))
+        assert response.status_code == 404
+
+        # Nothing to collect, so it's a single DELETE
+        post = _create_post(title='Post', author=_create_user(first_name='John', last_name='Doe'))
+        with CaptureQueriesContext(connection) as queries:
+            assert DjangoORMComponent({'model_class': Post}).delete_object_by_pk(Post.objects.all(), post.id) is True
+        assert len(queries) == 1 and queries[0]['sql'].startswith('DELETE')
+
     def test_doublename(self):
         user = _create_user(first_name='Filipe', last_name='Waitman')
 
@@ -180,6 +487,39 @@ class DjangoDjangoMarshmallowTestCase(TestCase):
         assert response_json['prev_page'] is not None
         assert len(response_json['results']) == 1
 
+    def test_pagination_count_modes(self):
+        for first_name in ('Filipe', 'John', 'Jane'):
+            _create_user(first_name=first_name, last_name='Doe')
+
+        response = self.client.get('/api/users/')
+        assert response.json()['count'] == 3
+        assert response.json()['count_mode'] == 'exact'
+
+        with mock.patch.object(QuerySet, 'count') as count:
+            response = self.client.get('/api/users/?count_mode=none&per_page=2')
+        assert response.status_code == 200
+        assert response.json()['count'] is None
+        assert response.json()['count_mode'] == 'none'
+        assert 'page=2' in response.json()['next_page']
+        assert response.json()['prev_page'] is None
+        assert [item['first_name'] for item in response.json()['results']] == ['Filipe', 'John']
+        assert count.call_count == 0
+
+        response = self.client.get('/api/users/?count_mode=none&per_page=2&page=2')
+        assert response.json()['next_page'] is None
+        assert 'page=1' in response.json()['prev_page']
+        assert [item['first_name'] for item in response.json()['results']] == ['Jane']
+
+        response = self.client.get('/api/users/?count_mode=capped&per_page=2')
+        assert response.json()['count'] == '2+'
+        assert response.json()['count_mode'] == 'capped'
+        assert len(response.json()['results']) == 2
+
+        # Not supported by SQLite: falls back to exact counting.
+        response = self.client.get('/api/users/?count_mode=estimated')
+        assert response.json()['count'] == 3
+        assert response.json()['count_mode'] == 'exact'
+
     def test_permissions(self, *mocks):
         self.client.logout()
         user = _create_user(first_name='Filipe', last_name='Waitman')
@@ -254,6 +594,64 @@ class DjangoDjangoMarshmallowTestCase(TestCase):
         assert response_json[0]['first_name'] == 'Filipe'
         assert response_json[0]['last_name'] == 'Waitman'
 
+    def test_streaming_list(self):
+        for first_name in ('Filipe', 'John', 'Jane'):
+            _create_user(first_name=first_name, last_name='Doe')
+
+        response = self.client.get('/api/users/streaming/')
+        assert response.status_code == 200
+        assert response.streaming
+        response_json = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+        assert [item['first_name'] for item in response_json] == ['Filipe', 'John', 'Jane']
+        assert 'id' in response_json[0]
+        assert 'created' in response_json[0]
+
+    def test_cursor_pagination(self):
+        for first_name, last_name in [('A', 'Smith'), ('B', 'Doe'), ('C', 'Doe'), ('D', 'Brown'), ('E', 'Smith')]:
+            _create_user(first_name=first_name, last_name=last_name)
+
+        pages = []
+        url = '/api/users/cursor/?x=y'
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == 200
+            assert 'count' not in response.json()
+            pages.append([item['first_name'] for item in response.json()['results']])
+            last_page, url = response.json(), response.json()['next_page']
+        assert pages == [['D', 'B'], ['C', 'A'], ['E']]
+        assert 'x=y' in last_page['prev_page']
+
+        pages = []
+        url = last_page['prev_page']
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == 200
+            pages.append([item['first_name'] for item in response.json()['results']])
+            url = response.json()['prev_page']
+        assert pages == [['C', 'A'], ['D', 'B']]
+
+        response = self.client.get('/api/users/cursor/?cursor=invalid')
+        assert response.status_code == 400
+        assert response.json() == {'cursor': ['Invalid cursor.'], 'status_code': 400}
+
+    def test_cursor_pagination_by_datetime(self):
+        now = timezone.now()
+        for first_name, created in [('A', now), ('B', now - timedelta(days=1)), ('C', now), ('D', now + timedelta(microseconds=1))]:
+            User.objects.filter(pk=_create_user(first_name=first_name, last_name='Doe').pk).update(created=created)
+
+        pages = []
+        url = '/api/users/cursor_by_created/'
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == 200
+            pages.append([item['first_name'] for item in response.json()['results']])
+            last_page, url = response.json(), response.json()['next_page']
+        assert pages == [['B', 'A'], ['C', 'D']]
+
+        response = self.client.get(last_page['prev_page'])
+        assert response.status_code == 200
+        assert [item['first_name'] for item in response.json()['results']] == ['B', 'A']
+
     def test_exception_behavior(self):
         response = self.client.get('/api/users/exception_handled/')
         assert response.status_code == 499
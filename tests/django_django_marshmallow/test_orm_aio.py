@@ -0,0 +1,113 @@
+import os
+
+import django
+import pytest
+from asgiref.sync import async_to_sync
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_django_marshmallow.settings')
+django.setup()
+
+from django.core.management import call_command  # noqa  # isort:skip
+from django.test import TestCase  # noqa  # isort:skip
+from main.models import Post, User  # noqa  # isort:skip
+
+from wrf.base import APIError, Context  # noqa  # isort:skip
+from wrf.orm.django_aio import DjangoAsyncORMComponent  # noqa  # isort:skip
+
+call_command('migrate')
+
+# `aget`, `asave` and `adelete`
+requires_async_queries = pytest.mark.skipif(django.VERSION < (4, 2), reason='Requires Django 4.2+')
+
+
+def _create_user(**data):
+    return User.objects.create(**data)
+
+
+def _names():
+    return sorted(User.objects.values_list('first_name', 'last_name'))
+
+
+class DjangoAsyncORMComponentTestCase(TestCase):
+    def setUp(self):
+        self.orm = DjangoAsyncORMComponent(Context({'model_class': User}))
+
+    def _run(self, method_name, *args):
+        # Sync code called via `sync_to_async` runs in this very thread, so it sees the test transaction
+        return async_to_sync(getattr(self.orm, method_name))(*args)
+
+    def test_get_queryset(self):
+        queryset = User.objects.all()
+        assert self._run('get_queryset', queryset) is queryset
+
+    def test_update_objects(self):
+        filipe, john, jane = [_create_user(first_name=first_name, last_name='Waitman') for first_name in ('Filipe', 'John', 'Jane')]
+        changes = [([filipe.id, john.id], {'last_name': 'Doe'}), ([jane.id, 9999], {'first_name': 'Janet'})]
+
+        assert self._run('update_objects', User.objects.all(), changes) == 3
+        assert _names() == [('Filipe', 'Doe'), ('Janet', 'Waitman'), ('John', 'Doe')]
+        assert User.objects.get(pk=filipe.pk).updated > filipe.updated
+
+    def test_delete_objects(self):
+        filipe = _create_user(first_name='Filipe', last_name='Waitman')
+        _create_user(first_name='John', last_name='Doe')
+        Post.objects.create(title='Post', author=filipe)
+
+        queryset = self.orm.filter_queryset_by_fields(User.objects.all(), {'last_name': 'Waitman'})
+        assert self._run('delete_objects', queryset) == 1
+        assert _names() == [('John', 'Doe')]
+        assert not Post.objects.exists()
+
+        assert self._run('delete_objects', self.orm.filter_queryset_by_pks(User.objects.all(), [9999])) == 0
+
+    def test_run_sync(self):
+        _create_user(first_name='Filipe', last_name='Waitman')
+        assert self._run('run_sync', User.objects.count) == 1
+
+    def test_get_column_names(self):
+        assert self.orm.get_column_names() == {'id', 'created', 'updated', 'first_name', 'last_name'}
+
+    @requires_async_queries
+    def test_get_object(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+
+        instance = self._run('get_object', User.objects.all(), user.id)
+        assert instance.first_name == 'Filipe'
+        assert self._run('get_object', User.objects.all(), user.id) is instance
+
+        with pytest.raises(APIError) as e:
+            self._run('get_object', User.objects.all(), 9999)
+        assert e.value.status_code == 404
+
+    @requires_async_queries
+    def test_create_object(self):
+        user = self._run('create_object', {'first_name': 'Filipe', 'last_name': 'Waitman'})
+        assert user.id is not None
+        assert _names() == [('Filipe', 'Waitman')]
+
+    @requires_async_queries
+    def test_update_object(self):
+        user = self._run('get_object', User.objects.all(), _create_user(first_name='Filipe', last_name='Waitman').id)
+
+        assert self._run('update_object', user, {'last_name': 'Doe'}) is user
+        assert _names() == [('Filipe', 'Doe')]
+        # Nothing changed, nothing written
+        updated = User.objects.get(pk=user.pk).updated
+        self._run('update_object', user, {'last_name': 'Doe'})
+        assert User.objects.get(pk=user.pk).updated == updated
+
+    @requires_async_queries
+    def test_delete_object(self):
+        self._run('delete_object', _create_user(first_name='Filipe', last_name='Waitman'))
+        assert _names() == []
+
+    @requires_async_queries
+    def test_delete_object_by_pk(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+
+        assert self._run('delete_object_by_pk', User.objects.all(), user.id) is True
+        assert _names() == []
+
+        with pytest.raises(APIError) as e:
+            self._run('delete_object_by_pk', User.objects.all(), user.id)
+        assert e.value.status_code == 404
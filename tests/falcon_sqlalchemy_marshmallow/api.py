@@ -24,6 +24,7 @@ class MyBaseAPI(BaseAPI):
 class BaseUserAPI(MyBaseAPI):
     model_class = User
     schema_class = UserSchema
+    dynamic_components = ('pagination',)
 
     def get_queryset(self):
         return session.query(User)
@@ -62,6 +63,10 @@ class BaseUserAPI(MyBaseAPI):
     def list_nopagination(self):
         return self._list()
 
+    @api_view(pagination_component_class=partial(NoPaginationComponent, stream=True, chunk_size=2))
+    def list_streaming(self):
+        return self._list()
+
     def get_pagination_component_class(self, api_method_name):
         if self.request.params.get('paginate') == 'f':
             return NoPaginationComponent
@@ -93,6 +98,9 @@ class UserAPI(object):
     def on_get_list_no_pagination(self, req, resp):
         return BaseUserAPI(req, response=resp).list_nopagination()
 
+    def on_get_list_streaming(self, req, resp):
+        return BaseUserAPI(req, response=resp).list_streaming()
+
     def on_get_list_exception_handled(self, req, resp):
         return BaseUserAPI(req, response=resp).handled_exception()
 
@@ -48,6 +48,7 @@ def create_app():
     api.add_route('/api/users', user_api, suffix='list')
     api.add_route('/api/users/read_only', user_api, suffix='list_readonly')
     api.add_route('/api/users/no_pagination', user_api, suffix='list_no_pagination')
+    api.add_route('/api/users/streaming', user_api, suffix='list_streaming')
     api.add_route('/api/users/exception/handled', user_api, suffix='list_exception_handled')
     api.add_route('/api/users/exception/unhandled', user_api, suffix='list_exception_unhandled')
     api.add_route('/api/users/{pk}', user_api, suffix='detail')
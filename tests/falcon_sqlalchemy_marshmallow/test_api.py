@@ -1,6 +1,11 @@
 import json
 
+import falcon
 import pytest
+from falcon.testing import create_environ
+
+from wrf.base import Context
+from wrf.framework.falcon import FalconFrameworkComponent
 
 from .api import MyBaseAPI
 from .app import Base, User, engine, session
@@ -59,6 +64,22 @@ def test_create(client):
     assert instance.last_name == 'Waitman'
 
 
+def test_request_data():
+    def get_request_data(body, content_type='application/json', read_media=False):
+        request = falcon.Request(create_environ(method='POST', body=body, headers={'Content-Type': content_type}))
+        if read_media:
+            request.media  # As a middleware could have done
+        return FalconFrameworkComponent(Context({'request': request, 'response': falcon.Response()})).get_request_data()
+
+    data = {'first_name': 'Filipe'}
+    assert get_request_data(json.dumps(data)) == data
+    assert get_request_data(json.dumps(data), content_type='application/json; charset=utf-8') == data
+    assert get_request_data(json.dumps(data), read_media=True) == data
+    assert get_request_data('') == {}
+    with pytest.raises(falcon.HTTPUnsupportedMediaType):  # No media handler for it
+        get_request_data('first_name=Filipe', content_type='application/x-www-form-urlencoded')
+
+
 def test_create_errors(client):
     data = {
         'last_name': 'Waitman',
@@ -118,11 +139,15 @@ def test_update_errors(client):
 
 
 def test_delete(client):
-    user = _create_user(first_name='Filipe', last_name='Waitman')
+    # The row is deleted without going through the session, so the instance can't be refreshed afterwards
+    pk = _create_user(first_name='Filipe', last_name='Waitman').id
 
-    response = client.simulate_delete('/api/users/{}'.format(user.id))
+    response = client.simulate_delete('/api/users/{}'.format(pk))
     assert response.status_code == 204
-    assert session.query(User).filter_by(id=user.id).count() == 0
+    assert session.query(User).filter_by(id=pk).count() == 0
+
+    response = client.simulate_delete('/api/users/{}'.format(pk))
+    assert response.status_code == 404
 
 
 def test_doublename(client):
@@ -229,6 +254,17 @@ def test_no_pagination_list_via_query_params(client):
     assert response.json[0]['last_name'] == 'Waitman'
 
 
+def test_streaming_list(client):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        _create_user(first_name=first_name, last_name='Doe')
+
+    response = client.simulate_get('/api/users/streaming')
+    assert response.status_code == 200
+    assert [item['first_name'] for item in response.json] == ['Filipe', 'John', 'Jane']
+    assert 'id' in response.json[0]
+    assert 'created' in response.json[0]
+
+
 def test_exception_behavior(client):
     response = client.simulate_get('/api/users/exception/handled')
     assert response.status_code == 451
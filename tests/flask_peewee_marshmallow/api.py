@@ -6,12 +6,12 @@ from wrf.api.base import BaseAPI, api_view
 from wrf.base import APIError
 from wrf.framework.flask import FlaskFrameworkComponent
 from wrf.orm.peewee import PeeweeORMComponent
-from wrf.pagination.base import NoPaginationComponent, PagePaginationComponent
+from wrf.pagination.base import CursorPaginationComponent, NoPaginationComponent, PagePaginationComponent
 from wrf.permission.base import AllowAllPermissionComponent, AllowAuthenticatedPermissionComponent, ReadOnlyPermissionComponent
 from wrf.schema.marshmallow import MarshmallowSchemaComponent
 
-from .models import User
-from .schemas import UserSchema
+from .models import Post, User
+from .schemas import PostSchema, UserSchema, UserWithPostsSchema
 
 users_api_bp = Blueprint('users_api', __name__)
 
@@ -22,6 +22,7 @@ class MyBaseAPI(BaseAPI):
     framework_component_class = FlaskFrameworkComponent
     pagination_component_class = PagePaginationComponent
     permission_component_class = AllowAuthenticatedPermissionComponent
+    fields_param = 'fields'
 
     def get_current_user(self):
         return {'name': 'Filipe'}
@@ -30,6 +31,7 @@ class MyBaseAPI(BaseAPI):
 class UserAPI(MyBaseAPI):
     model_class = User
     schema_class = UserSchema
+    dynamic_components = ('pagination',)
 
     def get_queryset(self):
         return User.select()
@@ -72,12 +74,51 @@ class UserAPI(MyBaseAPI):
     def list_nopagination(self):
         return self._list()
 
+    @api_view(pagination_component_class=partial(NoPaginationComponent, stream=True, chunk_size=2))
+    def list_streaming(self):
+        return self._list()
+
+    @api_view(pagination_component_class=partial(CursorPaginationComponent, ordering=('last_name', 'id'), default_per_page=2))
+    def list_cursor(self):
+        return self._list()
+
     def get_pagination_component_class(self, api_method_name):
         if self.request.args.get('paginate') == 'f':
             return NoPaginationComponent
+        if self.request.args.get('count_mode'):
+            return partial(PagePaginationComponent, count_mode=self.request.args['count_mode'], count_cap=2)
         return super(UserAPI, self).get_pagination_component_class(api_method_name)
 
 
+class OwnerOnlyPermissionComponent(AllowAuthenticatedPermissionComponent):
+    def check_permission(self, instance=None):
+        super(OwnerOnlyPermissionComponent, self).check_permission(instance)
+        if instance is not None and instance.first_name != self.context['current_user']['name']:
+            raise APIError(403)
+
+
+class OwnerOnlyUserAPI(UserAPI):
+    permission_component_class = OwnerOnlyPermissionComponent
+
+
+class WriteByPkUserAPI(UserAPI):
+    orm_component_class = partial(PeeweeORMComponent, write_by_pk=True)
+
+
+class UserWithPostsAPI(UserAPI):
+    schema_class = UserWithPostsSchema
+    eager_load = ('posts',)
+
+
+class PostAPI(MyBaseAPI):
+    model_class = Post
+    schema_class = PostSchema
+    eager_load = ('author',)
+
+    def get_queryset(self):
+        return Post.select()
+
+
 @users_api_bp.route('/', methods=['GET'])
 def list_():
     return UserAPI(request).list()
@@ -88,6 +129,31 @@ def create():
     return UserAPI(request).create()
 
 
+@users_api_bp.route('/bulk/', methods=['POST'])
+def bulk_create():
+    return UserAPI(request).bulk_create()
+
+
+@users_api_bp.route('/bulk/', methods=['PATCH'])
+def bulk_update():
+    return UserAPI(request).bulk_update()
+
+
+@users_api_bp.route('/bulk/', methods=['DELETE'])
+def bulk_delete():
+    return UserAPI(request).bulk_delete()
+
+
+@users_api_bp.route('/with_posts/', methods=['GET'])
+def with_posts_list():
+    return UserWithPostsAPI(request).list()
+
+
+@users_api_bp.route('/posts/', methods=['GET'])
+def posts_list():
+    return PostAPI(request).list()
+
+
 @users_api_bp.route('/<int:pk>/', methods=['GET'])
 def retrieve(pk):
     return UserAPI(request).retrieve(pk)
@@ -103,6 +169,26 @@ def delete(pk):
     return UserAPI(request).delete(pk)
 
 
+@users_api_bp.route('/<int:pk>/by_pk/', methods=['PATCH'])
+def by_pk_update(pk):
+    return WriteByPkUserAPI(request).update(pk)
+
+
+@users_api_bp.route('/<int:pk>/by_pk/', methods=['DELETE'])
+def by_pk_delete(pk):
+    return WriteByPkUserAPI(request).delete(pk)
+
+
+@users_api_bp.route('/<int:pk>/owner_only/', methods=['PATCH'])
+def owner_only_update(pk):
+    return OwnerOnlyUserAPI(request).update(pk)
+
+
+@users_api_bp.route('/<int:pk>/owner_only/', methods=['DELETE'])
+def owner_only_delete(pk):
+    return OwnerOnlyUserAPI(request).delete(pk)
+
+
 @users_api_bp.route('/<int:pk>/doublename/', methods=['GET'])
 def doublename(pk):
     return UserAPI(request).doublename(pk)
@@ -113,6 +199,11 @@ def open_doublename(pk):
     return UserAPI(request).doublename_open(pk)
 
 
+@users_api_bp.route('/<int:pk>/with_posts/', methods=['GET'])
+def with_posts_retrieve(pk):
+    return UserWithPostsAPI(request).retrieve(pk)
+
+
 @users_api_bp.route('/read_only/', methods=['GET', 'POST'])
 def read_only_list_and_create():
     if request.method == 'GET':
@@ -130,6 +221,16 @@ def no_pagination_list():
     return UserAPI(request).list_nopagination()
 
 
+@users_api_bp.route('/streaming/', methods=['GET'])
+def streaming_list():
+    return UserAPI(request).list_streaming()
+
+
+@users_api_bp.route('/cursor/', methods=['GET'])
+def cursor_list():
+    return UserAPI(request).list_cursor()
+
+
 @users_api_bp.route('/exception/handled/', methods=['GET'])
 def handled_exception_list():
     return UserAPI(request).handled_exception()
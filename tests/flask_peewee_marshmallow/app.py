@@ -15,9 +15,9 @@ def create_app(script_info=None):
     ma.init_app(app)
 
     from .api import users_api_bp
-    from .models import User
+    from .models import Post, User
     app.register_blueprint(users_api_bp, url_prefix='/api/users')
 
-    app.before_request(lambda: db.create_tables([User]))
+    app.before_request(lambda: db.create_tables([User, Post]))
 
     return app
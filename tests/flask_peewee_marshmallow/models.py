@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from peewee import CharField, DateTimeField, Model
+from peewee import CharField, DateTimeField, ForeignKeyField, Model
 
 from .app import db
 
@@ -17,3 +17,11 @@ class User(Model):
 
     def __repr__(self):
         return '<User: {self.first_name} {self.last_name}>'.format(self=self)
+
+
+class Post(Model):
+    title = CharField()
+    author = ForeignKeyField(User, backref='posts')
+
+    class Meta:
+        database = db
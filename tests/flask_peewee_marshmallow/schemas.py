@@ -8,3 +8,17 @@ class UserSchema(Schema):
     class Meta:
         dump_only = ('id', 'created')
         fields = dump_only + ('first_name', 'last_name')
+
+
+class PostSchema(Schema):
+    author = fields.Nested(UserSchema, only=('first_name', 'last_name'))
+
+    class Meta:
+        fields = ('id', 'title', 'author')
+
+
+class UserWithPostsSchema(UserSchema):
+    posts = fields.Nested(PostSchema, many=True, only=('id', 'title'))
+
+    class Meta(UserSchema.Meta):
+        fields = UserSchema.Meta.fields + ('posts',)
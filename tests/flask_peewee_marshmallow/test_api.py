@@ -1,16 +1,22 @@
 import json
+from contextlib import contextmanager
 
+import mock
 import pytest
 
+from wrf.base import APIError
+from wrf.orm.peewee import PeeweeORMComponent
+from wrf.pagination.base import OrmWrapper
+
 from .api import MyBaseAPI
 from .app import db
-from .models import User
+from .models import Post, User
 
 
 @pytest.fixture(autouse=True)
 def _setup():
-    db.drop_tables([User])
-    db.create_tables([User])
+    db.drop_tables([Post, User])
+    db.create_tables([User, Post])
 
 
 def _create_user(**data):
@@ -19,6 +25,28 @@ def _create_user(**data):
     return user
 
 
+def _create_post(**data):
+    return Post.create(**data)
+
+
+@contextmanager
+def _count_selects():
+    statements = []
+    execute_sql = db.execute_sql
+
+    def counting_execute_sql(sql, *args, **kwargs):
+        if sql.startswith('SELECT'):
+            statements.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+
+    with mock.patch.object(db, 'execute_sql', counting_execute_sql):
+        yield statements
+
+
+def _names():
+    return [(user.first_name, user.last_name) for user in User.select().order_by(User.first_name)]
+
+
 def _as_json(payload):
     return {
         'data': json.dumps(payload),
@@ -75,6 +103,106 @@ def test_create_errors(client):
     assert response.json == {'first_name': ['Missing data for required field.'], 'status_code': 400}
 
 
+def test_bulk_create(client):
+    data = [
+        {'first_name': 'Filipe', 'last_name': 'Waitman'},
+        {'first_name': 'John', 'last_name': 'Doe'},
+    ]
+
+    response = client.post('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 201
+    assert [item['first_name'] for item in response.json] == ['Filipe', 'John']
+    created = [(item['id'], item['first_name']) for item in response.json]
+    assert created == [(user.id, user.first_name) for user in User.select().order_by(User.id)]
+    assert 'created' in response.json[0]
+    assert User.select().count() == 2
+
+    # Where inserts return the primary keys (e.g. PostgreSQL), rows are inserted in batches
+    with mock.patch.object(db, 'returning_clause', True), mock.patch.object(User, 'bulk_create') as bulk_create:
+        client.post('/api/users/bulk/', **_as_json(data))
+    assert [instance.first_name for instance in bulk_create.call_args[0][0]] == ['Filipe', 'John']
+
+
+def test_bulk_create_errors(client):
+    data = [
+        {'first_name': 'Filipe', 'last_name': 'Waitman'},
+        {'first_name': 'John'},
+        {'first_name': '', 'last_name': 'Doe'},
+    ]
+
+    response = client.post('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 400
+    assert response.json == {
+        '1': {'last_name': ['Missing data for required field.']},
+        '2': {'first_name': ['Shorter than minimum length 1.']},
+        'status_code': 400,
+    }
+    assert User.select().count() == 0
+
+    response = client.post('/api/users/bulk/', **_as_json({'first_name': 'Filipe', 'last_name': 'Waitman'}))
+    assert response.status_code == 400
+    assert response.json == {'_schema': ['Invalid input type.'], 'status_code': 400}
+
+
+def test_bulk_update(client):
+    filipe, john, jane = [_create_user(first_name=first_name, last_name='Waitman') for first_name in ('Filipe', 'John', 'Jane')]
+    data = [
+        {'pk': filipe.id, 'fields': {'last_name': 'Doe'}},
+        {'pk': john.id, 'fields': {'last_name': 'Doe'}},
+        {'pk': jane.id, 'fields': {'first_name': 'Janet'}},
+        {'pk': 9999, 'fields': {'first_name': 'Nobody'}},
+    ]
+
+    response = client.patch('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 200
+    assert response.json == {'updated': 3}
+    assert _names() == [('Filipe', 'Doe'), ('Janet', 'Waitman'), ('John', 'Doe')]
+
+
+def test_bulk_update_errors(client):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    data = [
+        {'pk': user.id, 'fields': {'last_name': 'Doe'}},
+        {'pk': user.id, 'fields': {'first_name': ''}},
+        {'fields': {'first_name': 'John'}},
+    ]
+
+    response = client.patch('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 400
+    assert response.json == {
+        '1': {'first_name': ['Shorter than minimum length 1.']},
+        '2': {'_schema': ['Expected an object with "pk" and "fields".']},
+        'status_code': 400,
+    }
+    assert _names() == [('Filipe', 'Waitman')]
+
+
+def test_bulk_delete(client):
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    _create_user(first_name='John', last_name='Doe')
+    _create_user(first_name='Jane', last_name='Doe')
+
+    response = client.delete('/api/users/bulk/', **_as_json([filipe.id, 9999]))
+    assert response.status_code == 200
+    assert response.json == {'deleted': 1}
+    assert _names() == [('Jane', 'Doe'), ('John', 'Doe')]
+
+    response = client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': 'Doe'}}))
+    assert response.status_code == 200
+    assert response.json == {'deleted': 2}
+    assert _names() == []
+
+
+def test_bulk_delete_errors(client):
+    response = client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': 'Doe', 'password': 'x'}}))
+    assert response.status_code == 400
+    assert response.json == {'filter': {'password': ['Unknown field.']}, 'status_code': 400}
+
+    response = client.delete('/api/users/bulk/', **_as_json({'filter': {}}))
+    assert response.status_code == 400
+    assert response.json == {'_schema': ['Expected a list of pks or a non-empty "filter" object.'], 'status_code': 400}
+
+
 def test_retrieve(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
 
@@ -92,6 +220,87 @@ def test_retrieve_errors(client):
     assert response.json == {'status_code': 404}
 
 
+def test_sparse_fieldsets(client, mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    execute_sql = mocker.spy(db, 'execute_sql')
+
+    response = client.get('/api/users/?fields=first_name,id')
+    assert response.status_code == 200
+    assert response.json['results'] == [{'id': user.id, 'first_name': 'Filipe'}]
+
+    response = client.get('/api/users/{}/?fields=last_name'.format(user.id))
+    assert response.status_code == 200
+    assert response.json == {'last_name': 'Waitman'}
+
+    selects = [call[0][0] for call in execute_sql.call_args_list
+               if call[0][0].startswith('SELECT') and 'COUNT(' not in call[0][0]]
+    assert len(selects) == 2
+    assert all('created' not in sql for sql in selects)
+
+    response = client.get('/api/users/?fields=first_name,password')
+    assert response.status_code == 400
+    assert response.json == {'fields': {'password': ['Unknown field.']}, 'status_code': 400}
+
+
+def test_sparse_fieldsets_with_cursor_pagination(client):
+    for first_name, last_name in [('A', 'Smith'), ('B', 'Doe'), ('C', 'Brown')]:
+        _create_user(first_name=first_name, last_name=last_name)
+
+    response = client.get('/api/users/cursor/?fields=first_name')
+    assert response.json['results'] == [{'first_name': 'C'}, {'first_name': 'B'}]
+
+    response = client.get(response.json['next_page'])
+    assert response.json['results'] == [{'first_name': 'A'}]
+
+
+def test_eager_load(client):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        user = _create_user(first_name=first_name, last_name='Waitman')
+        for title in ('First', 'Second'):
+            _create_post(title=title, author=user)
+
+    with _count_selects() as queries:
+        response = client.get('/api/users/posts/?per_page=10')
+    assert response.status_code == 200
+    assert len(response.json['results']) == 6
+    assert response.json['results'][0]['author'] == {'first_name': 'Filipe', 'last_name': 'Waitman'}
+    assert len(queries) == 2  # count and the page, with authors joined
+
+    with _count_selects() as queries:
+        response = client.get('/api/users/with_posts/')
+    assert response.status_code == 200
+    assert [[post['title'] for post in item['posts']] for item in response.json['results']] == [['First', 'Second']] * 3
+    assert len(queries) == 3  # count, the page and all their posts
+
+    with _count_selects() as queries:
+        response = client.get('/api/users/{}/with_posts/'.format(user.id))
+    assert response.status_code == 200
+    assert [post['title'] for post in response.json['posts']] == ['First', 'Second']
+    assert len(queries) == 2
+
+    response = client.get('/api/users/posts/?fields=title')
+    assert response.status_code == 200
+    assert response.json['results'][0] == {'title': 'First'}
+
+
+def test_list_rows(client, mocker):
+    for first_name, last_name in [('A', 'Smith'), ('B', 'Doe'), ('C', 'Doe')]:
+        user = _create_user(first_name=first_name, last_name=last_name)
+        _create_post(title='Title', author=user)
+    urls = ['/api/users/', '/api/users/?fields=first_name,id', '/api/users/no_pagination/', '/api/users/cursor/',
+            '/api/users/streaming/', '/api/users/with_posts/', '/api/users/posts/']
+    expected = [client.get(url).json for url in urls]
+
+    mocker.patch.object(MyBaseAPI, 'list_rows', True)
+    rows_queryset = mocker.spy(PeeweeORMComponent, 'rows_queryset')
+    for url, expected_json in zip(urls, expected):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.json == expected_json
+        # Relations (`posts`, `author`) are not columns, so instances are used for them
+        assert (rows_queryset.spy_return is None) == url.endswith('posts/')
+
+
 def test_update(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
     data = {
@@ -109,6 +318,42 @@ def test_update(client):
     assert instance.last_name == 'New'
 
 
+def test_update_only_changed_fields(client):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    statements = []
+    execute_sql = db.execute_sql
+
+    def recording_execute_sql(sql, *args, **kwargs):
+        statements.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+
+    with mock.patch.object(db, 'execute_sql', recording_execute_sql):
+        response = client.patch('/api/users/{}/'.format(user.id), **_as_json({'first_name': 'Filipe', 'last_name': 'New'}))
+        assert response.status_code == 200
+        response = client.patch('/api/users/{}/'.format(user.id), **_as_json({'last_name': 'New'}))
+        assert response.status_code == 200
+        assert response.json['last_name'] == 'New'
+
+        # Changes done to the instance before `update_object` are saved too
+        orm = PeeweeORMComponent({'model_class': User})
+        instance = orm.get_object(User.select(), user.id)
+        instance.first_name = 'John'
+        orm.update_object(instance, {'last_name': 'Doe'})
+
+    updates = [sql for sql in statements if sql.startswith('UPDATE')]
+    assert len(updates) == 2  # Nothing changed on the second request
+    assert '"last_name"' in updates[0] and '"first_name"' not in updates[0] and '"created"' not in updates[0]
+    assert '"first_name"' in updates[1] and '"created"' not in updates[1]
+    assert _names() == [('John', 'Doe')]
+
+    # Instances not fetched by the component are saved as a whole
+    instance = User.get_by_id(user.id)
+    instance.first_name = 'Jane'
+    with mock.patch.object(User, 'save') as save:
+        PeeweeORMComponent({'model_class': User}).update_object(instance, {})
+    save.assert_called_once_with(only=None)
+
+
 def test_update_errors(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
     data = {
@@ -131,6 +376,75 @@ def test_delete(client):
     assert User.select().filter(id=user.id).count() == 0
 
 
+def test_write_without_fetching(client):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    statements = []
+    execute_sql = db.execute_sql
+
+    def recording_execute_sql(sql, *args, **kwargs):
+        if sql.startswith(('SELECT', 'UPDATE', 'DELETE')):
+            statements.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+
+    with mock.patch.object(db, 'execute_sql', recording_execute_sql):
+        # Unless asked to (`write_by_pk`), instances are fetched, so `save` and `delete_instance` are used
+        response = client.patch('/api/users/{}/'.format(user.id), **_as_json({'last_name': 'New'}))
+        assert response.status_code == 200
+        assert [sql.split()[0] for sql in statements] == ['SELECT', 'UPDATE']
+
+        del statements[:]
+        response = client.patch('/api/users/{}/by_pk/'.format(user.id), **_as_json({'last_name': 'Doe'}))
+        assert response.status_code == 200
+        assert response.json['first_name'] == 'Filipe'
+        assert response.json['last_name'] == 'Doe'
+        assert len(statements) == 1 and statements[0].startswith('UPDATE') and 'RETURNING' in statements[0]
+
+        response = client.patch('/api/users/9999/by_pk/', **_as_json({'last_name': 'Doe'}))
+        assert response.status_code == 404
+
+        # Nothing to update, so the instance is just fetched
+        del statements[:]
+        response = client.patch('/api/users/{}/by_pk/'.format(user.id), **_as_json({}))
+        assert response.status_code == 200
+        assert response.json['last_name'] == 'Doe'
+        assert [sql.split()[0] for sql in statements] == ['SELECT']
+
+        del statements[:]
+        response = client.delete('/api/users/{}/by_pk/'.format(user.id))
+        assert response.status_code == 204
+        assert len(statements) == 1 and statements[0].startswith('DELETE')
+
+        response = client.delete('/api/users/{}/by_pk/'.format(user.id))
+        assert response.status_code == 404
+
+        other_user = _create_user(first_name='John', last_name='Doe')
+        del statements[:]
+        response = client.delete('/api/users/{}/'.format(other_user.id))
+        assert response.status_code == 204
+        assert [sql.split()[0] for sql in statements] == ['SELECT', 'DELETE']
+
+    assert _names() == []
+
+
+def test_write_with_instance_permissions(client):
+    # `OwnerOnlyPermissionComponent` extends `AllowAuthenticatedPermissionComponent` (which doesn't need the instance)
+    # with an ownership check, so the rows have to be fetched and checked before being written
+    user = _create_user(first_name='John', last_name='Doe')
+
+    response = client.patch('/api/users/{}/owner_only/'.format(user.id), **_as_json({'last_name': 'New'}))
+    assert response.status_code == 403
+    response = client.delete('/api/users/{}/owner_only/'.format(user.id))
+    assert response.status_code == 403
+    assert _names() == [('John', 'Doe')]
+
+    own_user = _create_user(first_name='Filipe', last_name='Waitman')
+    response = client.patch('/api/users/{}/owner_only/'.format(own_user.id), **_as_json({'last_name': 'New'}))
+    assert response.status_code == 200
+    response = client.delete('/api/users/{}/owner_only/'.format(own_user.id))
+    assert response.status_code == 204
+    assert _names() == [('John', 'Doe')]
+
+
 def test_doublename(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
 
@@ -172,6 +486,44 @@ def test_pagination(client):
     assert len(response.json['results']) == 1
 
 
+def test_pagination_count_modes(client, mocker):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        _create_user(first_name=first_name, last_name='Doe')
+
+    response = client.get('/api/users/')
+    assert response.json['count'] == 3
+    assert response.json['count_mode'] == 'exact'
+
+    count = mocker.spy(OrmWrapper, '__len__')
+    response = client.get('/api/users/?count_mode=none&per_page=2')
+    assert response.status_code == 200
+    assert response.json['count'] is None
+    assert response.json['count_mode'] == 'none'
+    assert 'page=2' in response.json['next_page']
+    assert response.json['prev_page'] is None
+    assert [item['first_name'] for item in response.json['results']] == ['Filipe', 'John']
+    assert count.call_count == 0
+
+    response = client.get('/api/users/?count_mode=none&per_page=2&page=2')
+    assert response.json['next_page'] is None
+    assert 'page=1' in response.json['prev_page']
+    assert [item['first_name'] for item in response.json['results']] == ['Jane']
+
+    response = client.get('/api/users/?count_mode=capped&per_page=2')
+    assert response.json['count'] == '2+'
+    assert response.json['count_mode'] == 'capped'
+    assert len(response.json['results']) == 2
+
+    response = client.get('/api/users/?count_mode=capped&per_page=2&page=2')
+    assert response.json['count'] == '2+'
+    assert len(response.json['results']) == 1
+
+    # Not supported by SQLite: falls back to exact counting.
+    response = client.get('/api/users/?count_mode=estimated')
+    assert response.json['count'] == 3
+    assert response.json['count_mode'] == 'exact'
+
+
 def test_permissions(client, mocker):
     mocker.patch.object(MyBaseAPI, 'get_current_user', return_value=None)
     user = _create_user(first_name='Filipe', last_name='Waitman')
@@ -249,6 +601,64 @@ def test_no_pagination_list_via_query_params(client):
     assert response.json[0]['last_name'] == 'Waitman'
 
 
+def test_streaming_list(client):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        _create_user(first_name=first_name, last_name='Doe')
+
+    response = client.get('/api/users/streaming/')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert [item['first_name'] for item in response.json] == ['Filipe', 'John', 'Jane']
+    assert 'id' in response.json[0]
+    assert 'created' in response.json[0]
+
+
+def test_cursor_pagination(client):
+    for first_name, last_name in [('A', 'Smith'), ('B', 'Doe'), ('C', 'Doe'), ('D', 'Brown'), ('E', 'Smith')]:
+        _create_user(first_name=first_name, last_name=last_name)
+
+    pages = []
+    url = '/api/users/cursor/?x=y'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert 'count' not in response.json
+        pages.append([item['first_name'] for item in response.json['results']])
+        last_page, url = response.json, response.json['next_page']
+    assert pages == [['D', 'B'], ['C', 'A'], ['E']]
+    assert 'x=y' in last_page['prev_page']
+
+    pages = []
+    url = last_page['prev_page']
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([item['first_name'] for item in response.json['results']])
+        url = response.json['prev_page']
+    assert pages == [['C', 'A'], ['D', 'B']]
+
+    response = client.get('/api/users/cursor/?cursor=invalid')
+    assert response.status_code == 400
+    assert response.json == {'cursor': ['Invalid cursor.'], 'status_code': 400}
+
+
+def test_identity_map_by_queryset(mocker):
+    pk = _create_user(first_name='Filipe', last_name='Waitman').id
+    orm = PeeweeORMComponent({'model_class': User})
+    get_queryset_key = mocker.spy(PeeweeORMComponent, 'get_queryset_key')
+
+    with _count_selects() as queries:
+        queryset = User.select().where(User.last_name == 'Waitman')
+        instance = orm.get_object(queryset, pk)
+        assert orm.get_object(queryset, pk) is instance
+        # The SQL is only compiled to compare different queryset objects
+        assert get_queryset_key.call_count == 0
+        assert orm.get_object(User.select().where(User.last_name == 'Waitman'), pk) is instance
+        with pytest.raises(APIError):
+            orm.get_object(User.select().where(User.last_name == 'Doe'), pk)
+    assert len(queries) == 2
+
+
 def test_exception_behavior(client):
     response = client.get('/api/users/exception/handled/')
     assert response.status_code == 499
@@ -4,18 +4,25 @@ from flask import Blueprint, request
 
 from wrf.api.base import BaseAPI, api_view
 from wrf.base import APIError
+from wrf.cache.base import CacheComponent, LocalMemoryCacheBackend
 from wrf.framework.flask import FlaskFrameworkComponent
+from wrf.metrics import render_metrics
 from wrf.orm.sqlalchemy import SQLAlchemyORMComponent
-from wrf.pagination.base import NoPaginationComponent, PagePaginationComponent
-from wrf.permission.base import AllowAllPermissionComponent, AllowAuthenticatedPermissionComponent, ReadOnlyPermissionComponent
+from wrf.pagination.base import CursorPaginationComponent, NoPaginationComponent, PagePaginationComponent
+from wrf.permission.base import (AllowAllPermissionComponent, AllowAuthenticatedPermissionComponent, BasePermissionComponent,
+                                 ReadOnlyPermissionComponent)
 from wrf.schema.marshmallow_sqlalchemy import MarshmallowSQLAlchemySchemaComponent
+from wrf.throttle.base import LocalTokenBucketThrottleBackend, ThrottleComponent
 
 from .app import db
-from .models import User
-from .schemas import UserSchema
+from .models import Post, User
+from .schemas import PostSchema, UserSchema, UserWithPostsSchema
 
 users_api_bp = Blueprint('users_api', __name__)
 
+cache_backend = LocalMemoryCacheBackend()
+throttle_backend = LocalTokenBucketThrottleBackend()
+
 
 class MyBaseAPI(BaseAPI):
     orm_component_class = partial(SQLAlchemyORMComponent, session=db.session)
@@ -23,14 +30,29 @@ class MyBaseAPI(BaseAPI):
     framework_component_class = FlaskFrameworkComponent
     pagination_component_class = PagePaginationComponent
     permission_component_class = AllowAuthenticatedPermissionComponent
+    fields_param = 'fields'
 
     def get_current_user(self):
         return {'name': 'Filipe'}
 
 
+class ProtectDoePermissionComponent(BasePermissionComponent):
+    def check_permission(self, instance=None):
+        if instance is not None and instance.last_name == 'Doe':
+            raise APIError(403)
+
+
+class OwnerOnlyPermissionComponent(AllowAuthenticatedPermissionComponent):
+    def check_permission(self, instance=None):
+        super(OwnerOnlyPermissionComponent, self).check_permission(instance)
+        if instance is not None and instance.first_name != self.context['current_user']['name']:
+            raise APIError(403)
+
+
 class UserAPI(MyBaseAPI):
     model_class = User
     schema_class = UserSchema
+    dynamic_components = ('pagination',)
 
     def get_queryset(self):
         return User.query
@@ -73,12 +95,65 @@ class UserAPI(MyBaseAPI):
     def list_nopagination(self):
         return self._list()
 
+    @api_view(pagination_component_class=partial(NoPaginationComponent, stream=True, chunk_size=2))
+    def list_streaming(self):
+        return self._list()
+
+    @api_view(pagination_component_class=partial(CursorPaginationComponent, ordering=('last_name', 'id'), default_per_page=2,
+                                                 max_per_page=3))
+    def list_cursor(self):
+        return self._list()
+
+    @api_view(pagination_component_class=partial(CursorPaginationComponent, ordering=('created', 'id'), default_per_page=2))
+    def list_cursor_by_created(self):
+        return self._list()
+
+    @api_view(permission_component_class=ProtectDoePermissionComponent)
+    def bulk_delete_protected(self):
+        return self._bulk_delete()
+
     def get_pagination_component_class(self, api_method_name):
         if self.request.args.get('paginate') == 'f':
             return NoPaginationComponent
+        if self.request.args.get('count_mode'):
+            return partial(PagePaginationComponent, count_mode=self.request.args['count_mode'], count_cap=2, max_per_page=2)
         return super(UserAPI, self).get_pagination_component_class(api_method_name)
 
 
+class CachedUserAPI(UserAPI):
+    cache_component_class = partial(CacheComponent, backend=cache_backend)
+
+
+class ThrottledUserAPI(UserAPI):
+    throttle_component_class = partial(ThrottleComponent, limit=2, period=60, scope=('ip', 'endpoint'), backend=throttle_backend)
+
+
+class TimedUserAPI(UserAPI):
+    server_timing = True
+
+
+class ConditionalUserAPI(UserAPI):
+    validator_field = 'updated'
+
+
+class OwnerOnlyUserAPI(UserAPI):
+    permission_component_class = OwnerOnlyPermissionComponent
+
+
+class UserWithPostsAPI(UserAPI):
+    schema_class = UserWithPostsSchema
+    eager_load = ('posts',)
+
+
+class PostAPI(MyBaseAPI):
+    model_class = Post
+    schema_class = PostSchema
+    eager_load = ('author',)
+
+    def get_queryset(self):
+        return Post.query
+
+
 @users_api_bp.route('/', methods=['GET'])
 def list_():
     return UserAPI(request).list()
@@ -89,6 +164,84 @@ def create():
     return UserAPI(request).create()
 
 
+@users_api_bp.route('/bulk/', methods=['POST'])
+def bulk_create():
+    return UserAPI(request).bulk_create()
+
+
+@users_api_bp.route('/bulk/', methods=['PATCH'])
+def bulk_update():
+    return UserAPI(request).bulk_update()
+
+
+@users_api_bp.route('/bulk/', methods=['DELETE'])
+def bulk_delete():
+    return UserAPI(request).bulk_delete()
+
+
+@users_api_bp.route('/bulk/protected/', methods=['DELETE'])
+def bulk_delete_protected():
+    return UserAPI(request).bulk_delete_protected()
+
+
+@users_api_bp.route('/with_posts/', methods=['GET'])
+def with_posts_list():
+    return UserWithPostsAPI(request).list()
+
+
+@users_api_bp.route('/posts/', methods=['GET'])
+def posts_list():
+    return PostAPI(request).list()
+
+
+@users_api_bp.route('/cached/', methods=['GET', 'POST'])
+def cached_list_and_create():
+    if request.method == 'GET':
+        return CachedUserAPI(request).list()
+    return CachedUserAPI(request).create()
+
+
+@users_api_bp.route('/cached/<int:pk>/', methods=['GET', 'PATCH', 'DELETE'])
+def cached_retrieve_update_and_delete(pk):
+    if request.method == 'GET':
+        return CachedUserAPI(request).retrieve(pk)
+    if request.method == 'PATCH':
+        return CachedUserAPI(request).update(pk)
+    return CachedUserAPI(request).delete(pk)
+
+
+@users_api_bp.route('/throttled/', methods=['GET', 'POST'])
+def throttled_list_and_create():
+    if request.method == 'GET':
+        return ThrottledUserAPI(request).list()
+    return ThrottledUserAPI(request).create()
+
+
+@users_api_bp.route('/timed/', methods=['GET'])
+def timed_list():
+    return TimedUserAPI(request).list()
+
+
+@users_api_bp.route('/timed/<int:pk>/', methods=['GET'])
+def timed_retrieve(pk):
+    return TimedUserAPI(request).retrieve(pk)
+
+
+@users_api_bp.route('/conditional/', methods=['GET'])
+def conditional_list():
+    return ConditionalUserAPI(request).list()
+
+
+@users_api_bp.route('/conditional/<int:pk>/', methods=['GET'])
+def conditional_retrieve(pk):
+    return ConditionalUserAPI(request).retrieve(pk)
+
+
+@users_api_bp.route('/<int:pk>/owner_only/', methods=['GET'])
+def owner_only_retrieve(pk):
+    return OwnerOnlyUserAPI(request).retrieve(pk)
+
+
 @users_api_bp.route('/<int:pk>/', methods=['GET'])
 def retrieve(pk):
     return UserAPI(request).retrieve(pk)
@@ -114,6 +267,11 @@ def open_doublename(pk):
     return UserAPI(request).doublename_open(pk)
 
 
+@users_api_bp.route('/<int:pk>/with_posts/', methods=['GET'])
+def with_posts_retrieve(pk):
+    return UserWithPostsAPI(request).retrieve(pk)
+
+
 @users_api_bp.route('/read_only/', methods=['GET', 'POST'])
 def read_only_list_and_create():
     if request.method == 'GET':
@@ -131,6 +289,26 @@ def no_pagination_list():
     return UserAPI(request).list_nopagination()
 
 
+@users_api_bp.route('/streaming/', methods=['GET'])
+def streaming_list():
+    return UserAPI(request).list_streaming()
+
+
+@users_api_bp.route('/cursor/', methods=['GET'])
+def cursor_list():
+    return UserAPI(request).list_cursor()
+
+
+@users_api_bp.route('/cursor_by_created/', methods=['GET'])
+def cursor_by_created_list():
+    return UserAPI(request).list_cursor_by_created()
+
+
+@users_api_bp.route('/metrics/', methods=['GET'])
+def metrics():
+    return render_metrics(UserAPI.metrics_collector, FlaskFrameworkComponent, request)
+
+
 @users_api_bp.route('/exception/handled/', methods=['GET'])
 def handled_exception_list():
     return UserAPI(request).handled_exception()
@@ -8,8 +8,18 @@ class User(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     created = db.Column(db.DateTime, default=datetime.now)
+    updated = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     first_name = db.Column(db.String)
     last_name = db.Column(db.String)
 
     def __repr__(self):
         return '<User: {self.first_name} {self.last_name}>'.format(self=self)
+
+
+class Post(db.Model):
+    __tablename__ = 'post'
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String)
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    author = db.relationship(User, backref='posts')
@@ -2,7 +2,7 @@ from marshmallow import fields, validate
 from marshmallow_sqlalchemy import ModelSchema
 
 from .app import db
-from .models import User
+from .models import Post, User
 
 
 class UserSchema(ModelSchema):
@@ -14,3 +14,19 @@ class UserSchema(ModelSchema):
         sqla_session = db.session
         dump_only = ('id', 'created')
         fields = dump_only + ('first_name', 'last_name')
+
+
+class PostSchema(ModelSchema):
+    author = fields.Nested(UserSchema, only=('first_name', 'last_name'))
+
+    class Meta:
+        model = Post
+        sqla_session = db.session
+        fields = ('id', 'title', 'author')
+
+
+class UserWithPostsSchema(UserSchema):
+    posts = fields.Nested(PostSchema, many=True, only=('id', 'title'))
+
+    class Meta(UserSchema.Meta):
+        fields = UserSchema.Meta.fields + ('posts',)
@@ -1,15 +1,47 @@
 import json
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
 import pytest
-
-from .api import MyBaseAPI
+from flask import request
+from marshmallow import Schema, fields, post_dump, post_load
+from sqlalchemy import event
+from sqlalchemy.orm import Query
+
+from wrf.api.base import BaseAPI, api_view
+from wrf.base import APIError
+from wrf.cache.base import LocalMemoryCacheBackend
+from wrf.compat import utc
+from wrf.encoding import OrjsonJSONEncoder, StdlibJSONEncoder, UjsonJSONEncoder, orjson, ujson
+from wrf.error.base import DefaultErrorComponent
+from wrf.framework.flask import FlaskFrameworkComponent
+from wrf.metrics import MetricsCollector, MmapMetricsStore
+from wrf.orm.sqlalchemy import SQLAlchemyORMComponent
+from wrf.pagination.base import PagePaginationComponent, decode_cursor_value, encode_cursor_value
+from wrf.permission.base import AllowAuthenticatedPermissionComponent, ReadOnlyPermissionComponent
+from wrf.schema import compiled
+from wrf.schema.base import SchemaCache
+from wrf.schema.compiled import CompiledSQLAlchemySchemaComponent
+from wrf.schema.marshmallow_sqlalchemy import MarshmallowSQLAlchemySchemaComponent
+from wrf.throttle.base import LocalSlidingWindowThrottleBackend, LocalTokenBucketThrottleBackend
+from wrf.timing import BaseTimingSink, PhaseTimer
+
+from .api import (CachedUserAPI, MyBaseAPI, OwnerOnlyPermissionComponent, OwnerOnlyUserAPI, TimedUserAPI, UserAPI, UserWithPostsAPI,
+                  cache_backend, throttle_backend)
 from .app import db
-from .models import User
+from .models import Post, User
+from .schemas import UserSchema
 
 
 @pytest.fixture(autouse=True)
 def _setup():
     db.create_all()
+    cache_backend.clear()
+    throttle_backend.clear()
 
 
 def _create_user(**data):
@@ -20,6 +52,32 @@ def _create_user(**data):
     return user
 
 
+def _create_post(**data):
+    post = Post(**data)
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+@contextmanager
+def _count_selects():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _names():
+    return [(user.first_name, user.last_name) for user in User.query.order_by(User.first_name)]
+
+
 def _as_json(payload):
     return {
         'data': json.dumps(payload),
@@ -76,6 +134,174 @@ def test_create_errors(client):
     assert response.json == {'first_name': ['Missing data for required field.'], 'status_code': 400}
 
 
+def test_bulk_create(client):
+    data = [
+        {'first_name': 'Filipe', 'last_name': 'Waitman'},
+        {'first_name': 'John', 'last_name': 'Doe'},
+    ]
+
+    response = client.post('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 201
+    assert [item['first_name'] for item in response.json] == ['Filipe', 'John']
+    created = [(item['id'], item['first_name']) for item in response.json]
+    assert created == [(user.id, user.first_name) for user in User.query.order_by(User.id)]
+    assert 'created' in response.json[0]
+    assert User.query.count() == 2
+
+
+def test_bulk_create_errors(client):
+    data = [
+        {'first_name': 'Filipe', 'last_name': 'Waitman'},
+        {'first_name': 'John'},
+        {'first_name': '', 'last_name': 'Doe'},
+    ]
+
+    response = client.post('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 400
+    assert response.json == {
+        '1': {'last_name': ['Missing data for required field.']},
+        '2': {'first_name': ['Shorter than minimum length 1.']},
+        'status_code': 400,
+    }
+    assert User.query.count() == 0
+
+    response = client.post('/api/users/bulk/', **_as_json({'first_name': 'Filipe', 'last_name': 'Waitman'}))
+    assert response.status_code == 400
+    assert response.json == {'_schema': ['Invalid input type.'], 'status_code': 400}
+
+
+def test_bulk_update(client):
+    filipe, john, jane = [_create_user(first_name=first_name, last_name='Waitman') for first_name in ('Filipe', 'John', 'Jane')]
+    data = [
+        {'pk': filipe.id, 'fields': {'last_name': 'Doe'}},
+        {'pk': john.id, 'fields': {'last_name': 'Doe'}},
+        {'pk': jane.id, 'fields': {'first_name': 'Janet'}},
+        {'pk': 9999, 'fields': {'first_name': 'Nobody'}},
+    ]
+
+    response = client.patch('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 200
+    assert response.json == {'updated': 3}
+    assert _names() == [('Filipe', 'Doe'), ('Janet', 'Waitman'), ('John', 'Doe')]
+
+
+def test_bulk_update_errors(client):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    data = [
+        {'pk': user.id, 'fields': {'last_name': 'Doe'}},
+        {'pk': user.id, 'fields': {'first_name': ''}},
+        {'fields': {'first_name': 'John'}},
+    ]
+
+    response = client.patch('/api/users/bulk/', **_as_json(data))
+    assert response.status_code == 400
+    assert response.json == {
+        '1': {'first_name': ['Shorter than minimum length 1.']},
+        '2': {'_schema': ['Expected an object with "pk" and "fields".']},
+        'status_code': 400,
+    }
+    assert _names() == [('Filipe', 'Waitman')]
+
+
+def test_deserialize_partial(app):
+    class SignedUserSchema(UserSchema):
+        @post_load
+        def add_signature(self, data):
+            data['last_name'] = '{} (signed)'.format(data['last_name'])
+            return data
+
+    schema_component = MarshmallowSQLAlchemySchemaComponent({'schema_class': SignedUserSchema})
+    with _count_selects() as selects:
+        data = schema_component.deserialize_partial({'last_name': 'Doe'})
+    assert data == {'last_name': 'Doe (signed)'}
+    assert selects == []
+    assert User.query.count() == 0
+
+    with pytest.raises(APIError) as excinfo:
+        schema_component.deserialize_partial({'first_name': ''})
+    assert excinfo.value.extra == {'first_name': ['Shorter than minimum length 1.']}
+
+
+def test_bulk_delete(client):
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    _create_user(first_name='John', last_name='Doe')
+    _create_user(first_name='Jane', last_name='Doe')
+    post_pk = _create_post(title='Post', author=filipe).id
+
+    response = client.delete('/api/users/bulk/', **_as_json([filipe.id, 9999]))
+    assert response.status_code == 200
+    assert response.json == {'deleted': 1}
+    assert _names() == [('Jane', 'Doe'), ('John', 'Doe')]
+    # Users are deleted through the session, which unlinks their posts
+    assert Post.query.get(post_pk).author_id is None
+
+    response = client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': 'Doe'}}))
+    assert response.status_code == 200
+    assert response.json == {'deleted': 2}
+    assert _names() == []
+
+
+def test_bulk_delete_errors(client):
+    response = client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': 'Doe', 'password': 'x'}}))
+    assert response.status_code == 400
+    assert response.json == {'filter': {'password': ['Unknown field.']}, 'status_code': 400}
+
+    response = client.delete('/api/users/bulk/', **_as_json({'filter': {}}))
+    assert response.status_code == 400
+    assert response.json == {'_schema': ['Expected a list of pks or a non-empty "filter" object.'], 'status_code': 400}
+
+    response = client.delete('/api/users/bulk/', **_as_json({'filter': {'last_name': ''}}))
+    assert response.status_code == 400
+    assert response.json == {'filter': {'last_name': ['Shorter than minimum length 1.']}, 'status_code': 400}
+
+
+def test_bulk_delete_filters_by_columns_only(app):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    _create_post(title='Post', author=user)
+    data = json.dumps({'filter': {'first_name': 'Filipe', 'posts': [{'id': 1}], 'id': user.id}})
+
+    with app.test_request_context('/', method='DELETE', data=data, content_type='application/json'):
+        response = UserWithPostsAPI(request).bulk_delete()
+    assert response.status_code == 400
+    assert response.json == {'filter': {'id': ['Not filterable.'], 'posts': ['Not filterable.']}, 'status_code': 400}
+    assert User.query.count() == 1
+
+
+def test_bulk_delete_checks_instance_permissions(client):
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    john = _create_user(first_name='John', last_name='Doe')
+
+    response = client.delete('/api/users/bulk/protected/', **_as_json([filipe.id, john.id]))
+    assert response.status_code == 403
+    assert User.query.count() == 2
+
+    response = client.delete('/api/users/bulk/protected/', **_as_json([filipe.id]))
+    assert response.status_code == 200
+    assert response.json == {'deleted': 1}
+    assert User.query.count() == 1
+
+
+def test_permission_subclasses_get_the_instance(app):
+    class OptedOutPermissionComponent(OwnerOnlyPermissionComponent):
+        instance_dependent = False
+
+    class InheritingPermissionComponent(OptedOutPermissionComponent):
+        pass
+
+    assert not AllowAuthenticatedPermissionComponent.is_instance_dependent()
+    # Overriding `check_permission` makes it instance dependent again, unless opted out explicitly
+    assert OwnerOnlyPermissionComponent.is_instance_dependent()
+    assert not OptedOutPermissionComponent.is_instance_dependent()
+    assert not InheritingPermissionComponent.is_instance_dependent()
+
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    john = _create_user(first_name='John', last_name='Doe')
+    with app.test_request_context('/', method='DELETE', data=json.dumps([filipe.id, john.id]), content_type='application/json'):
+        response = OwnerOnlyUserAPI(request).bulk_delete()
+    assert response.status_code == 403
+    assert User.query.count() == 2
+
+
 def test_retrieve(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
 
@@ -93,6 +319,358 @@ def test_retrieve_errors(client):
     assert response.json == {'status_code': 404}
 
 
+def test_sparse_fieldsets(client):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get('/api/users/?fields=first_name,id')
+        assert response.status_code == 200
+        assert response.json['results'] == [{'id': user.id, 'first_name': 'Filipe'}]
+
+        response = client.get('/api/users/{}/?fields=last_name'.format(user.id))
+        assert response.status_code == 200
+        assert response.json == {'last_name': 'Waitman'}
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    selects = [statement for statement in statements if 'FROM user' in statement and 'count(' not in statement]
+    assert len(selects) == 2
+    assert all('created' not in statement for statement in selects)
+
+    response = client.get('/api/users/?fields=first_name,password')
+    assert response.status_code == 400
+    assert response.json == {'fields': {'password': ['Unknown field.']}, 'status_code': 400}
+
+
+def test_sparse_fieldsets_opt_in(app):
+    class DefaultUserAPI(UserAPI):
+        fields_param = BaseAPI.fields_param
+
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    with app.test_request_context('/?fields=password'):
+        response = DefaultUserAPI(request).retrieve(user.id)
+    assert response.status_code == 200
+    assert response.json['first_name'] == 'Filipe'
+    assert response.json['last_name'] == 'Waitman'
+
+
+def test_eager_load(client):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        user = _create_user(first_name=first_name, last_name='Waitman')
+        for title in ('First', 'Second'):
+            _create_post(title=title, author=user)
+
+    with _count_selects() as queries:
+        response = client.get('/api/users/posts/?per_page=10')
+    assert response.status_code == 200
+    assert len(response.json['results']) == 6
+    assert response.json['results'][0]['author'] == {'first_name': 'Filipe', 'last_name': 'Waitman'}
+    assert len(queries) == 2  # count and the page, with authors joined
+
+    with _count_selects() as queries:
+        response = client.get('/api/users/with_posts/')
+    assert response.status_code == 200
+    assert [[post['title'] for post in item['posts']] for item in response.json['results']] == [['First', 'Second']] * 3
+    assert len(queries) == 3  # count, the page and all their posts
+
+    with _count_selects() as queries:
+        response = client.get('/api/users/{}/with_posts/'.format(user.id))
+    assert response.status_code == 200
+    assert [post['title'] for post in response.json['posts']] == ['First', 'Second']
+    assert len(queries) == 2
+
+    response = client.get('/api/users/posts/?fields=title')
+    assert response.status_code == 200
+    assert response.json['results'][0] == {'title': 'First'}
+
+
+def test_list_rows(client, mocker):
+    for first_name, last_name in [('A', 'Smith'), ('B', 'Doe'), ('C', 'Doe')]:
+        user = _create_user(first_name=first_name, last_name=last_name)
+        _create_post(title='Title', author=user)
+    urls = ['/api/users/', '/api/users/?fields=first_name,id', '/api/users/?paginate=f', '/api/users/cursor/',
+            '/api/users/cursor/?per_page=5&fields=first_name', '/api/users/streaming/', '/api/users/with_posts/']
+    expected = [client.get(url).json for url in urls]
+
+    mocker.patch.object(UserAPI, 'list_rows', True)
+    rows_queryset = mocker.spy(SQLAlchemyORMComponent, 'rows_queryset')
+    for url, expected_json in zip(urls, expected):
+        with _count_selects() as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json == expected_json
+        if url != '/api/users/with_posts/':
+            assert rows_queryset.spy_return is not None
+            assert all('user.updated' not in query for query in queries)
+    assert rows_queryset.spy_return is None  # `posts` is not a column, so instances are used
+
+
+def test_cache(client):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    def get(url):
+        with _count_selects() as queries:
+            response = client.get(url)
+        return response, len(queries)
+
+    response, num_queries = get('/api/users/cached/')
+    assert [item['first_name'] for item in response.json['results']] == ['Filipe']
+    assert num_queries == 2
+    cached_response, num_queries = get('/api/users/cached/')
+    assert cached_response.json == response.json
+    assert num_queries == 0
+    _, num_queries = get('/api/users/cached/?page=1')
+    assert num_queries == 2
+
+    response, num_queries = get('/api/users/cached/{}/'.format(user.id))
+    assert response.json['first_name'] == 'Filipe'
+    assert num_queries == 1
+    cached_response, num_queries = get('/api/users/cached/{}/'.format(user.id))
+    assert cached_response.json == response.json
+    assert num_queries == 0
+
+    # Writes invalidate what they affect
+    client.patch('/api/users/cached/{}/'.format(user.id), **_as_json({'first_name': 'John'}))
+    assert get('/api/users/cached/{}/'.format(user.id))[0].json['first_name'] == 'John'
+    assert [item['first_name'] for item in get('/api/users/cached/')[0].json['results']] == ['John']
+
+    client.post('/api/users/cached/', **_as_json({'first_name': 'Jane', 'last_name': 'Doe'}))
+    assert [item['first_name'] for item in get('/api/users/cached/')[0].json['results']] == ['John', 'Jane']
+
+    client.delete('/api/users/cached/{}/'.format(user.id))
+    assert get('/api/users/cached/{}/'.format(user.id))[0].status_code == 404
+    assert [item['first_name'] for item in get('/api/users/cached/')[0].json['results']] == ['Jane']
+
+    # Writes done elsewhere are only seen once entries expire
+    _create_user(first_name='Mary', last_name='Doe')
+    assert [item['first_name'] for item in get('/api/users/cached/')[0].json['results']] == ['Jane']
+
+
+def test_cache_per_api(app):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    _create_post(title='Post', author=user)
+
+    class CachedUserWithPostsAPI(UserWithPostsAPI):
+        cache_component_class = CachedUserAPI.cache_component_class
+
+    class CachedDoesAPI(CachedUserAPI):
+        def get_queryset(self):
+            return User.query.filter_by(last_name='Doe')
+
+    # Same model, same pk: each API still gets its own schema and queryset
+    with app.test_request_context('/'):
+        for _ in range(2):
+            response = CachedUserAPI(request).retrieve(user.id)
+            assert response.status_code == 200
+            assert response.mimetype == 'application/json'
+            assert 'posts' not in response.json
+            assert CachedUserWithPostsAPI(request).retrieve(user.id).json['posts'] == [{'id': 1, 'title': 'Post'}]
+            assert CachedDoesAPI(request).retrieve(user.id).status_code == 404
+
+
+def test_cache_keys(app):
+    def get_cache_component(query_string=''):
+        with app.test_request_context('/?{}'.format(query_string)):
+            api = CachedUserAPI(request)
+            api.init_context('list')
+            api.cache_component.get_key()  # Reads the request while in its context
+            return api.cache_component
+
+    # Every value of repeated parameters counts
+    key = get_cache_component('last_name=Doe&last_name=Waitman&page=1').get_key()
+    assert key == get_cache_component('page=1&last_name=Doe&last_name=Waitman').get_key()
+    assert key != get_cache_component('last_name=Doe&last_name=Other&page=1').get_key()
+    assert key != get_cache_component('last_name=Doe&page=1').get_key()
+
+    # A response is stored under the key it was looked up with, so one read before an invalidation is never served
+    cache_component = get_cache_component()
+    assert cache_component.get_response() is None
+    get_cache_component().invalidate()
+    cache_component.set_response({'results': []}, 200)
+    assert get_cache_component().get_response() is None
+    cache_component = get_cache_component()
+    cache_component.get_response()
+    cache_component.set_response({'results': []}, 200)
+    assert get_cache_component().get_response() == (b'{"results":[]}', 200)
+
+
+def test_cache_backend(app, mocker):
+    backend = LocalMemoryCacheBackend(max_size=2)
+    backend.set('a', 1)
+    backend.set('b', 2, ttl=10)
+    assert backend.get('a') == 1
+    backend.set('c', 3)
+    assert backend.get('b') is None  # least recently used
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+
+    now = time.time()
+    backend.set('a', 1, ttl=10)
+    mocker.patch('time.time', return_value=now + 11)
+    assert backend.get('a') is None
+    assert backend.get('c') == 3
+
+
+def test_throttle(client, mocker):
+    now = time.time()
+    mocker.patch('time.time', return_value=now)
+    _create_user(first_name='Filipe', last_name='Waitman')
+    get_queryset = mocker.spy(UserAPI, 'get_queryset')
+
+    assert client.get('/api/users/throttled/').status_code == 200
+    assert client.get('/api/users/throttled/').status_code == 200
+    response = client.get('/api/users/throttled/')
+    assert response.status_code == 429
+    assert response.json == {'status_code': 429}
+    assert response.headers['Retry-After'] == '30'
+    assert get_queryset.call_count == 2  # the database is not touched by throttled requests
+
+    # Limits are per endpoint and per client IP address
+    assert client.post('/api/users/throttled/', **_as_json({'first_name': 'John', 'last_name': 'Doe'})).status_code == 201
+    assert client.get('/api/users/throttled/', environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 200
+    assert client.get('/api/users/').status_code == 200
+
+    mocker.patch('time.time', return_value=now + 30)
+    assert client.get('/api/users/throttled/').status_code == 200
+    assert client.get('/api/users/throttled/').status_code == 429
+
+
+@pytest.mark.parametrize('backend_class', [LocalTokenBucketThrottleBackend, LocalSlidingWindowThrottleBackend])
+def test_throttle_backends(app, mocker, backend_class):
+    backend = backend_class(max_size=2)
+    now = 6000.0
+    mocker.patch('time.time', return_value=now)
+    assert [backend.hit('a', 3, 60) for _ in range(3)] == [0, 0, 0]
+    assert 0 < backend.hit('a', 3, 60) <= 60
+    assert backend.hit('b', 3, 60) == 0
+
+    mocker.patch('time.time', return_value=now + 120)
+    assert [backend.hit('a', 3, 60) for _ in range(3)] == [0, 0, 0]
+    assert backend.hit('a', 3, 60) > 0
+
+    # Least recently used keys are forgotten first
+    backend.hit('c', 1, 60)
+    assert backend.hit('a', 3, 60) > 0
+    backend.hit('d', 1, 60)
+    backend.hit('e', 1, 60)
+    assert backend.hit('a', 3, 60) == 0
+
+
+def test_sliding_window_throttle_backend(app, mocker):
+    backend = LocalSlidingWindowThrottleBackend()
+    mocker.patch('time.time', return_value=6000.0)
+    assert [backend.hit('a', 4, 60) for _ in range(4)] == [0, 0, 0, 0]
+
+    # Halfway through the next window, half of the previous window requests still count
+    mocker.patch('time.time', return_value=6090.0)
+    assert [backend.hit('a', 4, 60) for _ in range(2)] == [0, 0]
+    assert backend.hit('a', 4, 60) == 15
+    mocker.patch('time.time', return_value=6105.0)
+    assert backend.hit('a', 4, 60) == 0
+
+
+def _server_timing_phases(response):
+    return [item.split(';')[0] for item in response.headers['Server-Timing'].split(', ')]
+
+
+def test_server_timing(client, mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    response = client.get('/api/users/timed/')
+    assert response.status_code == 200
+    assert response.json['results'][0]['first_name'] == 'Filipe'
+    phases = _server_timing_phases(response)
+    assert phases[0] == 'init'
+    assert phases[-1] == 'total'
+    assert {'permission', 'orm', 'pagination', 'schema', 'framework'} <= set(phases)
+
+    response = client.get('/api/users/timed/{}/'.format(user.id))
+    assert {'init', 'permission', 'orm', 'schema', 'framework', 'total'} <= set(_server_timing_phases(response))
+
+    response = client.get('/api/users/timed/999/')
+    assert response.status_code == 404
+    assert 'total' in _server_timing_phases(response)
+
+    # Disabled by default
+    response = client.get('/api/users/')
+    assert 'Server-Timing' not in response.headers
+
+
+def test_timing_sink(client, mocker):
+    _create_user(first_name='Filipe', last_name='Waitman')
+    sink = mocker.Mock(spec=BaseTimingSink)
+    mocker.patch.object(TimedUserAPI, 'server_timing', False)
+    mocker.patch.object(TimedUserAPI, 'timing_sink', sink, create=True)
+
+    response = client.get('/api/users/timed/')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+    sink.record.assert_called_once_with('TimedUserAPI', 'list', mocker.ANY)
+    timings = sink.record.call_args[0][2]
+    assert timings['total'] >= sum(duration for name, duration in timings.items() if name != 'total')
+
+
+def test_phase_timer(app, mocker):
+    mocker.patch('wrf.timing.default_timer', side_effect=[0, 1, 3, 4, 6, 7, 8, 10])
+    timer = PhaseTimer()  # 0
+    with timer.phase('pagination'):  # 1
+        with timer.phase('schema'):  # 3
+            pass  # 4
+        timer.start('orm')  # 6
+        timer.stop()  # 7
+    timer.finish()  # 8 (pagination stopped), 10
+    assert timer.get_timings() == {'pagination': 5, 'schema': 1, 'orm': 1, 'total': 10}
+    assert timer.get_header_value() == 'pagination;dur=5000.00, schema;dur=1000.00, orm;dur=1000.00, total;dur=10000.00'
+
+
+def test_conditional_retrieve(client):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    url = '/api/users/conditional/{}/'.format(user.id)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+
+    with _count_selects() as queries:
+        response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert len(queries) == 1  # Just the validator, nothing is loaded nor serialized
+
+    assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get(url, headers={'If-None-Match': '"something-else"'}).status_code == 200
+    assert client.get('/api/users/conditional/999/', headers={'If-None-Match': etag}).status_code == 404
+
+    client.patch('/api/users/{}/'.format(user.id), **_as_json({'first_name': 'John'}))
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['first_name'] == 'John'
+    assert response.headers['ETag'] != etag
+
+
+def test_conditional_list(client):
+    _create_user(first_name='Filipe', last_name='Waitman')
+
+    response = client.get('/api/users/conditional/')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    with _count_selects() as queries:
+        response = client.get('/api/users/conditional/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert len(queries) == 1
+
+    _create_user(first_name='John', last_name='Doe')
+    response = client.get('/api/users/conditional/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['count'] == 2
+
+
 def test_update(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
     data = {
@@ -110,6 +688,25 @@ def test_update(client):
     assert instance.last_name == 'New'
 
 
+def test_update_post_load(app):
+    # Named so it runs before `ModelSchema.make_instance` (marshmallow runs hooks in alphabetical order)
+    class SignedUserSchema(UserSchema):
+        @post_load
+        def add_signature(self, data):
+            data['last_name'] = '{} (signed)'.format(data['last_name'])
+            return data
+
+    class SignedUserAPI(UserAPI):
+        schema_class = SignedUserSchema
+
+    pk = _create_user(first_name='Filipe', last_name='Waitman').id
+    with app.test_request_context('/', method='PATCH', data=json.dumps({'last_name': 'New'}), content_type='application/json'):
+        response = SignedUserAPI(request).update(pk)
+    assert response.status_code == 200
+    assert response.json['last_name'] == 'New (signed)'
+    assert User.query.get(pk).last_name == 'New (signed)'
+
+
 def test_update_errors(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
     data = {
@@ -132,6 +729,24 @@ def test_delete(client):
     assert User.query.filter_by(id=user.id).count() == 0
 
 
+def test_delete_object_by_pk(client):
+    orm = SQLAlchemyORMComponent({'model_class': User}, session=db.session)
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    # Users have posts, which `Session.delete` unlinks
+    assert orm.delete_object_by_pk(User.query, user.id) is None
+    assert User.query.count() == 1
+
+    orm = SQLAlchemyORMComponent({'model_class': Post}, session=db.session)
+    pk = _create_post(title='Post', author=user).id
+    with _count_selects() as queries:
+        assert orm.delete_object_by_pk(Post.query, pk) is True
+        with pytest.raises(APIError) as e:
+            orm.delete_object_by_pk(Post.query, pk)
+    assert e.value.status_code == 404
+    assert len(queries) == 0
+    assert Post.query.count() == 0
+
+
 def test_doublename(client):
     user = _create_user(first_name='Filipe', last_name='Waitman')
 
@@ -141,6 +756,55 @@ def test_doublename(client):
     assert response.headers['header-passed-in'] == '1'
 
 
+def test_identity_map(app):
+    pk = _create_user(first_name='Filipe', last_name='Waitman').id
+    with app.test_request_context('/'):
+        api = UserAPI(request)
+        api.init_context('retrieve')
+        orm = api.orm_component
+        with _count_selects() as queries:
+            instance = orm.get_object(api.get_queryset(), pk)
+            assert orm.get_object(api.get_queryset(), pk) is instance
+            assert len(queries) == 1
+            for _ in range(2):
+                with pytest.raises(APIError):
+                    orm.get_object(api.get_queryset(), pk + 1)
+            assert len(queries) == 3  # Missing objects are not remembered
+
+            orm.update_object(instance, {'first_name': 'John'})
+            assert orm.identity_map == {}
+            assert orm.get_object(api.get_queryset(), pk).first_name == 'John'
+            orm.delete_object(instance)
+            assert orm.identity_map == {}
+
+        # Each request has its own
+        api.init_context('retrieve')
+        assert api.orm_component is not orm
+        assert api.orm_component.identity_map == {}
+
+    pk = _create_user(first_name='Filipe', last_name='Waitman').id
+    with app.test_request_context('/?fields=first_name'):
+        api = UserAPI(request)
+        api.init_context('retrieve')
+        api.orm_component.get_object(api.get_projected_queryset(), pk)
+        assert api.orm_component.identity_map == {}  # Instances may lack some columns
+
+    orm = SQLAlchemyORMComponent({'model_class': User}, session=db.session, identity_map=False)
+    with _count_selects() as queries:
+        orm.get_object(User.query, pk)
+        orm.get_object(User.query, pk)
+    assert len(queries) == 2
+
+    # Querysets filtered differently don't share instances
+    orm = SQLAlchemyORMComponent({'model_class': User}, session=db.session)
+    with _count_selects() as queries:
+        assert orm.get_object(User.query.filter_by(last_name='Waitman'), pk).id == pk
+        with pytest.raises(APIError):
+            orm.get_object(User.query.filter_by(last_name='Doe'), pk)
+        orm.get_object(User.query.filter_by(last_name='Waitman'), pk)
+    assert len(queries) == 2
+
+
 def test_pagination(client):
     _create_user(first_name='Filipe', last_name='Waitman')
     _create_user(first_name='John', last_name='Doe')
@@ -173,6 +837,52 @@ def test_pagination(client):
     assert len(response.json['results']) == 1
 
 
+def test_pagination_count_modes(client, mocker):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        _create_user(first_name=first_name, last_name='Doe')
+
+    response = client.get('/api/users/')
+    assert response.json['count'] == 3
+    assert response.json['count_mode'] == 'exact'
+
+    count = mocker.spy(Query, 'count')
+    response = client.get('/api/users/?count_mode=none&per_page=2')
+    assert response.status_code == 200
+    assert response.json['count'] is None
+    assert response.json['count_mode'] == 'none'
+    assert 'page=2' in response.json['next_page']
+    assert response.json['prev_page'] is None
+    assert [item['first_name'] for item in response.json['results']] == ['Filipe', 'John']
+    assert count.call_count == 0
+
+    response = client.get('/api/users/?count_mode=none&per_page=2&page=2')
+    assert response.json['next_page'] is None
+    assert 'page=1' in response.json['prev_page']
+    assert [item['first_name'] for item in response.json['results']] == ['Jane']
+
+    response = client.get('/api/users/?count_mode=capped&per_page=2')
+    assert response.json['count'] == '2+'
+    assert response.json['count_mode'] == 'capped'
+    assert len(response.json['results']) == 2
+
+    response = client.get('/api/users/?count_mode=capped&per_page=2&page=2')
+    assert response.json['count'] == '2+'
+    assert len(response.json['results']) == 1
+
+    # `per_page` is kept within 1 (no `LIMIT` of 0 or less) and `max_per_page`
+    for count_mode in ('exact', 'none', 'capped'):
+        for per_page, expected_first_names in (('0', ['Filipe']), ('-1', ['Filipe']), ('5', ['Filipe', 'John'])):
+            response = client.get('/api/users/?count_mode={}&per_page={}'.format(count_mode, per_page))
+            assert response.status_code == 200
+            assert [item['first_name'] for item in response.json['results']] == expected_first_names
+            assert 'page=2' in response.json['next_page']
+
+    # Not supported by SQLite: falls back to exact counting.
+    response = client.get('/api/users/?count_mode=estimated')
+    assert response.json['count'] == 3
+    assert response.json['count_mode'] == 'exact'
+
+
 def test_permissions(client, mocker):
     mocker.patch.object(MyBaseAPI, 'get_current_user', return_value=None)
     user = _create_user(first_name='Filipe', last_name='Waitman')
@@ -250,6 +960,266 @@ def test_no_pagination_list_via_query_params(client):
     assert response.json[0]['last_name'] == 'Waitman'
 
 
+def test_streaming_list(client):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        _create_user(first_name=first_name, last_name='Doe')
+
+    response = client.get('/api/users/streaming/')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert [item['first_name'] for item in response.json] == ['Filipe', 'John', 'Jane']
+    assert 'id' in response.json[0]
+    assert 'created' in response.json[0]
+
+
+@pytest.mark.parametrize('encoder_class', [StdlibJSONEncoder, UjsonJSONEncoder, OrjsonJSONEncoder])
+def test_json_encoders(app, encoder_class):
+    if encoder_class is UjsonJSONEncoder and ujson is None:
+        pytest.skip('ujson is not installed')
+    if encoder_class is OrjsonJSONEncoder and orjson is None:
+        pytest.skip('orjson is not installed')
+
+    encoder = encoder_class()
+    data = {'name': 'João', 'when': datetime(2020, 1, 2, 3, 4, 5), 'price': Decimal('1.50'), 1: None}
+    encoded = encoder.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert b' ' not in encoded
+    assert encoder.loads(encoded) == {'name': 'João', 'when': '2020-01-02T03:04:05', 'price': '1.50', '1': None}
+    assert encoder.loads(encoded.decode('utf-8')) == encoder.loads(encoded)
+    with pytest.raises(ValueError):
+        encoder.loads(b'{invalid')
+
+
+def test_pluggable_json_encoder(client, mocker):
+    _create_user(first_name='Filipe', last_name='Waitman')
+    encoder = StdlibJSONEncoder()
+    mocker.patch.object(FlaskFrameworkComponent, 'json_encoder', encoder)
+    dumps = mocker.spy(encoder, 'dumps')
+    loads = mocker.spy(encoder, 'loads')
+
+    response = client.get('/api/users/')
+    assert response.status_code == 200
+    assert response.content_type == 'application/json'
+    assert response.json['results'][0]['first_name'] == 'Filipe'
+    assert b', ' not in response.data
+    assert dumps.call_count == 1
+
+    response = client.post('/api/users/', **_as_json({'first_name': 'John', 'last_name': 'Doe'}))
+    assert response.status_code == 201
+    assert loads.call_count == 1
+
+    response = client.get('/api/users/streaming/')
+    assert [item['first_name'] for item in response.json] == ['Filipe', 'John']
+    assert dumps.call_count == 3
+
+
+def test_invalid_json_body(client):
+    # Rejected by Flask (`request.on_json_loading_failed`), before validation
+    response = client.post('/api/users/', data='{invalid', content_type='application/json')
+    assert response.status_code == 400
+    assert response.json is None
+    assert User.query.count() == 0
+
+    response = client.post('/api/users/', data='', content_type='application/json')
+    assert response.status_code == 400
+    assert response.json['last_name'] == ['Missing data for required field.']
+
+
+def test_compiled_schema_component(client, mocker):
+    for first_name in ('Filipe', 'John', 'Jane'):
+        user = _create_user(first_name=first_name, last_name='Waitman')
+        for title in ('First', 'Second'):
+            _create_post(title=title, author=user)
+    urls = ['/api/users/', '/api/users/{}/'.format(user.id), '/api/users/posts/', '/api/users/with_posts/',
+            '/api/users/{}/with_posts/'.format(user.id), '/api/users/posts/?fields=title,author', '/api/users/no_pagination/']
+    expected = [client.get(url).data for url in urls]
+
+    # Component classes are resolved once per view, so the compiled serialization is swapped in rather than the class
+    mocker.patch.object(MarshmallowSQLAlchemySchemaComponent, 'serialize', CompiledSQLAlchemySchemaComponent.serialize)
+    compile_dump_function = mocker.spy(compiled, 'compile_dump_function')
+    for _ in range(2):  # Compiled functions are only used once marshmallow has dumped objects of each type
+        assert [client.get(url).data for url in urls] == expected
+    assert compile_dump_function.call_count > 0
+
+
+def test_compiled_schema_dump(app):
+    class NestedSchema(Schema):
+        value = fields.Integer()
+
+        class Meta:
+            fields = ('value', 'implicit')
+
+    class EdgeCaseSchema(Schema):
+        text = fields.String(dump_to='renamed')
+        number = fields.Integer(as_string=True)
+        ratio = fields.Float(attribute='inner.ratio')
+        flag = fields.Boolean()
+        when = fields.DateTime()
+        year = fields.DateTime(format='%Y')
+        nested = fields.Nested(NestedSchema)
+        nested_many = fields.Nested(NestedSchema, many=True, only=('value',))
+        method = fields.Method('get_method')
+        missing = fields.String(default='default')
+        secret = fields.String(load_only=True)
+
+        def get_method(self, obj):
+            return obj['text'] * 2 if isinstance(obj, dict) else obj.text * 2
+
+    class HookedSchema(EdgeCaseSchema):
+        @post_dump
+        def add_hook(self, data):
+            data['hooked'] = True
+            return data
+
+    class Obj(object):
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    Row = namedtuple('Row', ['text', 'number', 'ratio', 'flag'])
+
+    def make_objects():
+        return [
+            Obj(text='a', number=1, inner=Obj(ratio='1.5'), flag='t', when=datetime(2020, 1, 2), year=datetime(2020, 1, 2),
+                nested=Obj(value='3', implicit=Decimal('4')), nested_many=[Obj(value=5, implicit=6)], secret='x'),
+            Obj(text=b'b', number=None, inner=Obj(ratio=None), flag=0, when=None, year=None, nested=None, nested_many=[],
+                secret='x'),
+            {'text': 'c', 'number': 2, 'inner': {'ratio': 2}, 'flag': 1, 'nested': {'value': 7, 'implicit': 8}},
+            Row('d', 3, Row('e', 4, None, False), None),
+        ]
+
+    for schema_class in (EdgeCaseSchema, HookedSchema):
+        schema, reference = schema_class(), schema_class()
+        for many in (True, False):
+            for _ in range(2):
+                objects = make_objects()
+                result = compiled.dump(schema, objects if many else objects[0], many=many)
+                assert result == reference.dump(objects if many else objects[0], many=many).data
+        assert (compiled.compile_dump_function(schema) is None) == (schema_class is HookedSchema)
+    assert result['renamed'] == 'a'
+    assert result['missing'] == 'default'
+    assert 'secret' not in result
+    assert result['nested'] == {'value': 3, 'implicit': Decimal('4')}
+
+
+def test_compiled_schema_dump_errors(app):
+    class ErrorSchema(Schema):
+        number = fields.Integer()
+        when = fields.DateTime()
+        exact = fields.Decimal()
+        failing = fields.String()
+
+    class Obj(object):
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+        @property
+        def failing(self):
+            if self.__dict__.get('fail'):
+                self.attempts = self.__dict__.get('attempts', 0) + 1
+                raise RuntimeError('Boom')
+            return 'ok'
+
+    schema, reference = ErrorSchema(), ErrorSchema()
+    compiled.dump(schema, Obj(number=1, when=datetime(2020, 1, 2), exact=Decimal('1')))
+    assert compiled.compile_dump_function(schema) is not None
+
+    # Values marshmallow can't dump are left for it to report
+    for obj in [Obj(number='x'), Obj(when='2020-01-02'), Obj(exact='x')]:
+        assert compiled.dump(schema, obj) == reference.dump(obj).data
+
+    # Other errors are raised right away, instead of dumping the object again
+    obj = Obj(fail=True)
+    with pytest.raises(RuntimeError):
+        compiled.dump(schema, obj)
+    assert obj.attempts == 1
+
+
+def test_compiled_schema_unsupported_marshmallow(app, monkeypatch, mocker):
+    monkeypatch.setattr(compiled, 'COMPILATION_SUPPORTED', False)
+    compile_spy = mocker.spy(compiled, 'compile_dump_function')
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    schema_component = CompiledSQLAlchemySchemaComponent({'schema_class': UserSchema})
+
+    for _ in range(2):
+        assert schema_component.serialize([user], many=True) == UserSchema(many=True).dump([user]).data
+    assert compiled.compile_dump_function(UserSchema()) is None
+    assert compiled.dump(UserSchema(), user) == UserSchema().dump(user).data
+    assert compile_spy.call_count == 1
+
+
+def test_schema_cache(app):
+    schema_cache = SchemaCache(max_size=2)
+    schema = schema_cache.get(UserSchema, many=True)
+    assert schema_cache.get(UserSchema, many=True) is schema
+
+    # Sparse fieldsets are built every time, without evicting the other schemas
+    for only in [('id',), ('first_name',), ('first_name', 'id')]:
+        sparse_schema = schema_cache.get(UserSchema, many=True, only=only)
+        assert sparse_schema is not schema_cache.get(UserSchema, many=True, only=only)
+        assert set(sparse_schema.fields) == set(only)
+    assert schema_cache.get(UserSchema, many=True) is schema
+
+
+def test_cursor_pagination(client):
+    for first_name, last_name in [('A', 'Smith'), ('B', 'Doe'), ('C', 'Doe'), ('D', 'Brown'), ('E', 'Smith')]:
+        _create_user(first_name=first_name, last_name=last_name)
+
+    pages = []
+    url = '/api/users/cursor/?x=y'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert 'count' not in response.json
+        pages.append([item['first_name'] for item in response.json['results']])
+        last_page, url = response.json, response.json['next_page']
+    assert pages == [['D', 'B'], ['C', 'A'], ['E']]
+    assert 'x=y' in last_page['prev_page']
+
+    pages = []
+    url = last_page['prev_page']
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([item['first_name'] for item in response.json['results']])
+        url = response.json['prev_page']
+    assert pages == [['C', 'A'], ['D', 'B']]
+
+    response = client.get('/api/users/cursor/?cursor=invalid')
+    assert response.status_code == 400
+    assert response.json == {'cursor': ['Invalid cursor.'], 'status_code': 400}
+
+    response = client.get('/api/users/cursor/?per_page=10')
+    assert [item['first_name'] for item in response.json['results']] == ['D', 'B', 'C']
+
+    response = client.get('/api/users/cursor/?per_page=0')
+    assert [item['first_name'] for item in response.json['results']] == ['D']
+
+
+def test_cursor_pagination_by_datetime(client):
+    now = datetime(2019, 1, 1, 12, 30, 15, 123456)
+    for first_name, created in [('A', now), ('B', now - timedelta(days=1)), ('C', now), ('D', now + timedelta(microseconds=1))]:
+        _create_user(first_name=first_name, last_name='Doe', created=created)
+
+    pages = []
+    url = '/api/users/cursor_by_created/'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([item['first_name'] for item in response.json['results']])
+        last_page, url = response.json, response.json['next_page']
+    assert pages == [['B', 'A'], ['C', 'D']]
+
+    response = client.get(last_page['prev_page'])
+    assert response.status_code == 200
+    assert [item['first_name'] for item in response.json['results']] == ['B', 'A']
+
+
+def test_cursor_values(app):
+    values = [1, 'Doe', None, datetime(2019, 1, 1, 12, 30), datetime(2019, 1, 1, 12, 30, 15, 5, tzinfo=utc), date(2019, 1, 1),
+              Decimal('1.10'), uuid.uuid4()]
+    assert [decode_cursor_value(encode_cursor_value(value)) for value in values] == values
+
+
 def test_exception_behavior(client):
     response = client.get('/api/users/exception/handled/')
     assert response.status_code == 499
@@ -260,3 +1230,227 @@ def test_exception_behavior(client):
 
     response = client.get('/api/users')  # Missing trailing slash (out of wrf scope)
     assert response.status_code == 308
+
+
+def test_metrics(client, mocker):
+    mocker.patch.object(UserAPI, 'metrics_collector', MetricsCollector(buckets=(0.1, 1)))
+    mocker.patch('wrf.api.base.default_timer', side_effect=[0, 0.0625, 10, 10.5, 20, 20.0625, 30, 32])
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    assert client.get('/api/users/').status_code == 200
+    assert client.get('/api/users/{}/'.format(user.id)).status_code == 200
+    assert client.get('/api/users/999/').status_code == 404
+    with pytest.raises(ZeroDivisionError):
+        client.get('/api/users/exception/unhandled/')
+
+    response = client.get('/api/users/metrics/')
+    assert response.status_code == 200
+    assert response.content_type == 'text/plain; version=0.0.4; charset=utf-8'
+    lines = response.data.decode('utf-8').splitlines()
+    assert 'wrf_requests_total{api="UserAPI",method="list"} 1.0' in lines
+    assert 'wrf_requests_total{api="UserAPI",method="retrieve"} 2.0' in lines
+    assert 'wrf_request_errors_total{api="UserAPI",method="retrieve",status="404"} 1.0' in lines
+    assert 'wrf_request_errors_total{api="UserAPI",method="unhandled_exception",status="500"} 1.0' in lines
+    assert lines[lines.index('# TYPE wrf_request_duration_seconds histogram') + 1:][5:10] == [
+        'wrf_request_duration_seconds_bucket{api="UserAPI",method="retrieve",le="0.1"} 1.0',
+        'wrf_request_duration_seconds_bucket{api="UserAPI",method="retrieve",le="1.0"} 2.0',
+        'wrf_request_duration_seconds_bucket{api="UserAPI",method="retrieve",le="+Inf"} 2.0',
+        'wrf_request_duration_seconds_sum{api="UserAPI",method="retrieve"} 0.5625',
+        'wrf_request_duration_seconds_count{api="UserAPI",method="retrieve"} 2.0',
+    ]
+
+
+def test_mmap_metrics_store(app, mocker, tmpdir):
+    store = MmapMetricsStore(str(tmpdir))
+    mocker.patch('os.getpid', return_value=1)
+    store.inc('a')
+    store.inc('a', 2.5)
+    store.inc('b')
+    mocker.patch('os.getpid', return_value=2)  # e.g. another gunicorn worker
+    store.inc('a')
+    assert store.collect() == {'a': 4.5, 'b': 1}
+    assert sorted(path.basename for path in tmpdir.listdir()) == ['wrf_metrics_1.db', 'wrf_metrics_2.db']
+
+    # Files are reopened as they were left, and grow as needed
+    mocker.patch('os.getpid', return_value=1)
+    other_store = MmapMetricsStore(str(tmpdir))
+    for i in range(5000):
+        other_store.inc('key {}'.format(i))
+    other_store.inc('a')
+    collected = other_store.collect()
+    assert collected['a'] == 5.5
+    assert collected['key 4999'] == 1
+    assert len(collected) == 5002
+
+
+def test_components_are_built_on_demand(client, mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    pagination_init = mocker.spy(PagePaginationComponent, '__init__')
+    error_init = mocker.spy(DefaultErrorComponent, '__init__')
+
+    response = client.get('/api/users/{}/'.format(user.id))
+    assert response.status_code == 200
+    assert pagination_init.call_count == 0
+    assert error_init.call_count == 0
+
+    response = client.get('/api/users/999/')
+    assert response.status_code == 404
+    assert pagination_init.call_count == 0
+    assert error_init.call_count == 1
+
+    response = client.get('/api/users/')
+    assert response.status_code == 200
+    assert pagination_init.call_count == 1
+
+
+def test_component_classes_are_resolved_once(app, mocker):
+    # A view of its own, so no previous test has resolved its component classes yet
+    class ResolvingUserAPI(UserAPI):
+        @api_view()
+        def first_name(self, pk):
+            instance = self.orm_component.get_object(self.get_queryset(), pk)
+            return self.framework_component.create_response({'first_name': instance.first_name}, 200)
+
+    class OtherResolvingUserAPI(ResolvingUserAPI):
+        pass
+
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    get_orm_component_class = mocker.spy(ResolvingUserAPI, 'get_orm_component_class')
+    get_pagination_component_class = mocker.spy(ResolvingUserAPI, 'get_pagination_component_class')
+
+    for _ in range(3):
+        with app.test_request_context('/'):
+            response = ResolvingUserAPI(request).first_name(user.id)
+        assert response.status_code == 200
+    assert get_orm_component_class.call_count == 1
+    # Pagination is declared as dynamic in `UserAPI`.
+    assert get_pagination_component_class.call_count == 3
+
+    # Other API classes sharing the view resolve their own
+    for _ in range(2):
+        with app.test_request_context('/'):
+            response = OtherResolvingUserAPI(request).first_name(user.id)
+        assert response.status_code == 200
+    assert get_orm_component_class.call_count == 2
+    assert get_pagination_component_class.call_count == 5
+
+
+def test_retrieve_checks_permissions_once(client, mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    check_permission = mocker.spy(AllowAuthenticatedPermissionComponent, 'check_permission')
+
+    response = client.get('/api/users/{}/'.format(user.id))
+    assert response.status_code == 200
+    assert check_permission.call_count == 1
+
+    mocker.patch.object(AllowAuthenticatedPermissionComponent, 'instance_dependent', True)
+    response = client.get('/api/users/{}/'.format(user.id))
+    assert response.status_code == 200
+    assert check_permission.call_count == 2
+    assert check_permission.call_args[0][-1].id == user.id
+
+
+def test_retrieve_checks_fetched_instances(app, client, mocker):
+    class InheritedPermissionComponent(AllowAuthenticatedPermissionComponent):
+        pass
+
+    class InheritedUserAPI(UserAPI):
+        permission_component_class = InheritedPermissionComponent
+
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    john = _create_user(first_name='John', last_name='Doe')
+
+    response = client.get('/api/users/{}/owner_only/'.format(john.id))
+    assert response.status_code == 403
+    response = client.get('/api/users/{}/owner_only/'.format(filipe.id))
+    assert response.status_code == 200
+
+    # Inheriting `instance_dependent = False` keeps the response cacheable, but the fetched instance is checked too
+    check_permission = mocker.spy(AllowAuthenticatedPermissionComponent, 'check_permission')
+    with app.test_request_context('/'):
+        response = InheritedUserAPI(request).retrieve(john.id)
+    assert response.status_code == 200
+    assert [call[0][-1] for call in check_permission.call_args_list] == [None, john]
+
+
+def test_current_user_is_resolved_on_demand(client, mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    get_current_user = mocker.spy(MyBaseAPI, 'get_current_user')
+
+    response = client.get('/api/users/{}/doublename_open/'.format(user.id))
+    assert response.status_code == 200
+    assert get_current_user.call_count == 0
+
+    response = client.get('/api/users/{}/doublename/'.format(user.id))
+    assert response.status_code == 200
+    assert get_current_user.call_count == 1
+
+
+def _spy_component_inits(mocker):
+    component_classes = [
+        DefaultErrorComponent, FlaskFrameworkComponent, SQLAlchemyORMComponent, PagePaginationComponent,
+        AllowAuthenticatedPermissionComponent, ReadOnlyPermissionComponent, MarshmallowSQLAlchemySchemaComponent,
+    ]
+    return {component_class: mocker.spy(component_class, '__init__') for component_class in component_classes}
+
+
+def _pop_init_counts(spies):
+    counts = {component_class.__name__: spy.call_count for component_class, spy in spies.items() if spy.call_count}
+    for spy in spies.values():
+        spy.reset_mock()
+    return counts
+
+
+def test_components_are_built_once_per_request(client, mocker):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    spies = _spy_component_inits(mocker)
+
+    response = client.get('/api/users/')
+    assert response.status_code == 200
+    assert _pop_init_counts(spies) == {
+        'FlaskFrameworkComponent': 1,
+        'SQLAlchemyORMComponent': 1,
+        'PagePaginationComponent': 1,
+        'AllowAuthenticatedPermissionComponent': 1,
+        'MarshmallowSQLAlchemySchemaComponent': 1,
+    }
+
+    response = client.get('/api/users/read_only/')
+    assert response.status_code == 200
+    assert _pop_init_counts(spies) == {
+        'FlaskFrameworkComponent': 1,
+        'SQLAlchemyORMComponent': 1,
+        'PagePaginationComponent': 1,
+        'ReadOnlyPermissionComponent': 1,
+        'MarshmallowSQLAlchemySchemaComponent': 1,
+    }
+
+    response = client.post('/api/users/read_only/')
+    assert response.status_code == 403
+    assert _pop_init_counts(spies) == {
+        'DefaultErrorComponent': 1,
+        'FlaskFrameworkComponent': 1,
+        'ReadOnlyPermissionComponent': 1,
+    }
+
+    response = client.get('/api/users/{}/'.format(user.id))
+    assert response.status_code == 200
+    assert _pop_init_counts(spies) == {
+        'FlaskFrameworkComponent': 1,
+        'SQLAlchemyORMComponent': 1,
+        'AllowAuthenticatedPermissionComponent': 1,
+        'MarshmallowSQLAlchemySchemaComponent': 1,
+    }
+
+
+def test_schema_instances_are_reused(client, mocker):
+    _create_user(first_name='Filipe', last_name='Waitman')
+
+    response = client.get('/api/users/')
+    assert response.status_code == 200
+
+    schema_init = mocker.spy(UserSchema, '__init__')
+    response = client.get('/api/users/')
+    assert response.status_code == 200
+    assert response.json['results'][0]['first_name'] == 'Filipe'
+    assert schema_init.call_count == 0
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from sqlalchemy.orm import Query
+
+from wrf.base import APIError, Context
+from wrf.orm.sqlalchemy_aio import SQLAlchemyAsyncORMComponent
+
+from .app import db
+from .models import Post, User
+
+
+class AsyncSession(object):
+    '''
+    What the component uses of `sqlalchemy.ext.asyncio.AsyncSession` (SQLAlchemy 1.4+), on top of a regular session.
+    '''
+    def __init__(self, sync_session):
+        self.sync_session = sync_session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def run_sync(self, func):
+        return func(self.sync_session)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def delete(self, instance):
+        self.sync_session.delete(instance)
+
+
+@pytest.fixture
+def orm(app):
+    db.create_all()
+    return SQLAlchemyAsyncORMComponent(Context({'model_class': User}), AsyncSession(db.session()))
+
+
+def _run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def _create_user(**data):
+    user = User(**data)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _names():
+    return sorted((user.first_name, user.last_name) for user in User.query)
+
+
+def test_create_object(orm):
+    user = _run(orm.create_object({'first_name': 'Filipe', 'last_name': 'Waitman'}))
+    assert user.id is not None
+    assert _names() == [('Filipe', 'Waitman')]
+
+    _run(orm.create_object(User(first_name='John', last_name='Doe')))
+    assert _names() == [('Filipe', 'Waitman'), ('John', 'Doe')]
+
+
+def test_get_object(orm):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+    queryset = _run(orm.get_queryset(Query(User)))
+
+    instance = _run(orm.get_object(queryset, user.id))
+    assert instance.first_name == 'Filipe'
+    assert _run(orm.get_object(queryset, user.id)) is instance
+
+    with pytest.raises(APIError) as e:
+        _run(orm.get_object(queryset, 9999))
+    assert e.value.status_code == 404
+
+
+def test_update_object(orm):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    instance = _run(orm.update_object(user, {'last_name': 'Doe'}))
+    assert instance is user
+    assert _names() == [('Filipe', 'Doe')]
+
+
+def test_update_objects(orm):
+    filipe, john = [_create_user(first_name=first_name, last_name='Waitman') for first_name in ('Filipe', 'John')]
+    queryset = Query(User).order_by(User.first_name)
+
+    assert _run(orm.update_objects(queryset, [([filipe.id, john.id], {'last_name': 'Doe'}), ([9999], {'last_name': 'X'})])) == 2
+    db.session.expire_all()
+    assert _names() == [('Filipe', 'Doe'), ('John', 'Doe')]
+
+
+def test_delete_object(orm):
+    user = _create_user(first_name='Filipe', last_name='Waitman')
+
+    _run(orm.delete_object(user))
+    assert _names() == []
+
+
+def test_delete_objects(orm):
+    filipe = _create_user(first_name='Filipe', last_name='Waitman')
+    _create_user(first_name='John', last_name='Doe')
+    post = Post(title='Post', author=filipe)
+    db.session.add(post)
+    db.session.commit()
+
+    queryset = orm.filter_queryset_by_fields(Query(User), {'last_name': 'Waitman'})
+    assert _run(orm.delete_objects(queryset)) == 1
+    assert _names() == [('John', 'Doe')]
+    # Dependent rows are handled by the session, as in `SQLAlchemyORMComponent`
+    assert Post.query.one().author_id is None
+
+    assert _run(orm.delete_objects(orm.filter_queryset_by_pks(Query(User), [9999]))) == 0
+
+
+def test_run_sync_binds_querysets(orm):
+    _create_user(first_name='Filipe', last_name='Waitman')
+
+    assert _run(orm.run_sync(lambda queryset: queryset.count(), Query(User))) == 1
+    assert _run(orm.run_sync(lambda queryset=None: queryset.count(), queryset=Query(User))) == 1
+    assert _run(orm.run_sync(lambda value: value, 'unbound')) == 'unbound'
+
+
+def test_get_column_names(orm):
+    assert orm.get_column_names() == {'id', 'created', 'updated', 'first_name', 'last_name'}
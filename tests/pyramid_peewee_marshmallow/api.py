@@ -7,6 +7,7 @@ from tests.pyramid_peewee_marshmallow.schemas import UserSchema
 from wrf.api.base import BaseAPI, api_view
 from wrf.base import APIError
 from wrf.framework.pyramid import PyramidFrameworkComponent
+from wrf.metrics import MetricsCollector, render_metrics
 from wrf.orm.peewee import PeeweeORMComponent
 from wrf.pagination.base import NoPaginationComponent, PagePaginationComponent
 from wrf.permission.base import AllowAllPermissionComponent, AllowAuthenticatedPermissionComponent, ReadOnlyPermissionComponent
@@ -27,6 +28,8 @@ class MyBaseAPI(BaseAPI):
 class UserAPI(MyBaseAPI):
     model_class = User
     schema_class = UserSchema
+    dynamic_components = ('pagination',)
+    metrics_collector = MetricsCollector()
 
     def get_queryset(self):
         return User.select()
@@ -69,6 +72,10 @@ class UserAPI(MyBaseAPI):
     def list_nopagination(self):
         return self._list()
 
+    @api_view(pagination_component_class=partial(NoPaginationComponent, stream=True, chunk_size=2))
+    def list_streaming(self):
+        return self._list()
+
     def get_pagination_component_class(self, api_method_name):
         if self.request.params.get('paginate') == 'f':
             return NoPaginationComponent
@@ -127,6 +134,11 @@ def no_pagination_list(request):
     return UserAPI(request).list_nopagination()
 
 
+@view_config(route_name='users_streaming_list', renderer='json')
+def streaming_list(request):
+    return UserAPI(request).list_streaming()
+
+
 @view_config(route_name='users_handled_exception_list', renderer='json')
 def handled_exception_list(request):
     return UserAPI(request).handled_exception()
@@ -135,3 +147,8 @@ def handled_exception_list(request):
 @view_config(route_name='users_unhandled_exception_list', renderer='json')
 def unhandled_exception_list(request):
     return UserAPI(request).unhandled_exception()
+
+
+@view_config(route_name='metrics')
+def metrics(request):
+    return render_metrics(UserAPI.metrics_collector, PyramidFrameworkComponent, request)
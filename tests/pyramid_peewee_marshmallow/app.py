@@ -16,8 +16,10 @@ def create_app():
         config.add_route('users_read_only_list_and_create', '/api/users/read_only/', request_method=['GET', 'POST'])
         config.add_route('users_form_data_create', '/api/users/form_data/', request_method=['POST'])
         config.add_route('users_no_pagination_list', '/api/users/no_pagination/', request_method=['GET'])
+        config.add_route('users_streaming_list', '/api/users/streaming/', request_method=['GET'])
         config.add_route('users_handled_exception_list', '/api/users/exception/handled/', request_method=['GET'])
         config.add_route('users_unhandled_exception_list', '/api/users/exception/unhandled/', request_method=['GET'])
+        config.add_route('metrics', '/api/metrics/', request_method=['GET'])
         config.add_route('users_retrieve', '/api/users/{pk}/', request_method=['GET'])
         config.add_route('users_update', '/api/users/{pk}/', request_method=['PATCH'])
         config.add_route('users_delete', '/api/users/{pk}/', request_method=['DELETE'])
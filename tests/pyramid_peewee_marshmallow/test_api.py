@@ -3,7 +3,9 @@ import unittest
 import mock
 import pytest
 
-from .api import MyBaseAPI
+from wrf.metrics import MetricsCollector
+
+from .api import MyBaseAPI, UserAPI
 from .app import create_app, db
 from .models import User
 
@@ -233,6 +235,17 @@ class PyramidPeeweeMarshmallowTestCase(unittest.TestCase):
         assert response.json_body[0]['first_name'] == 'Filipe'
         assert response.json_body[0]['last_name'] == 'Waitman'
 
+    def test_streaming_list(self):
+        for first_name in ('Filipe', 'John', 'Jane'):
+            _create_user(first_name=first_name, last_name='Doe')
+
+        response = self.client.get('/api/users/streaming/')
+        assert response.status_code == 200
+        assert response.content_type == 'application/json'
+        assert [item['first_name'] for item in response.json_body] == ['Filipe', 'John', 'Jane']
+        assert 'id' in response.json_body[0]
+        assert 'created' in response.json_body[0]
+
     def test_exception_behavior(self):
         response = self.client.get('/api/users/exception/handled/', status=499)
         assert response.status_code == 499
@@ -243,3 +256,29 @@ class PyramidPeeweeMarshmallowTestCase(unittest.TestCase):
 
         response = self.client.get('/api/users', status=404)  # Missing trailing slash (out of wrf scope)
         assert response.status_code == 404
+
+    def test_metrics(self):
+        with mock.patch.object(UserAPI, 'metrics_collector', MetricsCollector()):
+            self.client.get('/api/users/')
+            self.client.get('/api/users/999/', status=404)
+
+            response = self.client.get('/api/metrics/')
+            assert response.status_code == 200
+            assert response.headers['Content-Type'] == 'text/plain; version=0.0.4; charset=utf-8'
+            lines = response.text.splitlines()
+            assert 'wrf_requests_total{api="UserAPI",method="list"} 1.0' in lines
+            assert 'wrf_request_errors_total{api="UserAPI",method="retrieve",status="404"} 1.0' in lines
+            assert 'wrf_request_duration_seconds_count{api="UserAPI",method="retrieve"} 1.0' in lines
+
+    def test_no_content_is_not_an_error(self):
+        user = _create_user(first_name='Filipe', last_name='Waitman')
+
+        with mock.patch.object(UserAPI, 'metrics_collector', MetricsCollector()), \
+                mock.patch.object(UserAPI, 'server_timing', True):
+            response = self.client.delete('/api/users/{}/'.format(user.id))
+            assert response.status_code == 204
+            assert response.headers['Server-Timing']
+
+            lines = self.client.get('/api/metrics/').text.splitlines()
+            assert 'wrf_requests_total{api="UserAPI",method="delete"} 1.0' in lines
+            assert not [line for line in lines if line.startswith('wrf_request_errors_total{')]
@@ -0,0 +1,173 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from itertools import chain
+from timeit import default_timer
+from types import GeneratorType
+
+from wrf.base import APIError
+from wrf.orm.aio import BaseAsyncORMComponent, get_running_loop
+
+from .base import BaseAPI, BlockingCall, OrmCall, init_view_context
+
+
+def async_api_view(**overrides):
+    def wrap(f):
+        component_classes_by_api_class = {}
+
+        @wraps(f)
+        async def wrapped_f(self, *args, **kwargs):
+            started_at = default_timer() if self.metrics_collector is not None else None
+            timer = self.create_timer()
+            init_view_context(self, f.__name__, overrides, component_classes_by_api_class, timer)
+            self.pre_request()
+            error_status = None
+            try:
+                self.check_throttle()
+                response = await f(self, *args, **kwargs)
+                response = self.post_response(response)
+            except Exception as exception:
+                error_status = exception.status_code if isinstance(exception, APIError) else 500
+                response = self.post_exception(exception)
+            finally:
+                self.shutdown_executor()
+                if started_at is not None:
+                    self.record_metrics(default_timer() - started_at, error_status)
+            if timer is not None:
+                self.report_timings(timer, response)
+            return response
+        return wrapped_f
+    return wrap
+
+
+class AsyncBaseAPI(BaseAPI):
+    '''
+    The asynchronous orchestrator, to be used under ASGI servers. Views are coroutines (see `async_api_view`) running the
+    very same steps as `BaseAPI` ones (see `run_steps`), but awaiting their calls to the ORM.
+    ORM work goes through `BaseAsyncORMComponent`s when the ORM component is one of those. Otherwise (i.e.: for the usual,
+    synchronous ORM components) it runs in an executor, so the event loop is never blocked by the database.
+    Other components (schema, permission, framework...) do no I/O by themselves and are called directly.
+    '''
+    # Executor synchronous ORM work runs in. By default (`None`), each request gets a single thread of its own, so all its
+    # calls see the same thread-bound state (e.g. scoped sessions or peewee connections).
+    executor = None
+
+    _request_executor = None
+
+    def get_executor(self):
+        if self.executor is not None:
+            return self.executor
+        if self._request_executor is None:
+            self._request_executor = ThreadPoolExecutor(max_workers=1)
+        return self._request_executor
+
+    def shutdown_executor(self):
+        '''
+        Called once the response is built, when no call runs in the executor of the request anymore.
+        '''
+        if self._request_executor is not None:
+            self._request_executor.shutdown(wait=False)
+            self._request_executor = None
+
+    async def run_in_executor(self, func, *args, **kwargs):
+        return await get_running_loop().run_in_executor(self.get_executor(), partial(func, *args, **kwargs))
+
+    def _has_async_orm(self):
+        return isinstance(self.orm_component, BaseAsyncORMComponent)
+
+    async def call_orm(self, method_name, *args, **kwargs):
+        method = getattr(self.orm_component, method_name)
+        if self._has_async_orm():
+            timer = self.context.get('timer')
+            if timer is None:
+                return await method(*args, **kwargs)
+            # The proxy only times building the coroutine, so it's awaited as part of the phase here.
+            with timer.phase('orm'):
+                return await method(*args, **kwargs)
+        return await self.run_in_executor(method, *args, **kwargs)
+
+    async def run_sync(self, func, *args, **kwargs):
+        '''
+        Runs synchronous code that might touch the database (e.g. pagination evaluating a queryset).
+        '''
+        if self._has_async_orm():
+            return await self.orm_component.run_sync(func, *args, **kwargs)
+        return await self.run_in_executor(func, *args, **kwargs)
+
+    async def run_steps(self, steps):
+        try:
+            result = None
+            while True:
+                step = steps.send(result)
+                if isinstance(step, GeneratorType):
+                    result = await self.run_steps(step)
+                elif isinstance(step, OrmCall):
+                    result = await self.call_orm(step.method_name, *step.args, **step.kwargs)
+                elif isinstance(step, BlockingCall):
+                    result = await self.run_sync(step.func, *step.args, **step.kwargs)
+                else:
+                    return step
+        finally:
+            steps.close()
+
+    def streaming_response_steps(self, data, headers):
+        # Streaming would evaluate the queryset while the response is sent, blocking the event loop.
+        data = yield BlockingCall(lambda: list(chain.from_iterable(data)))
+        yield self.framework_component.create_response(data, 200, headers=headers)
+
+    async def _list(self):
+        return await self.run_steps(self._list_steps())
+
+    async def _create(self):
+        return await self.run_steps(self._create_steps())
+
+    async def _bulk_create(self):
+        return await self.run_steps(self._bulk_create_steps())
+
+    async def _bulk_update(self):
+        return await self.run_steps(self._bulk_update_steps())
+
+    async def _bulk_delete(self):
+        return await self.run_steps(self._bulk_delete_steps())
+
+    async def _retrieve(self, pk):
+        return await self.run_steps(self._retrieve_steps(pk))
+
+    async def _update(self, pk):
+        return await self.run_steps(self._update_steps(pk))
+
+    async def _delete(self, pk):
+        return await self.run_steps(self._delete_steps(pk))
+
+    @async_api_view()
+    async def list(self):
+        return await self._list()
+
+    @async_api_view()
+    async def create(self):
+        return await self._create()
+
+    @async_api_view()
+    async def bulk_create(self):
+        return await self._bulk_create()
+
+    @async_api_view()
+    async def bulk_update(self):
+        return await self._bulk_update()
+
+    @async_api_view()
+    async def bulk_delete(self):
+        return await self._bulk_delete()
+
+    @async_api_view()
+    async def retrieve(self, pk):
+        return await self._retrieve(pk)
+
+    @async_api_view()
+    async def update(self, pk):
+        return await self._update(pk)
+
+    @async_api_view()
+    async def delete(self, pk):
+        return await self._delete(pk)
@@ -1,11 +1,21 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from functools import wraps
+from timeit import default_timer
+from types import GeneratorType
 
-from wrf.base import APIError
+from wrf.base import APIError, Context, get_component_instance
+from wrf.cache.base import NoCacheComponent
+from wrf.conditional import get_validator_headers, is_not_modified
 from wrf.error.base import DefaultErrorComponent
-from wrf.pagination.base import NoPaginationComponent
+from wrf.pagination.base import NoPaginationComponent, StreamedResults
 from wrf.permission.base import AllowAllPermissionComponent
+from wrf.throttle.base import NoThrottleComponent
+from wrf.timing import PhaseTimer
+
+COMPONENT_NAMES = ('orm', 'error', 'schema', 'framework', 'pagination', 'permission', 'cache', 'throttle')
+
+_UNSET = object()
 
 
 class _Require(object):
@@ -18,18 +28,89 @@ class _Require(object):
         raise NotImplementedError(self.error_msg.format(self.name))
 
 
+class OrmCall(object):
+    '''
+    Yielded by the steps of a view (see `BaseAPI.run_steps`) to call the method `method_name` of the ORM component.
+    '''
+    def __init__(self, method_name, *args, **kwargs):
+        self.method_name = method_name
+        self.args = args
+        self.kwargs = kwargs
+
+
+class BlockingCall(object):
+    '''
+    Yielded by the steps of a view (see `BaseAPI.run_steps`) to make any other call that may hit the database (e.g.
+    paginating a queryset).
+    '''
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+
+class _LazyComponent(object):
+    '''
+    Builds the component on first attribute access and stores it in the API instance, so that subsequent accesses (during
+    the same request) do not hit this descriptor anymore. Components never used by a request are never built.
+    The instance comes from the context registry, so it is the same one other components get via `get_instance_from_context`.
+    '''
+    def __init__(self, name):
+        self.name = name
+        self.attr_name = '{}_component'.format(name)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        component = get_component_instance(instance.context, self.name)
+        instance.__dict__[self.attr_name] = component
+        return component
+
+
+def init_view_context(api, api_method_name, overrides, component_classes_by_api_class, timer=None):
+    '''
+    Initializes the context of a view, resolving its static component classes only once per API class.
+    See `BaseAPI.dynamic_components`.
+    '''
+    if timer is not None:
+        timer.start('init')
+
+    component_classes = component_classes_by_api_class.get(type(api))
+    if component_classes is None:
+        component_classes = api.get_component_classes(api_method_name, **overrides)
+        component_classes_by_api_class[type(api)] = component_classes
+
+    api.init_context(api_method_name, component_classes=component_classes, **overrides)
+
+    if timer is not None:
+        timer.stop()
+        api.context['timer'] = timer
+
+
 def api_view(**overrides):
     def wrap(f):
+        component_classes_by_api_class = {}
+
         @wraps(f)
         def wrapped_f(self, *args, **kwargs):
-            self.init_context(f.__name__, **overrides)
+            started_at = default_timer() if self.metrics_collector is not None else None
+            timer = self.create_timer()
+            init_view_context(self, f.__name__, overrides, component_classes_by_api_class, timer)
             self.pre_request()
+            error_status = None
             try:
+                self.check_throttle()
                 response = f(self, *args, **kwargs)
                 response = self.post_response(response)
-                return response
             except Exception as exception:
-                return self.post_exception(exception)
+                error_status = exception.status_code if isinstance(exception, APIError) else 500
+                response = self.post_exception(exception)
+            finally:
+                if started_at is not None:
+                    self.record_metrics(default_timer() - started_at, error_status)
+            if timer is not None:
+                self.report_timings(timer, response)
+            return response
         return wrapped_f
     return wrap
 
@@ -48,16 +129,76 @@ class BaseAPI(object):
     error_component_class = DefaultErrorComponent
     pagination_component_class = NoPaginationComponent
     permission_component_class = AllowAllPermissionComponent
+    cache_component_class = NoCacheComponent
+    throttle_component_class = NoThrottleComponent
 
     # Required, usually specific to each API
     model_class = None
     schema_class = None
 
+    # Component classes are resolved once per API class and view, as `get_<name>_component_class` is expected to depend
+    # only on `api_method_name`. List here the names of the components whose resolution depends on the request itself
+    # (e.g. `('pagination',)`), so their `get_<name>_component_class` gets called on every request.
+    dynamic_components = ()
+
+    # Relations of `model_class` loaded along with the instances, so serializing them doesn't cost a query per row, e.g.
+    # `('author', 'tags')`. ORM components decide how (joins for to-one relations, separate queries for to-many ones).
+    eager_load = ()
+
+    # A column holding a version number or the last modification datetime of each row (e.g. `'updated_at'`). When set,
+    # `list` and `retrieve` responses carry `ETag` (and `Last-Modified`) headers computed from it without loading any
+    # instance, and conditional requests (`If-None-Match`, `If-Modified-Since`) still fresh are answered with a 304.
+    validator_field = None
+
+    # Query parameter clients use to ask for a subset of the schema fields (e.g. `fields_param = 'fields'` for
+    # `?fields=id,first_name`) when listing and retrieving. Disabled (`None`) unless set, since `fields` may well be a filter.
+    fields_param = None
+
+    # Have `list` fetch plain rows with just the values the schema dumps, instead of model instances (see
+    # `BaseORMComponent.rows_queryset`). Instances are still used when some (requested) field isn't a plain column or
+    # something is eager loaded, so the schema must not depend on model methods or properties then.
+    list_rows = False
+
+    # Time the phases of each request: context initialization and the calls to each component (`orm`, `schema`,
+    # `pagination`, `framework`...), see `wrf.timing`. Note lazy querysets are evaluated (i.e.: hit the database) by
+    # whoever iterates them, usually the pagination or schema components.
+    # With `server_timing`, responses carry the timings in a `Server-Timing` header (which discloses them to clients), and
+    # a `timing_sink` (see `BaseTimingSink`) gets them for every request. Requests are not timed when neither is set.
+    server_timing = False
+    timing_sink = None
+
+    # A `wrf.metrics.MetricsCollector` recording the count, errors and duration of the requests to this API.
+    metrics_collector = None
+
+    # Component instances, built on demand
+    orm_component = _LazyComponent('orm')
+    error_component = _LazyComponent('error')
+    schema_component = _LazyComponent('schema')
+    framework_component = _LazyComponent('framework')
+    pagination_component = _LazyComponent('pagination')
+    permission_component = _LazyComponent('permission')
+    cache_component = _LazyComponent('cache')
+    throttle_component = _LazyComponent('throttle')
+
+    _current_user = _UNSET
+
     def __init__(self, request, response=None):
         super(BaseAPI, self).__init__()
         self.request = request
         self.response = response
-        self.current_user = self.get_current_user()  # TODO [later]: lazy evaluation to avoid additional queries?
+
+    @property
+    def current_user(self):
+        '''
+        The result of `get_current_user`, which is only called on first access (as it usually costs a query).
+        '''
+        if self._current_user is _UNSET:
+            self._current_user = self.get_current_user()
+        return self._current_user
+
+    @current_user.setter
+    def current_user(self, value):
+        self._current_user = value
 
     def get_orm_component_class(self, api_method_name):
         return self.orm_component_class
@@ -77,36 +218,54 @@ class BaseAPI(object):
     def get_permission_component_class(self, api_method_name):
         return self.permission_component_class
 
-    def init_context(self, api_method_name, **overrides):
-        # if overrides:
-        #     import ipdb
-        #     ipdb.set_trace()
-        # TODO [later]: Throttling?
-        self.context = {
+    def get_cache_component_class(self, api_method_name):
+        return self.cache_component_class
+
+    def get_throttle_component_class(self, api_method_name):
+        return self.throttle_component_class
+
+    def _get_component_class(self, name, api_method_name, overrides):
+        override_name = '{}_component_class'.format(name)
+        if override_name in overrides:
+            return overrides[override_name]
+        return getattr(self, 'get_{}'.format(override_name))(api_method_name)
+
+    def get_component_classes(self, api_method_name, **overrides):
+        '''
+        Resolves the static (i.e.: not listed in `dynamic_components`) component classes for the given API method.
+        '''
+        return {
+            name: self._get_component_class(name, api_method_name, overrides)
+            for name in COMPONENT_NAMES
+            if name not in self.dynamic_components
+        }
+
+    def init_context(self, api_method_name, component_classes=None, **overrides):
+        if component_classes is None:
+            component_classes = self.get_component_classes(api_method_name, **overrides)
+
+        self.context = Context({
             # Request stuff
             'request': self.request,
             'response': self.response,
-            'current_user': self.current_user,
-
-            # Components
-            'orm': overrides.get('orm_component_class', self.get_orm_component_class(api_method_name)),
-            'error': overrides.get('error_component_class', self.get_error_component_class(api_method_name)),
-            'schema': overrides.get('schema_component_class', self.get_schema_component_class(api_method_name)),
-            'framework': overrides.get('framework_component_class', self.get_framework_component_class(api_method_name)),
-            'pagination': overrides.get('pagination_component_class', self.get_pagination_component_class(api_method_name)),
-            'permission': overrides.get('permission_component_class', self.get_permission_component_class(api_method_name)),
 
             # Other
+            'api_class': type(self),
+            'api_method_name': api_method_name,
             'model_class': self.model_class,
             'schema_class': self.schema_class,
-        }
+            'eager_load': self.eager_load,
+        })
+        self.context.set_lazy('current_user', lambda: self.current_user)
+
+        # Components
+        self.context.update(component_classes)
+        for name in self.dynamic_components:
+            self.context[name] = self._get_component_class(name, api_method_name, overrides)
 
-        self.orm_component = self.context['orm'](self.context)
-        self.error_component = self.context['error'](self.context)
-        self.schema_component = self.context['schema'](self.context)
-        self.framework_component = self.context['framework'](self.context)
-        self.pagination_component = self.context['pagination'](self.context)
-        self.permission_component = self.context['permission'](self.context)
+        # Components from a previous context (if any) must not leak into this one.
+        for name in COMPONENT_NAMES:
+            self.__dict__.pop('{}_component'.format(name), None)
 
     def get_queryset(self):
         raise NotImplementedError()  # pragma: no cover
@@ -125,43 +284,359 @@ class BaseAPI(object):
             return self.error_component.handle_exception(exception)
         raise exception
 
+    def create_timer(self):
+        if not self.server_timing and self.timing_sink is None:
+            return None
+        return PhaseTimer()
+
+    def report_timings(self, timer, response):
+        timer.finish()
+        if self.server_timing:
+            self.framework_component.set_response_header(response, 'Server-Timing', timer.get_header_value())
+        if self.timing_sink is not None:
+            self.timing_sink.record(type(self).__name__, self.context['api_method_name'], timer.get_timings())
+
+    def record_metrics(self, duration, error_status=None):
+        self.metrics_collector.observe_request(type(self).__name__, self.context['api_method_name'], duration, error_status)
+
+    def check_throttle(self):
+        '''
+        Called before the view itself, so throttled requests never reach the database.
+        '''
+        self.throttle_component.check_throttle()
+
     def check_permissions(self, instance=None):
         self.permission_component.check_permission(instance)
 
+    def check_bulk_permissions_steps(self, queryset):
+        '''
+        Steps (see `run_steps`) checking the permissions of every row of `queryset` in one go. Rows are only fetched (in a
+        single query) when the permission component needs to look at the instances.
+        '''
+        if self.permission_component.is_instance_dependent():
+            instances = yield BlockingCall(list, queryset)
+            self.permission_component.check_permissions(instances)
+        else:
+            self.permission_component.check_permission()
+        yield None
+
+    def get_requested_fields(self):
+        '''
+        The fields asked for via `fields_param`, validated against the schema ones. `None` means all of them.
+        '''
+        if self.fields_param is None:
+            return None
+        value = self.framework_component.get_request_query().get(self.fields_param)
+        if not value:
+            return None
+        if isinstance(value, list):
+            value = ','.join(value)
+
+        fields = tuple(sorted({name.strip() for name in value.split(',') if name.strip()}))
+        field_names = self.schema_component.get_field_names()
+        unknown_fields = [name for name in fields if name not in field_names]
+        if unknown_fields:
+            raise APIError(400, {self.fields_param: {name: ['Unknown field.'] for name in unknown_fields}})
+        return fields or None
+
+    def get_projected_queryset(self, required_attributes=()):
+        '''
+        `get_queryset` restricted to the requested fields (if any), both in what the schema dumps and in what the ORM
+        loads from the database (where `required_attributes` are always loaded).
+        '''
+        queryset = self.get_queryset()
+        fields = self.context['fields'] = self.get_requested_fields()
+        if fields:
+            attributes = self.schema_component.get_field_attributes(fields)
+            if attributes is not None:
+                attributes = sorted(set(attributes).union(required_attributes))
+                queryset = self.orm_component.project_queryset(queryset, attributes)
+        return queryset
+
+    def get_rows_queryset(self, required_attributes=()):
+        '''
+        `get_queryset` as rows holding just the values of the (requested) schema fields and `required_attributes`, or
+        `None` when rows can't replace instances (see `BaseORMComponent.rows_queryset`).
+        '''
+        fields = self.context['fields'] = self.get_requested_fields()
+        attributes = self.schema_component.get_field_attributes(fields or self.schema_component.get_field_names())
+        if attributes is None:
+            return None
+        return self.orm_component.rows_queryset(self.get_queryset(), sorted(set(attributes).union(required_attributes)))
+
+    def get_validators_steps(self, pk=None):
+        '''
+        Steps (see `run_steps`) resulting in the validator headers for the `retrieve` (if `pk` is given) or `list`
+        response, see `validator_field`.
+        '''
+        if self.validator_field is None:
+            yield {}
+        elif pk is None:
+            version, count = yield OrmCall('get_queryset_version', self.get_queryset(), self.validator_field)
+            yield get_validator_headers(version, count)
+        else:
+            version = yield OrmCall('get_object_version', self.get_queryset(), pk, self.validator_field)
+            yield get_validator_headers(version)
+
+    def is_fresh(self, validators):
+        '''
+        Whether the copy the client has (according to its conditional request headers) matches `validators`.
+        '''
+        if not validators:
+            return False
+        framework = self.framework_component
+        if_none_match = framework.get_request_header('If-None-Match')
+        if_modified_since = framework.get_request_header('If-Modified-Since')
+        return is_not_modified(validators, if_none_match, if_modified_since)
+
+    def create_cached_response(self, cached, headers=None):
+        '''
+        The response for a `(body, status_code)` returned by the cache component.
+        '''
+        body, status_code = cached
+        framework = self.framework_component
+        return framework.create_raw_response(body, status_code, framework.json_encoder.content_type, headers=headers)
+
     def paginate_response(self, instances, schema=None):
         schema = schema or self.schema_component
         return self.pagination_component.paginate(schema, instances)
 
+    def streaming_response_steps(self, data, headers):
+        '''
+        Steps (see `run_steps`) resulting in the response for paginated `StreamedResults`.
+        '''
+        yield self.framework_component.create_streaming_response(data, 200, headers=headers)
+
+    def run_steps(self, steps):
+        '''
+        Runs the steps of a view: a generator yielding the calls that may block on the database (`OrmCall`s and
+        `BlockingCall`s) or nested steps, whose results are sent back to it, until it yields anything else: the result.
+        Views are orchestrated once this way, while calls are just made here and awaited by `AsyncBaseAPI.run_steps`.
+        '''
+        try:
+            result = None
+            while True:
+                step = steps.send(result)
+                if isinstance(step, GeneratorType):
+                    result = self.run_steps(step)
+                elif isinstance(step, OrmCall):
+                    result = getattr(self.orm_component, step.method_name)(*step.args, **step.kwargs)
+                elif isinstance(step, BlockingCall):
+                    result = step.func(*step.args, **step.kwargs)
+                else:
+                    return step
+        finally:
+            steps.close()
+
+    def _list_steps(self):
+        self.check_permissions()
+        validators = yield self.get_validators_steps()
+        if self.is_fresh(validators):
+            yield self.framework_component.create_response(None, 304, headers=validators)
+            return
+        cached = self.cache_component.get_response()
+        if cached is not None:
+            yield self.create_cached_response(cached, headers=validators)
+            return
+
+        required_attributes = self.pagination_component.get_required_attributes()
+        instances = self.get_rows_queryset(required_attributes) if self.list_rows else None
+        if instances is None:
+            instances = yield OrmCall('get_queryset', self.get_projected_queryset(required_attributes))
+        data = yield BlockingCall(self.paginate_response, instances)
+        if isinstance(data, StreamedResults):
+            response = yield self.streaming_response_steps(data, validators)
+            yield response
+            return
+        self.cache_component.set_response(data, 200)
+        yield self.framework_component.create_response(data, 200, headers=validators)
+
     def _list(self):
+        return self.run_steps(self._list_steps())
+
+    def _create_steps(self):
         self.check_permissions()
-        instances = self.orm_component.get_queryset(self.get_queryset())
-        return self.framework_component.create_response(self.paginate_response(instances), 200)
+        request_data = self.framework_component.get_request_data()
+        validated_data = self.schema_component.deserialize(request_data)
+        instance = yield OrmCall('create_object', validated_data)
+        self.cache_component.invalidate(pks=())
+        yield self.framework_component.create_response(self.schema_component.serialize(instance), 201)
 
     def _create(self):
+        return self.run_steps(self._create_steps())
+
+    def _bulk_create_steps(self):
         self.check_permissions()
         request_data = self.framework_component.get_request_data()
-        validated_data = self.schema_component.deserialize(request_data)
-        instance = self.orm_component.create_object(validated_data)
-        return self.framework_component.create_response(self.schema_component.serialize(instance), 201)
+        validated_data = self.schema_component.deserialize(request_data, many=True)
+        instances = yield OrmCall('create_objects', validated_data)
+        self.cache_component.invalidate(pks=())
+        yield self.framework_component.create_response(self.schema_component.serialize(instances, many=True), 201)
+
+    def _bulk_create(self):
+        return self.run_steps(self._bulk_create_steps())
+
+    def get_bulk_update_changes(self, request_data):
+        '''
+        Validates a list of `{"pk": ..., "fields": {...}}` patches and groups the pks that share the very same changes,
+        so each group can be applied with a single UPDATE.
+        '''
+        if not isinstance(request_data, list):
+            raise APIError(400, {'_schema': ['Invalid input type.']})
+
+        changes = []
+        errors = {}
+        for index, patch in enumerate(request_data):
+            if not isinstance(patch, dict) or 'pk' not in patch or not isinstance(patch.get('fields'), dict):
+                errors[str(index)] = {'_schema': ['Expected an object with "pk" and "fields".']}
+                continue
+            try:
+                data = self.schema_component.deserialize_partial(patch['fields'])
+            except APIError as e:
+                errors[str(index)] = e.extra
+                continue
+            if not data:
+                continue
+            for pks, group_data in changes:
+                if group_data == data:
+                    pks.append(patch['pk'])
+                    break
+            else:
+                changes.append(([patch['pk']], data))
+
+        if errors:
+            raise APIError(400, errors)
+        return changes
+
+    def get_bulk_delete_queryset(self, request_data):
+        '''
+        Either a list of pks or `{"filter": {"field name": value, ...}}`, only with fields known by the schema.
+        '''
+        queryset = self.get_queryset()
+        if isinstance(request_data, list):
+            return self.orm_component.filter_queryset_by_pks(queryset, request_data)
+
+        filters = request_data.get('filter') if isinstance(request_data, dict) else None
+        if not isinstance(filters, dict) or not filters:
+            raise APIError(400, {'_schema': ['Expected a list of pks or a non-empty "filter" object.']})
+        return self.orm_component.filter_queryset_by_fields(queryset, self.get_bulk_delete_filters(filters))
+
+    def get_bulk_delete_filters(self, filters):
+        '''
+        Validates `{"field name": value, ...}` filters through the schema, and maps them to model attributes. Only fields
+        that are loaded by the schema and map to plain columns can be filtered by.
+        '''
+        field_names = self.schema_component.get_field_names()
+        unknown_field_names = sorted(name for name in filters if name not in field_names)
+        if unknown_field_names:
+            raise APIError(400, {'filter': {name: ['Unknown field.'] for name in unknown_field_names}})
+
+        try:
+            data = self.schema_component.deserialize_partial(filters)
+        except APIError as e:
+            raise APIError(400, {'filter': e.extra})
+
+        column_names = self.orm_component.get_column_names()
+        attribute_filters = {}
+        errors = {}
+        for name in filters:
+            attributes = self.schema_component.get_field_attributes([name])
+            attribute = attributes[0] if attributes else None
+            # Fields not loaded by the schema (e.g. dump-only ones) are missing from `data`
+            if attribute not in column_names or attribute not in data:
+                errors[name] = ['Not filterable.']
+            else:
+                attribute_filters[attribute] = data[attribute]
+        if errors:
+            raise APIError(400, {'filter': errors})
+        return attribute_filters
+
+    def _bulk_update_steps(self):
+        changes = self.get_bulk_update_changes(self.framework_component.get_request_data())
+        all_pks = [pk for pks, _ in changes for pk in pks]
+        yield self.check_bulk_permissions_steps(self.orm_component.filter_queryset_by_pks(self.get_queryset(), all_pks))
+        count = (yield OrmCall('update_objects', self.get_queryset(), changes)) if changes else 0
+        self.cache_component.invalidate(pks=all_pks)
+        yield self.framework_component.create_response({'updated': count}, 200)
+
+    def _bulk_update(self):
+        return self.run_steps(self._bulk_update_steps())
+
+    def _bulk_delete_steps(self):
+        queryset = self.get_bulk_delete_queryset(self.framework_component.get_request_data())
+        yield self.check_bulk_permissions_steps(queryset)
+        count = yield OrmCall('delete_objects', queryset)
+        # Rows may have been picked by a filter, so their pks are not known
+        self.cache_component.invalidate()
+        yield self.framework_component.create_response({'deleted': count}, 200)
+
+    def _bulk_delete(self):
+        return self.run_steps(self._bulk_delete_steps())
+
+    def _retrieve_steps(self, pk):
+        # Permissions that depend on the instance can't be checked without fetching it, so such responses are neither
+        # cached nor answered with a 304
+        cacheable = not self.permission_component.is_instance_dependent()
+        validators = {}
+        if cacheable:
+            self.check_permissions()
+            validators = yield self.get_validators_steps(pk)
+            if self.is_fresh(validators):
+                yield self.framework_component.create_response(None, 304, headers=validators)
+                return
+            cached = self.cache_component.get_response(pk)
+            if cached is not None:
+                yield self.create_cached_response(cached, headers=validators)
+                return
+
+        instance = yield OrmCall('get_object', self.get_projected_queryset(), pk)
+        if not cacheable or 'instance_dependent' not in vars(type(self.permission_component)):
+            # Now that it's fetched, the instance is checked as well, unless the component class itself opted out
+            self.check_permissions(instance)
+        data = self.schema_component.serialize(instance)
+        if cacheable:
+            self.cache_component.set_response(data, 200, pk)
+        yield self.framework_component.create_response(data, 200, headers=validators)
 
     def _retrieve(self, pk):
-        instance = self.orm_component.get_object(self.get_queryset(), pk)
-        self.check_permissions(instance)
-        return self.framework_component.create_response(self.schema_component.serialize(instance), 200)
+        return self.run_steps(self._retrieve_steps(pk))
 
-    def _update(self, pk):
-        instance = self.orm_component.get_object(self.get_queryset(), pk)
-        self.check_permissions(instance)
+    def _update_steps(self, pk):
+        queryset = self.get_queryset()
         request_data = self.framework_component.get_request_data()
-        validated_data = self.schema_component.deserialize(request_data, instance=instance)
-        instance = self.orm_component.update_object(instance, validated_data)
-        return self.framework_component.create_response(self.schema_component.serialize(instance), 200)
+        if not self.permission_component.is_instance_dependent() and self.orm_component.can_update_object_by_pk():
+            # Permissions don't look at the instance, and the ORM updates the row right away
+            self.check_permissions()
+            validated_data = self.schema_component.deserialize_partial(request_data)
+            instance = yield OrmCall('update_object_by_pk', queryset, pk, validated_data)
+        else:
+            instance = yield OrmCall('get_object', queryset, pk)
+            self.check_permissions(instance)
+            validated_data = self.schema_component.deserialize(request_data, instance=instance)
+            instance = yield OrmCall('update_object', instance, validated_data)
+        self.cache_component.invalidate(pks=[pk])
+        yield self.framework_component.create_response(self.schema_component.serialize(instance), 200)
+
+    def _update(self, pk):
+        return self.run_steps(self._update_steps(pk))
+
+    def _delete_steps(self, pk):
+        queryset = self.get_queryset()
+        if self.permission_component.is_instance_dependent():
+            instance = yield OrmCall('get_object', queryset, pk)
+            self.check_permissions(instance)
+            yield OrmCall('delete_object', instance)
+        else:
+            # The instance is only fetched when the ORM can't delete the row right away
+            self.check_permissions()
+            if (yield OrmCall('delete_object_by_pk', queryset, pk)) is None:
+                instance = yield OrmCall('get_object', queryset, pk)
+                yield OrmCall('delete_object', instance)
+        self.cache_component.invalidate(pks=[pk])
+        yield self.framework_component.create_response(None, 204)
 
     def _delete(self, pk):
-        instance = self.orm_component.get_object(self.get_queryset(), pk)
-        self.check_permissions(instance)
-        self.orm_component.delete_object(instance)
-        return self.framework_component.create_response(None, 204)
+        return self.run_steps(self._delete_steps(pk))
 
     @api_view()
     def list(self):
@@ -171,6 +646,18 @@ class BaseAPI(object):
     def create(self):
         return self._create()
 
+    @api_view()
+    def bulk_create(self):
+        return self._bulk_create()
+
+    @api_view()
+    def bulk_update(self):
+        return self._bulk_update()
+
+    @api_view()
+    def bulk_delete(self):
+        return self._bulk_delete()
+
     @api_view()
     def retrieve(self, pk):
         return self._retrieve(pk)
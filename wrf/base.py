@@ -1,11 +1,73 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from functools import wraps
+
+from wrf.timing import TimedComponent
+
 
 class APIError(Exception):
-    def __init__(self, status_code=400, extra=None):
+    def __init__(self, status_code=400, extra=None, headers=None):
         super(APIError, self).__init__()
         self.status_code = status_code
         self.extra = extra or {}
+        self.headers = headers or {}
+
+
+class Context(dict):
+    '''
+    The context shared by the orchestrator and its components.
+    Values set through `set_lazy` are computed on first read (either via `context[key]` or `context.get(key)`) and then
+    kept. Note they do not show up when iterating the context before that.
+    '''
+    def __init__(self, *args, **kwargs):
+        super(Context, self).__init__(*args, **kwargs)
+        self.lazy_values = {}
+
+    def set_lazy(self, key, getter):
+        self.pop(key, None)
+        self.lazy_values[key] = getter
+
+    def __missing__(self, key):
+        if key not in self.lazy_values:
+            raise KeyError(key)
+        value = self[key] = self.lazy_values.pop(key)()
+        return value
+
+    def __contains__(self, key):
+        return super(Context, self).__contains__(key) or key in self.lazy_values
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+def get_component_instance(context, name):
+    '''
+    Returns the instance of the component `name` for this context (i.e.: for this request), building it at most once.
+    When the request is timed (see `BaseAPI.server_timing`), the component calls are timed as the phase `name`.
+    '''
+    instances = context.setdefault('instances', {})
+    if name not in instances:
+        instance = context[name](context)
+        timer = context.get('timer')
+        if timer is not None:
+            instance = TimedComponent(instance, name, timer)
+        instances[name] = instance
+    return instances[name]
+
+
+def memoize(method):
+    '''
+    Caches the result of an argument-less method in the instance it's called on.
+    As components live for a single request, this is useful to share per-request state (e.g. the parsed request body).
+    '''
+    attr_name = '_memoized_{}'.format(method.__name__)
+
+    @wraps(method)
+    def wrapped(self):
+        if attr_name not in self.__dict__:
+            self.__dict__[attr_name] = method(self)
+        return self.__dict__[attr_name]
+    return wrapped
 
 
 class BaseComponent(object):
@@ -14,4 +76,4 @@ class BaseComponent(object):
         self.context = context
 
     def get_instance_from_context(self, name):
-        return self.context[name](self.context)
+        return get_component_instance(self.context, name)
@@ -0,0 +1,207 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from wrf.base import BaseComponent
+from wrf.compat import urlencode
+
+
+class BaseCacheBackend(object):
+    '''
+    Where cached responses are stored. Implement it on top of a shared store (e.g. memcached or redis) so that several
+    processes share the cache, and so that invalidations done by any of them are seen by all of them.
+    Keys are strings and values any picklable object.
+    '''
+    def get(self, key):
+        '''
+        Returns `None` for missing (or expired) keys.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def set(self, key, value, ttl=None):
+        '''
+        `ttl` is in seconds, `None` meaning no expiration (other than eviction).
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def delete(self, key):
+        raise NotImplementedError()  # pragma: no cover
+
+
+class LocalMemoryCacheBackend(BaseCacheBackend):
+    '''
+    A bounded (least recently used entries are evicted first) in-process cache, whose entries may also expire.
+    It is thread-safe, but not shared among processes: invalidations done by one process are not seen by the others,
+    which then serve stale entries for up to their TTL.
+    '''
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires_at, value = self._entries.pop(key)
+            except KeyError:
+                return None
+            if expires_at is not None and expires_at <= time.time():
+                return None
+            self._entries[key] = (expires_at, value)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_size:
+                self._entries.popitem(last=False)
+            self._entries[key] = (expires_at, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class BaseCacheComponent(BaseComponent):
+    def get_response(self, pk=None):
+        '''
+        Returns the `(body, status_code)` cached for this request, `body` being the encoded response data, or `None`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def set_response(self, data, status_code, pk=None):
+        raise NotImplementedError()  # pragma: no cover
+
+    def invalidate(self, pks=None):
+        '''
+        Invalidates the cached lists and the cached instances with `pks`. `None` means everything cached for the model.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+
+class NoCacheComponent(BaseCacheComponent):
+    def get_response(self, pk=None):
+        return None
+
+    def set_response(self, data, status_code, pk=None):
+        pass
+
+    def invalidate(self, pks=None):
+        pass
+
+
+class CacheComponent(BaseCacheComponent):
+    '''
+    Caches the encoded responses of `list` and `retrieve` (and views built on them), keyed by model, API class and method,
+    pk, query string and user.
+    Writes done through the API invalidate the entries they affect: creating invalidates lists, updating or deleting an
+    instance invalidates lists and that instance, and bulk updates or deletes invalidate everything for the model.
+
+    Nothing is deleted from the backend, though: keys embed versions (stored in the backend as well), and invalidating
+    just replaces them, so stale entries become unreachable and are left to expire or get evicted. This way any backend
+    supporting plain get/set can be used, and a version evicted from the backend simply invalidates what it covered.
+
+    By default each user has their own entries (see `get_user_scope`). Use `per_user=False` for responses that are the
+    same for everybody.
+    '''
+    def __init__(self, context, backend=None, ttl=60, per_user=True):
+        super(CacheComponent, self).__init__(context)
+        self.backend = backend if backend is not None else default_backend
+        self.ttl = ttl
+        self.per_user = per_user
+        self._keys = {}
+
+    def get_namespace(self):
+        model_class = self.context['model_class']
+        return 'wrf:{}.{}'.format(model_class.__module__, model_class.__name__)
+
+    def get_user_scope(self):
+        if not self.per_user:
+            return ''
+        user = self.context['current_user']
+        if user is None:
+            return ''
+        for attr_name in ('pk', 'id'):
+            value = getattr(user, attr_name, None)
+            if value is not None:
+                return '{}:{}'.format(attr_name, value)
+        return repr(user)
+
+    def get_query_items(self):
+        '''
+        The `(name, value)` pairs of the query string, sorted by name, with all the values of repeated parameters (in
+        their order) whichever the multi-dict flavor of the framework is.
+        '''
+        query = self.get_instance_from_context('framework').get_request_query()
+        get_values = getattr(query, 'getlist', None) or getattr(query, 'getall', None) or query.get
+        items = []
+        for name in sorted(set(query.keys())):
+            values = get_values(name)
+            if not isinstance(values, (list, tuple)):
+                values = [values]
+            items.extend((name, value) for value in values)
+        return items
+
+    def get_query_string(self):
+        return urlencode(self.get_query_items())
+
+    def _get_version(self, name):
+        key = '{}:version:{}'.format(self.get_namespace(), name)
+        version = self.backend.get(key)
+        if version is None:
+            version = self._bump_version(name)
+        return version
+
+    def _bump_version(self, name):
+        version = uuid.uuid4().hex
+        self.backend.set('{}:version:{}'.format(self.get_namespace(), name), version)
+        return version
+
+    def get_api_name(self):
+        # APIs on the same model may differ in schema or queryset, so they don't share entries
+        api_class = self.context['api_class']
+        return '{}.{}'.format(api_class.__module__, getattr(api_class, '__qualname__', api_class.__name__))
+
+    def get_key(self, pk=None):
+        versions = [self._get_version('all')]
+        versions.append(self._get_version('list' if pk is None else 'pk:{}'.format(pk)))
+        api_method_name = self.context['api_method_name']
+        parts = versions + [self.get_api_name(), api_method_name, '' if pk is None else str(pk), self.get_query_string(),
+                            self.get_user_scope()]
+        digest = hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+        return '{}:response:{}'.format(self.get_namespace(), digest)
+
+    def _get_request_key(self, pk):
+        # Computed once per request, so a response is stored under the versions it was read with: if the data changed
+        # meanwhile, the entry is already stale and never served.
+        if pk not in self._keys:
+            self._keys[pk] = self.get_key(pk)
+        return self._keys[pk]
+
+    def get_response(self, pk=None):
+        return self.backend.get(self._get_request_key(pk))
+
+    def set_response(self, data, status_code, pk=None):
+        body = self.get_instance_from_context('framework').encode_json(data)
+        self.backend.set(self._get_request_key(pk), (body, status_code), self.ttl)
+
+    def invalidate(self, pks=None):
+        if pks is None:
+            self._bump_version('all')
+            return
+        self._bump_version('list')
+        for pk in pks:
+            self._bump_version('pk:{}'.format(pk))
+
+
+# Shared by the `CacheComponent`s not given a backend.
+default_backend = LocalMemoryCacheBackend()
@@ -5,8 +5,23 @@ import sys
 if sys.version_info.major == 2:
     from urlparse import urlparse, parse_qsl, urlunparse
     from urllib import urlencode
+    from datetime import timedelta, tzinfo
     JSONDecodeError = ValueError
 
+    class UTC(tzinfo):
+        def utcoffset(self, dt):
+            return timedelta(0)
+
+        def tzname(self, dt):
+            return 'UTC'
+
+        def dst(self, dt):
+            return timedelta(0)
+
+    utc = UTC()
+
 else:
     from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
     from json import JSONDecodeError
+    from datetime import timezone
+    utc = timezone.utc
@@ -0,0 +1,48 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import calendar
+import hashlib
+from datetime import datetime
+from email.utils import formatdate, mktime_tz, parsedate_tz
+
+
+def get_validator_headers(version, count=None):
+    '''
+    Builds the `ETag` (and, if `version` is a datetime, `Last-Modified`) headers for a resource whose state is summarized
+    by `version`: a version number or modification datetime of an instance, or the latest of them for a list (in which
+    case `count` must be given too, so deletions change the ETag as well).
+    Naive datetimes are taken as UTC.
+    '''
+    state = '{!r}:{!r}'.format(version, count)
+    headers = {'ETag': 'W/"{}"'.format(hashlib.sha1(state.encode('utf-8')).hexdigest())}
+    if isinstance(version, datetime):
+        headers['Last-Modified'] = formatdate(calendar.timegm(version.utctimetuple()), usegmt=True)
+    return headers
+
+
+def _parse_http_date(value):
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    try:
+        return mktime_tz(parsed)
+    except (OverflowError, ValueError):
+        return None
+
+
+def is_not_modified(validator_headers, if_none_match=None, if_modified_since=None):
+    '''
+    Whether the client copy, described by the conditional request headers, is still fresh. As per RFC 7232,
+    `If-Modified-Since` is only considered when there's no `If-None-Match`. ETags are compared weakly.
+    '''
+    if if_none_match:
+        etag = validator_headers['ETag']
+        client_etags = [value.strip() for value in if_none_match.split(',')]
+        return '*' in client_etags or any(value.replace('W/', '', 1) == etag.replace('W/', '', 1) for value in client_etags)
+
+    last_modified = validator_headers.get('Last-Modified')
+    if if_modified_since and last_modified:
+        client_timestamp = _parse_http_date(if_modified_since)
+        return client_timestamp is not None and _parse_http_date(last_modified) <= client_timestamp
+
+    return False
@@ -0,0 +1,89 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+def encode_extra_types(obj):
+    '''
+    Encodes what schemas usually leave untouched but plain JSON encoders do not support.
+    '''
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, uuid.UUID)):
+        return str(obj)
+    raise TypeError('Object of type {} is not JSON serializable'.format(type(obj).__name__))
+
+
+class BaseJSONEncoder(object):
+    '''
+    Encodes response bodies and decodes request bodies. Decoding errors must be `ValueError`s.
+    '''
+    content_type = 'application/json'
+
+    def dumps(self, data):
+        '''
+        Returns UTF-8 encoded bytes.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def loads(self, data):
+        '''
+        `data` may be either bytes or text.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+
+class StdlibJSONEncoder(BaseJSONEncoder):
+    def dumps(self, data):
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=encode_extra_types).encode('utf-8')
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class UjsonJSONEncoder(BaseJSONEncoder):
+    def dumps(self, data):
+        try:
+            return ujson.dumps(data, ensure_ascii=False).encode('utf-8')
+        except TypeError:
+            return StdlibJSONEncoder().dumps(data)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class OrjsonJSONEncoder(BaseJSONEncoder):
+    def dumps(self, data):
+        return orjson.dumps(data, default=encode_extra_types, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def get_default_json_encoder():
+    '''
+    The fastest encoder available: orjson, then ujson, then the standard library.
+    '''
+    if orjson is not None:
+        return OrjsonJSONEncoder()
+    if ujson is not None:
+        return UjsonJSONEncoder()  # pragma: no cover
+    return StdlibJSONEncoder()  # pragma: no cover
+
+
+default_json_encoder = get_default_json_encoder()
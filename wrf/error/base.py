@@ -12,4 +12,4 @@ class DefaultErrorComponent(BaseErrorComponent):
     def handle_exception(self, exception):
         data = {'status_code': exception.status_code}
         data.update(exception.extra)
-        return self.get_instance_from_context('framework').create_response(data, exception.status_code)
+        return self.get_instance_from_context('framework').create_response(data, exception.status_code, headers=exception.headers)
@@ -1,9 +1,15 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from itertools import chain
+
 from wrf.base import BaseComponent
+from wrf.encoding import default_json_encoder
 
 
 class BaseFrameworkComponent(BaseComponent):
+    # Encodes response bodies and decodes request ones, see `wrf.encoding`. Override it in a subclass to use another one.
+    json_encoder = default_json_encoder
+
     def get_request_data(self):
         # TODO: add support to FILES data
         raise NotImplementedError()  # pragma: no cover
@@ -14,8 +20,68 @@ class BaseFrameworkComponent(BaseComponent):
     def get_request_method(self):
         raise NotImplementedError()  # pragma: no cover
 
+    def get_request_header(self, name):
+        '''
+        Returns the value of the header `name` (case-insensitive), or `None`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_request_remote_addr(self):
+        '''
+        Returns the IP address of the client (as seen by the server, so possibly a proxy's), or `None`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
     def get_request_url(self):
         raise NotImplementedError()  # pragma: no cover
 
     def create_response(self, data, status_code, headers=None):
         raise NotImplementedError()  # pragma: no cover
+
+    def create_raw_response(self, body, status_code, content_type, headers=None):
+        '''
+        Creates a response whose `body` (bytes) is already encoded.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def set_response_header(self, response, name, value):
+        '''
+        Sets a header of a `response` already created by this component.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def encode_json(self, data):
+        return self.json_encoder.dumps(data)
+
+    def decode_json(self, body):
+        '''
+        Returns `{}` for empty or invalid bodies.
+        '''
+        if not body:
+            return {}
+        try:
+            return self.json_encoder.loads(body)
+        except ValueError:
+            return {}
+
+    def iter_json_array(self, chunks):
+        '''
+        Encodes an iterable of lists as a single JSON array, piece by piece (as bytes).
+        '''
+        yield b'['
+        first = True
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if not first:
+                yield b','
+            yield self.encode_json(chunk)[1:-1]
+            first = False
+        yield b']'
+
+    def create_streaming_response(self, chunks, status_code, headers=None):
+        '''
+        Creates a response whose body is the JSON array of all items in `chunks` (an iterable of lists), sent while
+        `chunks` is consumed. Frameworks not supporting streaming fall back to a regular response.
+        '''
+        return self.create_response(list(chain.from_iterable(chunks)), status_code, headers=headers)
@@ -1,27 +1,31 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import json
-
 from chalice import Response
 
-from wrf.compat import JSONDecodeError, urlencode
+from wrf.base import memoize
+from wrf.compat import urlencode
 
 from .base import BaseFrameworkComponent
 
 
 class ChaliceFrameworkComponent(BaseFrameworkComponent):
+    @memoize
     def get_request_data(self):
-        try:
-            return json.loads(self.context['request'].raw_body.decode('utf-8'))
-        except JSONDecodeError:
-            return {}
+        return self.decode_json(self.context['request'].raw_body)
 
+    @memoize
     def get_request_query(self):
         return self.context['request'].query_params or {}
 
     def get_request_method(self):
         return self.context['request'].method
 
+    def get_request_header(self, name):
+        return self.context['request'].headers.get(name)
+
+    def get_request_remote_addr(self):
+        return (self.context['request'].context or {}).get('identity', {}).get('sourceIp')
+
     def get_request_url(self):
         request_dict = self.context['request'].to_dict()
         query_params = urlencode(self.get_request_query())
@@ -31,5 +35,16 @@ class ChaliceFrameworkComponent(BaseFrameworkComponent):
         return url
 
     def create_response(self, data, status_code, headers=None):
-        headers = headers or {}
-        return Response(body=json.dumps(data), status_code=status_code, headers=headers)
+        headers = dict(headers or {})
+        headers.setdefault('Content-Type', self.json_encoder.content_type)
+        # Chalice takes bytes as binary content (to be base64 encoded), so the body goes as text
+        body = '' if status_code == 304 else self.encode_json(data).decode('utf-8')
+        return Response(body=body, status_code=status_code, headers=headers)
+
+    def create_raw_response(self, body, status_code, content_type, headers=None):
+        headers = dict(headers or {})
+        headers['Content-Type'] = content_type
+        return Response(body=body.decode('utf-8'), status_code=status_code, headers=headers)
+
+    def set_response_header(self, response, name, value):
+        response.headers[name] = value
@@ -1,10 +1,8 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import json
+from django.http import HttpResponse, StreamingHttpResponse
 
-from django.http import HttpResponse, JsonResponse
-
-from wrf.compat import JSONDecodeError
+from wrf.base import memoize
 
 from .base import BaseFrameworkComponent
 
@@ -14,28 +12,52 @@ class DjangoFrameworkComponent(BaseFrameworkComponent):
         super(DjangoFrameworkComponent, self).__init__(context)
         self.receive_data_as_json = receive_data_as_json
 
+    @memoize
     def get_request_data(self):
         if not self.receive_data_as_json:
             return dict(self.context['request'].POST.items())
-        try:
-            return json.loads(self.context['request'].body.decode('utf-8'))
-        except JSONDecodeError:
-            return {}
+        return self.decode_json(self.context['request'].body)
 
+    @memoize
     def get_request_query(self):
         return self.context['request'].GET or {}
 
     def get_request_method(self):
         return self.context['request'].method
 
+    def get_request_header(self, name):
+        return self.context['request'].META.get('HTTP_{}'.format(name.upper().replace('-', '_')))
+
+    def get_request_remote_addr(self):
+        return self.context['request'].META.get('REMOTE_ADDR')
+
     def get_request_url(self):
         return self.context['request'].build_absolute_uri()
 
     def create_response(self, data, status_code, headers=None):
-        if status_code == 204:
-            response = HttpResponse(status=204)
+        if status_code in (204, 304):
+            response = HttpResponse(status=status_code)
         else:
-            response = JsonResponse(data, status=status_code, safe=False)
+            response = HttpResponse(self.encode_json(data), status=status_code, content_type=self.json_encoder.content_type)
+
+        headers = headers or {}
+        for key, value in headers.items():
+            response[key] = value
+
+        return response
+
+    def create_raw_response(self, body, status_code, content_type, headers=None):
+        response = HttpResponse(body, status=status_code, content_type=content_type)
+        for key, value in (headers or {}).items():
+            response[key] = value
+        return response
+
+    def set_response_header(self, response, name, value):
+        response[name] = value
+
+    def create_streaming_response(self, chunks, status_code, headers=None):
+        response = StreamingHttpResponse(self.iter_json_array(chunks), status=status_code,
+                                         content_type=self.json_encoder.content_type)
 
         headers = headers or {}
         for key, value in headers.items():
@@ -2,6 +2,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import falcon
 
+from wrf.base import memoize
+
 from .base import BaseFrameworkComponent
 
 
@@ -13,15 +15,29 @@ class FalconFrameworkComponent(BaseFrameworkComponent):
     def _get_status_code_as_falcon_attribute(self, int_status_code):
         return getattr(falcon, 'HTTP_{}'.format(int_status_code))
 
+    @memoize
     def get_request_data(self):
-        return self.context['request'].media or {}
+        # JSON bodies are decoded by `json_encoder`, unless already read (e.g. by a middleware) as `req.media`. Other
+        # media types are left to the media handlers of the app.
+        request = self.context['request']
+        media_type = (request.content_type or request.options.default_media_type).split(';')[0].strip().lower()
+        if media_type != falcon.MEDIA_JSON or request.bounded_stream.is_exhausted:
+            return request.media or {}
+        return self.decode_json(request.bounded_stream.read())
 
+    @memoize
     def get_request_query(self):
         return self.context['request'].params or {}
 
     def get_request_method(self):
         return self.context['request'].method
 
+    def get_request_header(self, name):
+        return self.context['request'].get_header(name)
+
+    def get_request_remote_addr(self):
+        return self.context['request'].remote_addr
+
     def get_request_url(self):
         url = self.context['request'].url
 
@@ -35,5 +51,27 @@ class FalconFrameworkComponent(BaseFrameworkComponent):
         headers = headers or {}
         for key, value in headers.items():
             self.context['response'].append_header(key, value)
-        self.context['response'].media = data
+        if status_code not in (204, 304):
+            # `media` stays available to middlewares, but Falcon sends `data` when set, so its media handlers are skipped
+            self.context['response'].media = data
+            self.context['response'].content_type = self.json_encoder.content_type
+            self.context['response'].data = self.encode_json(data)
+        self.context['response'].status = self._get_status_code_as_falcon_attribute(status_code)
+
+    def create_raw_response(self, body, status_code, content_type, headers=None):
+        for key, value in (headers or {}).items():
+            self.context['response'].append_header(key, value)
+        self.context['response'].content_type = content_type
+        self.context['response'].data = body
+        self.context['response'].status = self._get_status_code_as_falcon_attribute(status_code)
+
+    def set_response_header(self, response, name, value):
+        self.context['response'].set_header(name, value)
+
+    def create_streaming_response(self, chunks, status_code, headers=None):
+        headers = headers or {}
+        for key, value in headers.items():
+            self.context['response'].append_header(key, value)
+        self.context['response'].content_type = self.json_encoder.content_type
+        self.context['response'].stream = self.iter_json_array(chunks)
         self.context['response'].status = self._get_status_code_as_falcon_attribute(status_code)
@@ -1,6 +1,8 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from flask import jsonify, make_response
+from flask import Response, stream_with_context
+
+from wrf.base import memoize
 
 from .base import BaseFrameworkComponent
 
@@ -10,23 +12,48 @@ class FlaskFrameworkComponent(BaseFrameworkComponent):
         super(FlaskFrameworkComponent, self).__init__(context)
         self.receive_data_as_json = receive_data_as_json
 
+    @memoize
     def get_request_data(self):
         if self.receive_data_as_json:
-            return self.context['request'].json or {}
+            request = self.context['request']
+            if not request.is_json:
+                return {}
+            body = request.get_data()
+            if not body:
+                return {}
+            try:
+                return self.json_encoder.loads(body) or {}
+            except ValueError as e:
+                # A 400, as `request.get_json` does (unless the app overrides it)
+                return request.on_json_loading_failed(e)
         return self.context['request'].form or {}
 
+    @memoize
     def get_request_query(self):
         return self.context['request'].args or {}
 
     def get_request_method(self):
         return self.context['request'].method
 
+    def get_request_header(self, name):
+        return self.context['request'].headers.get(name)
+
+    def get_request_remote_addr(self):
+        return self.context['request'].remote_addr
+
     def get_request_url(self):
         return self.context['request'].url
 
     def create_response(self, data, status_code, headers=None):
-        headers = headers or {}
-        response = make_response(jsonify(data), status_code)
-        for key, value in headers.items():
-            response.headers[key] = value
-        return response
+        body = b'' if status_code in (204, 304) else self.encode_json(data)
+        return Response(body, status=status_code, headers=headers or {}, mimetype=self.json_encoder.content_type)
+
+    def create_raw_response(self, body, status_code, content_type, headers=None):
+        return Response(body, status=status_code, headers=headers or {}, content_type=content_type)
+
+    def set_response_header(self, response, name, value):
+        response.headers[name] = value
+
+    def create_streaming_response(self, chunks, status_code, headers=None):
+        body = stream_with_context(self.iter_json_array(chunks))
+        return Response(body, status=status_code, headers=headers or {}, mimetype=self.json_encoder.content_type)
@@ -1,8 +1,8 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from pyramid.httpexceptions import HTTPNoContent
+from pyramid.httpexceptions import HTTPNoContent, HTTPNotModified
 
-from wrf.compat import JSONDecodeError
+from wrf.base import memoize
 
 from .base import BaseFrameworkComponent
 
@@ -12,29 +12,61 @@ class PyramidFrameworkComponent(BaseFrameworkComponent):
         super(PyramidFrameworkComponent, self).__init__(context)
         self.receive_data_as_json = receive_data_as_json
 
+    @memoize
     def get_request_data(self):
         if self.receive_data_as_json:
-            try:
-                return self.context['request'].json_body or {}
-            except JSONDecodeError:
-                # TODO [later]: Add a warning here?
-                return {}
+            return self.decode_json(self.context['request'].body)
 
         return self.context['request'].POST or {}
 
+    @memoize
     def get_request_query(self):
         return self.context['request'].params or {}
 
     def get_request_method(self):
         return self.context['request'].method
 
+    def get_request_header(self, name):
+        return self.context['request'].headers.get(name)
+
+    def get_request_remote_addr(self):
+        return self.context['request'].remote_addr
+
     def get_request_url(self):
         return '{}{}'.format(self.context['request'].host_url, self.context['request'].path_qs)
 
     def create_response(self, data, status_code, headers=None):
         headers = headers or {}
-        self.context['request'].response.headers.update(headers)
+        # Returned rather than raised, so they're handled (and accounted) as any other successful response. Their own
+        # response objects are used as `request.response` would keep a body, see https://github.com/Pylons/pyramid/issues/709
         if status_code == 204:
-            raise HTTPNoContent()  # See https://github.com/Pylons/pyramid/issues/709
-        self.context['request'].response.status = status_code
-        return data
+            return HTTPNoContent(headers=headers)
+        if status_code == 304:
+            return HTTPNotModified(headers=headers)
+
+        # Returning the response itself (instead of data) bypasses the view renderer, as the body is already encoded.
+        response = self.context['request'].response
+        response.headers.update(headers)
+        response.status = status_code
+        response.content_type = self.json_encoder.content_type
+        response.body = self.encode_json(data)
+        return response
+
+    def create_raw_response(self, body, status_code, content_type, headers=None):
+        response = self.context['request'].response
+        response.headers.update(headers or {})
+        response.status = status_code
+        response.content_type = content_type
+        response.body = body
+        return response
+
+    def set_response_header(self, response, name, value):
+        response.headers[name] = value
+
+    def create_streaming_response(self, chunks, status_code, headers=None):
+        response = self.context['request'].response
+        response.headers.update(headers or {})
+        response.status = status_code
+        response.content_type = self.json_encoder.content_type
+        response.app_iter = self.iter_json_array(chunks)
+        return response
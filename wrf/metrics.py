@@ -0,0 +1,239 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import glob
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+from wrf.base import Context
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# In seconds, as recommended by Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUESTS = 'wrf_requests_total'
+ERRORS = 'wrf_request_errors_total'
+DURATION = 'wrf_request_duration_seconds'
+
+
+class BaseMetricsStore(object):
+    '''
+    Where metric values are kept. Keys are strings, and values floats that are only ever incremented.
+    '''
+    def inc(self, key, amount=1):
+        raise NotImplementedError()  # pragma: no cover
+
+    def collect(self):
+        '''
+        Returns a dict with the value of every key.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+
+class LocalMetricsStore(BaseMetricsStore):
+    '''
+    Keeps values in process memory, so each worker process reports its own metrics only.
+    '''
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key, amount=1):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class _MmapValues(object):
+    '''
+    A file-backed, memory-mapped dict of floats, written by a single process.
+    The file starts with the number of bytes in use (8 bytes), followed by entries: the key length (4 bytes), the UTF-8
+    encoded key (padded to 8 bytes) and the value (a double). New entries are written before the number of bytes in use
+    is updated, so readers never see partial entries.
+    '''
+    initial_size = 1 << 16
+
+    def __init__(self, path):
+        self._file = io.open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.truncate(self.initial_size)
+            size = self.initial_size
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = struct.unpack_from('q', self._map, 0)[0] or 8
+        self._positions = {key: position for key, _, position in self.read_entries(self._map, self._used)}
+
+    @staticmethod
+    def read_entries(data, used=None):
+        if used is None:
+            used = struct.unpack_from('q', data, 0)[0] or 8
+        position = 8
+        while position < used:
+            key_length = struct.unpack_from('i', data, position)[0]
+            key_end = position + 4 + key_length
+            value_position = key_end + (-key_end % 8)
+            key = bytes(data[position + 4:key_end]).decode('utf-8')
+            yield key, struct.unpack_from('d', data, value_position)[0], value_position
+            position = value_position + 8
+
+    def _add_entry(self, key):
+        encoded = key.encode('utf-8')
+        key_end = self._used + 4 + len(encoded)
+        value_position = key_end + (-key_end % 8)
+        if value_position + 8 > len(self._map):
+            size = len(self._map)
+            while value_position + 8 > size:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+
+        struct.pack_into('i', self._map, self._used, len(encoded))
+        self._map[self._used + 4:key_end] = encoded
+        struct.pack_into('d', self._map, value_position, 0)
+        self._used = value_position + 8
+        struct.pack_into('q', self._map, 0, self._used)
+        self._positions[key] = value_position
+        return value_position
+
+    def inc(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._add_entry(key)
+        struct.pack_into('d', self._map, position, struct.unpack_from('d', self._map, position)[0] + amount)
+
+
+class MmapMetricsStore(BaseMetricsStore):
+    '''
+    Shares metrics among the worker processes of a server (e.g. gunicorn's): each process writes to its own
+    memory-mapped file in `directory` (so writes need no inter-process locking), and `collect` adds up all of them.
+    Files of workers that are gone are still read, so counters don't go back when workers are replaced. Empty the
+    directory when (re)starting the server.
+    '''
+    def __init__(self, directory):
+        self.directory = directory
+        self._values = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_values(self):
+        # A forked worker must not write to its parent's file.
+        pid = os.getpid()
+        if self._pid != pid:
+            self._values = _MmapValues(os.path.join(self.directory, 'wrf_metrics_{}.db'.format(pid)))
+            self._pid = pid
+        return self._values
+
+    def inc(self, key, amount=1):
+        with self._lock:
+            self._get_values().inc(key, amount)
+
+    def collect(self):
+        values = {}
+        for path in glob.glob(os.path.join(self.directory, 'wrf_metrics_*.db')):
+            with io.open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < 8:
+                continue
+            for key, value, _ in _MmapValues.read_entries(data):
+                values[key] = values.get(key, 0) + value
+        return values
+
+
+def _escape(value):
+    return '{}'.format(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labels):
+    return '{{{}}}'.format(','.join('{}="{}"'.format(name, _escape(value)) for name, value in labels))
+
+
+def _format_value(value):
+    return repr(float(value))
+
+
+class MetricsCollector(object):
+    '''
+    Records, per API class and method, request counts, errors (by status code, unhandled exceptions counting as 500s)
+    and durations (in a fixed-bucket histogram). Set it as `BaseAPI.metrics_collector`, and expose it with
+    `render_metrics`.
+    '''
+    def __init__(self, store=None, buckets=DEFAULT_BUCKETS):
+        self.store = store if store is not None else LocalMetricsStore()
+        self.buckets = tuple(buckets)
+        self._keys = {}
+
+    def _key(self, name, api_name, api_method_name, extra=''):
+        parts = (name, api_name, api_method_name, extra)
+        key = self._keys.get(parts)
+        if key is None:
+            key = self._keys[parts] = json.dumps(parts)
+        return key
+
+    def observe_request(self, api_name, api_method_name, duration, error_status=None):
+        inc = self.store.inc
+        inc(self._key(REQUESTS, api_name, api_method_name))
+        if error_status is not None:
+            inc(self._key(ERRORS, api_name, api_method_name, error_status))
+        inc(self._key(DURATION, api_name, api_method_name, bisect_left(self.buckets, duration)))
+        inc(self._key(DURATION + '_sum', api_name, api_method_name), duration)
+
+    def render(self):
+        '''
+        Returns all metrics in the Prometheus text exposition format.
+        '''
+        metrics = OrderedDict((name, {}) for name in (REQUESTS, ERRORS, DURATION, DURATION + '_sum'))
+        for key, value in self.store.collect().items():
+            name, api_name, api_method_name, extra = json.loads(key)
+            metrics[name][(api_name, api_method_name, extra)] = value
+
+        lines = [
+            '# HELP {} Requests handled, per API and method.'.format(REQUESTS),
+            '# TYPE {} counter'.format(REQUESTS),
+        ]
+        for (api_name, api_method_name, _), value in sorted(metrics[REQUESTS].items()):
+            lines.append('{}{} {}'.format(REQUESTS, _format_labels([('api', api_name), ('method', api_method_name)]),
+                                          _format_value(value)))
+
+        lines.append('# HELP {} Requests answered with an error, per API, method and status code.'.format(ERRORS))
+        lines.append('# TYPE {} counter'.format(ERRORS))
+        for (api_name, api_method_name, status), value in sorted(metrics[ERRORS].items()):
+            labels = [('api', api_name), ('method', api_method_name), ('status', status)]
+            lines.append('{}{} {}'.format(ERRORS, _format_labels(labels), _format_value(value)))
+
+        lines.append('# HELP {} Request durations, per API and method.'.format(DURATION))
+        lines.append('# TYPE {} histogram'.format(DURATION))
+        bucket_counts = {}
+        for (api_name, api_method_name, index), value in metrics[DURATION].items():
+            counts = bucket_counts.setdefault((api_name, api_method_name), [0] * (len(self.buckets) + 1))
+            counts[index] += value
+        for (api_name, api_method_name), counts in sorted(bucket_counts.items()):
+            labels = [('api', api_name), ('method', api_method_name)]
+            cumulative = 0
+            for le, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                bucket_labels = labels + [('le', le if le == '+Inf' else _format_value(le))]
+                lines.append('{}_bucket{} {}'.format(DURATION, _format_labels(bucket_labels), _format_value(cumulative)))
+            total = metrics[DURATION + '_sum'].get((api_name, api_method_name, ''), 0)
+            lines.append('{}_sum{} {}'.format(DURATION, _format_labels(labels), _format_value(total)))
+            lines.append('{}_count{} {}'.format(DURATION, _format_labels(labels), _format_value(cumulative)))
+
+        return '\n'.join(lines) + '\n'
+
+
+def render_metrics(collector, framework_component_class, request, response=None):
+    '''
+    A view exposing the metrics of `collector` to Prometheus, for any framework, e.g. in Flask:
+    `return render_metrics(collector, FlaskFrameworkComponent, request)`.
+    '''
+    framework_component = framework_component_class(Context({'request': request, 'response': response}))
+    return framework_component.create_raw_response(collector.render().encode('utf-8'), 200, CONTENT_TYPE)
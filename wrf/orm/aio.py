@@ -0,0 +1,61 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+from functools import partial
+
+from .base import BaseORMComponent
+
+
+def get_running_loop():
+    '''
+    `asyncio.get_running_loop` (Python 3.7+) where available. Only to be called from coroutines.
+    '''
+    if hasattr(asyncio, 'get_running_loop'):
+        return asyncio.get_running_loop()
+    return asyncio.get_event_loop()  # pragma: no cover
+
+
+class BaseAsyncORMComponent(BaseORMComponent):
+    '''
+    ORM components whose methods are coroutines. To be used with `wrf.api.aio.AsyncBaseAPI`.
+    '''
+    async def get_queryset(self, queryset):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def get_object(self, queryset, pk):
+        entries = self._get_identity_entries(pk)
+        instance = self._find_identity(entries, queryset) if entries else None
+        if instance is None:
+            instance = await self.fetch_object(queryset, pk)
+            self._add_identity(entries, queryset, instance)
+        return instance
+
+    async def fetch_object(self, queryset, pk):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def create_object(self, data):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def update_object(self, instance, data):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def update_object_by_pk(self, queryset, pk, data):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def update_objects(self, queryset, changes):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def delete_object(self, instance):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def delete_object_by_pk(self, queryset, pk):
+        return None
+
+    async def delete_objects(self, queryset):
+        raise NotImplementedError()  # pragma: no cover
+
+    async def run_sync(self, func, *args, **kwargs):
+        '''
+        Runs synchronous code that uses this ORM (e.g. pagination evaluating a queryset) without blocking the event loop.
+        '''
+        return await get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
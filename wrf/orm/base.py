@@ -1,20 +1,247 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import json
+
 from wrf.base import BaseComponent
 
+_UNSET = object()
+
+
+def get_rows_from_explain(plan):
+    '''
+    Extracts the estimated number of rows out of a PostgreSQL `EXPLAIN (FORMAT JSON)` result.
+    '''
+    if not isinstance(plan, (list, dict)):
+        plan = json.loads(plan)
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan['Plan']['Plan Rows'])
+
+
+def chunked(iterable, chunk_size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 
 class BaseORMComponent(BaseComponent):
+    '''
+    `get_object` keeps the instances it fetches in an identity map, keyed by model class and pk, along with the queryset
+    they were fetched through (see `get_queryset_key`), so fetching the same object again during the request costs
+    nothing. Like the component itself, it lives for a single request. It's cleared by any write done through the
+    component, and not used at all when the client asks for a sparse fieldset (instances may lack some columns then).
+    '''
+    def __init__(self, context, identity_map=True):
+        super(BaseORMComponent, self).__init__(context)
+        self.identity_map = {} if identity_map else None
+
     def get_queryset(self, queryset):
         raise NotImplementedError()  # pragma: no cover
 
+    def get_eager_load(self):
+        '''
+        Names of the model relations to be loaded along with the instances (see `BaseAPI.eager_load`).
+        '''
+        return self.context.get('eager_load') or ()
+
+    def load_related(self, instances):
+        '''
+        Loads, for instances that are about to be serialized, the eager relations that could not be loaded by the queryset
+        itself. Returns the instances.
+        '''
+        return instances
+
+    def iterate_queryset(self, queryset, chunk_size):
+        '''
+        Yields the queryset results as lists of (at most) `chunk_size` instances, ideally never holding the whole results
+        in memory. Subclasses are expected to use server-side cursors (or the closest thing their ORM offers).
+        '''
+        return chunked(queryset, chunk_size)
+
+    def order_queryset(self, queryset, field_names, reverse=False):
+        '''
+        Orders the queryset by the given fields (replacing any previous ordering), descending if `reverse`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def filter_queryset_after(self, queryset, field_names, values, reverse=False):
+        '''
+        Keeps only the rows coming strictly after `values` when ordering by `field_names` (strictly before, if `reverse`).
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def slice_queryset(self, queryset, offset, limit):
+        raise NotImplementedError()  # pragma: no cover
+
+    def count_queryset(self, queryset, limit=None):
+        '''
+        Counts the queryset rows. With `limit`, counting stops there (i.e.: `COUNT` over a `LIMIT` subquery).
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def estimate_count(self, queryset):
+        '''
+        Returns the number of rows in the queryset as estimated by the database planner, or `None` if not supported.
+        '''
+        return None
+
+    def get_field_value(self, instance, field_name):
+        # Rows (see `rows_queryset`) may be dicts
+        if isinstance(instance, dict):
+            return instance[field_name]
+        return getattr(instance, field_name)
+
+    def project_queryset(self, queryset, attributes):
+        '''
+        Narrows the columns loaded by `queryset` to `attributes` (plus the primary key). It's just an optimization, so
+        querysets are returned unchanged by ORMs without support or when some attribute isn't a plain column.
+        '''
+        return queryset
+
+    def rows_queryset(self, queryset, attributes):
+        '''
+        Turns `queryset` into one yielding plain rows with the values of `attributes` (mappings, or tuples with those
+        attributes) instead of model instances, which are not worth building just to be serialized. Returns `None` when
+        not supported, e.g. if some attribute isn't a plain column or relations are to be eager loaded.
+        '''
+        return None
+
+    def filter_queryset_by_pks(self, queryset, pks):
+        raise NotImplementedError()  # pragma: no cover
+
+    def filter_queryset_by_fields(self, queryset, filters):
+        '''
+        Filters by equality on every `field name: value` pair of `filters`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_column_names(self):
+        '''
+        Names of the model attributes mapped to plain columns (i.e.: the ones `filter_queryset_by_fields` accepts).
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_queryset_key(self, queryset):
+        '''
+        A value telling apart querysets that select different rows (e.g. their SQL along with its parameters), so
+        instances fetched through one of them are not returned for another. `None` means `queryset` only matches itself.
+        It's only called when an object is looked up again through another queryset object, as it usually costs compiling
+        the SQL.
+        '''
+        return None
+
+    def _get_identity_entries(self, pk):
+        '''
+        The `[queryset, queryset key, instance]` entries for `pk`, to look up instances in or to add them to, or `None`
+        when the identity map is not used.
+        '''
+        if self.identity_map is None or self.context.get('fields'):
+            return None
+        return self.identity_map.setdefault((self.context['model_class'], pk), [])
+
+    def _add_identity(self, entries, queryset, instance):
+        if entries is not None:
+            entries.append([queryset, _UNSET, instance])  # The queryset key is computed on demand
+
+    def _find_identity(self, entries, queryset):
+        for entry in entries:
+            if entry[0] is queryset:
+                return entry[2]
+        queryset_key = None
+        for entry in entries:
+            if queryset_key is None:
+                queryset_key = self.get_queryset_key(queryset)
+                if queryset_key is None:
+                    return None
+            if entry[1] is _UNSET:
+                entry[1] = self.get_queryset_key(entry[0])
+            if entry[1] is not None and entry[1] == queryset_key:
+                return entry[2]
+        return None
+
     def get_object(self, queryset, pk):
+        entries = self._get_identity_entries(pk)
+        instance = self._find_identity(entries, queryset) if entries else None
+        if instance is None:
+            instance = self.fetch_object(queryset, pk)
+            self._add_identity(entries, queryset, instance)
+        return instance
+
+    def fetch_object(self, queryset, pk):
+        '''
+        Fetches the instance with `pk` from the database, raising a 404 `APIError` if it is not in `queryset`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def clear_identity_map(self):
+        if self.identity_map:
+            self.identity_map.clear()
+
+    def get_object_version(self, queryset, pk, field_name):
+        '''
+        Returns only the value of `field_name` (e.g. a version or a modification datetime column) for the row with `pk`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_queryset_version(self, queryset, field_name):
+        '''
+        Returns the maximum value of `field_name` among the rows of `queryset`, and how many rows there are.
+        '''
         raise NotImplementedError()  # pragma: no cover
 
     def create_object(self, data):
         raise NotImplementedError()  # pragma: no cover
 
+    def create_objects(self, data_list):
+        '''
+        Creates many objects at once, using batched inserts in a single transaction.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
     def update_object(self, instance, data):
         raise NotImplementedError()  # pragma: no cover
 
+    def can_update_object_by_pk(self):
+        '''
+        Whether `update_object_by_pk` is supported. If it isn't, the instance is fetched and passed to `update_object`.
+        '''
+        return False
+
+    def update_object_by_pk(self, queryset, pk, data):
+        '''
+        Updates the row of `queryset` with `pk` without fetching it first (i.e.: `UPDATE ... RETURNING`), returning the
+        updated instance or raising a 404 `APIError` if there's no such row. `data` is validated as a partial payload, not
+        bound to any instance (see `BaseSchemaComponent.deserialize_partial`). As no instance is involved, model hooks
+        around saving (e.g. an overridden `save`) are not run.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def update_objects(self, queryset, changes):
+        '''
+        `changes` is a list of `(pks, data)` pairs. Each pair becomes a single set-based UPDATE of the rows of `queryset`
+        with those pks, and all of them run in a single transaction. Returns how many rows were updated.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
     def delete_object(self, instance):
         raise NotImplementedError()  # pragma: no cover
+
+    def delete_object_by_pk(self, queryset, pk):
+        '''
+        Deletes the row of `queryset` with `pk` with a single DELETE, without fetching it first, raising a 404 `APIError`
+        if there's no such row. Returns `None`, having done nothing, when not supported (then the instance is fetched and
+        passed to `delete_object`), or `True` otherwise. As no instance is involved, model hooks around deleting (e.g. an
+        overridden `delete`) are not run.
+        '''
+        return None
+
+    def delete_objects(self, queryset):
+        '''
+        Deletes every row of `queryset` with a single set-based DELETE. Returns how many rows were deleted.
+        '''
+        raise NotImplementedError()  # pragma: no cover
@@ -1,32 +1,250 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from django.core.exceptions import ObjectDoesNotExist
+import django
+from django.core.exceptions import EmptyResultSet, ObjectDoesNotExist
+from django.db import connections, router, transaction
+from django.db.models import Count, Max, Q, prefetch_related_objects
 
 from wrf.base import APIError
 
-from .base import BaseORMComponent
+from .base import BaseORMComponent, chunked, get_rows_from_explain
+
+_missing = object()
+
+
+def remember_loaded_values(instance):
+    '''
+    Keeps the column values of `instance` as they are in the database, so `get_update_fields` can tell what changes.
+    '''
+    instance._wrf_loaded_values = {
+        field.attname: instance.__dict__[field.attname]
+        for field in instance._meta.concrete_fields
+        if field.attname in instance.__dict__  # Deferred ones are not there
+    }
+    return instance
+
+
+def get_update_fields(instance):
+    '''
+    The fields of `instance` changed since `remember_loaded_values`, plus its `auto_now` fields (as `save` only updates
+    them when listed), for `save(update_fields=...)`. `None` means all fields are to be saved: the loaded values were not
+    remembered or the primary key changed.
+    '''
+    loaded_values = instance.__dict__.get('_wrf_loaded_values')
+    if loaded_values is None:
+        return None
+    update_fields = []
+    for field in instance._meta.concrete_fields:
+        value = instance.__dict__.get(field.attname, _missing)
+        if value is not _missing and value != loaded_values.get(field.attname, _missing):
+            if field.primary_key:
+                return None
+            update_fields.append(field.name)
+    if update_fields:
+        update_fields.extend(field.name for field in instance._meta.concrete_fields
+                             if getattr(field, 'auto_now', False) and field.name not in update_fields)
+    return update_fields
+
+
+def get_auto_now_values(model_class):
+    '''
+    New values for the `auto_now` fields of `model_class`, which `QuerySet.update` (unlike `save`) leaves untouched.
+    '''
+    fields = [field for field in model_class._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    if not fields:
+        return {}
+    instance = model_class()
+    return {field.name: field.pre_save(instance, add=False) for field in fields}
+
+
+def update_rows(queryset, changes):
+    '''
+    Applies `changes` (see `BaseORMComponent.update_objects`) to the rows of `queryset`, in a single transaction. `auto_now`
+    fields are updated as well, unless the changes set them.
+    '''
+    auto_now_values = get_auto_now_values(queryset.model)
+    with transaction.atomic():
+        return sum(queryset.filter(pk__in=pks).update(**dict(auto_now_values, **data)) for pks, data in changes)
+
+
+def get_column_names(model_class):
+    return {field.name for field in model_class._meta.concrete_fields}
+
+
+def get_queryset_key(queryset):
+    try:
+        return queryset.query.sql_with_params()
+    except EmptyResultSet:  # e.g. `pk__in=[]`
+        return None
+
+
+def delete_rows(queryset):
+    # The total would also count rows deleted in cascade, so only the ones of the queryset model are reported
+    _, deleted_by_model = queryset.delete()
+    return deleted_by_model.get(queryset.model._meta.label, 0)
 
 
 class DjangoORMComponent(BaseORMComponent):
-    def get_queryset(self, queryset):
+    def __init__(self, context, batch_size=None, identity_map=True):
+        super(DjangoORMComponent, self).__init__(context, identity_map=identity_map)
+        self.batch_size = batch_size
+
+    def _split_eager_load(self):
+        model_meta = self.context['model_class']._meta
+        select_related, prefetch_related = [], []
+        for name in self.get_eager_load():
+            field = model_meta.get_field(name)
+            (select_related if field.many_to_one or field.one_to_one else prefetch_related).append(name)
+        return select_related, prefetch_related
+
+    def eager_load_queryset(self, queryset):
+        select_related, prefetch_related = self._split_eager_load()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
         return queryset
 
-    def get_object(self, queryset, pk):
+    def get_queryset(self, queryset):
+        return self.eager_load_queryset(queryset)
+
+    def iterate_queryset(self, queryset, chunk_size):
+        if django.VERSION < (2, 0):
+            return chunked(queryset.iterator(), chunk_size)
+        chunks = chunked(queryset.iterator(chunk_size=chunk_size), chunk_size)
+        _, prefetch_related = self._split_eager_load()
+        if prefetch_related and django.VERSION < (4, 1):
+            # `iterator()` ignores `prefetch_related` before Django 4.1, so it's done for each chunk instead
+            return self._prefetch_chunks(chunks, prefetch_related)
+        return chunks
+
+    def _prefetch_chunks(self, chunks, lookups):
+        for chunk in chunks:
+            prefetch_related_objects(chunk, *lookups)
+            yield chunk
+
+    def order_queryset(self, queryset, field_names, reverse=False):
+        return queryset.order_by(*['-{}'.format(name) if reverse else name for name in field_names])
+
+    def filter_queryset_after(self, queryset, field_names, values, reverse=False):
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for index, name in enumerate(field_names):
+            condition_for_field = Q(**{'{}__{}'.format(name, lookup): values[index]})
+            for previous_name, previous_value in zip(field_names[:index], values[:index]):
+                condition_for_field &= Q(**{previous_name: previous_value})
+            condition |= condition_for_field
+        return queryset.filter(condition)
+
+    def slice_queryset(self, queryset, offset, limit):
+        return queryset[offset:offset + limit]
+
+    def count_queryset(self, queryset, limit=None):
+        if limit is not None:
+            queryset = queryset[:limit]
+        return queryset.count()
+
+    def estimate_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) {}'.format(sql), params)
+            return get_rows_from_explain(cursor.fetchone()[0])
+
+    def project_queryset(self, queryset, attributes):
+        column_names = {field.name for field in self.context['model_class']._meta.concrete_fields}
+        if not set(attributes) <= column_names:
+            return queryset
+        # Relations loaded with `select_related` can't be deferred
+        select_related, _ = self._split_eager_load()
+        return queryset.only(*set(attributes).union(select_related))
+
+    def rows_queryset(self, queryset, attributes):
+        column_names = {field.name for field in self.context['model_class']._meta.concrete_fields if not field.is_relation}
+        if self.get_eager_load() or not set(attributes) <= column_names:
+            return None
+        return queryset.values(*attributes)
+
+    def filter_queryset_by_pks(self, queryset, pks):
+        return queryset.filter(pk__in=pks)
+
+    def filter_queryset_by_fields(self, queryset, filters):
+        return queryset.filter(**filters)
+
+    def get_column_names(self):
+        return get_column_names(self.context['model_class'])
+
+    def get_queryset_key(self, queryset):
+        return get_queryset_key(queryset)
+
+    def fetch_object(self, queryset, pk):
         try:
-            return queryset.get(pk=pk)
+            return remember_loaded_values(self.eager_load_queryset(queryset).get(pk=pk))
         except ObjectDoesNotExist:
             raise APIError(404)
 
+    def get_object_version(self, queryset, pk, field_name):
+        versions = list(queryset.filter(pk=pk).values_list(field_name, flat=True)[:1])
+        if not versions:
+            raise APIError(404)
+        return versions[0]
+
+    def get_queryset_version(self, queryset, field_name):
+        result = queryset.order_by().aggregate(version=Max(field_name), count=Count('pk'))
+        return result['version'], result['count']
+
     def create_object(self, data):
         instance = self.context['model_class'](**data)
         instance.save()
         return instance
 
+    def create_objects(self, data_list):
+        '''
+        `bulk_create` only sets the primary keys of the instances on some databases (as PostgreSQL), so elsewhere rows are
+        inserted one at a time (still in a single transaction).
+        '''
+        model_class = self.context['model_class']
+        instances = [model_class(**data) for data in data_list]
+        using = router.db_for_write(model_class)
+        features = connections[using].features
+        with transaction.atomic(using=using):
+            # The feature was renamed in Django 3.0
+            if getattr(features, 'can_return_rows_from_bulk_insert', getattr(features, 'can_return_ids_from_bulk_insert', False)):
+                return model_class.objects.bulk_create(instances, batch_size=self.batch_size)
+            for instance in instances:
+                instance.save(force_insert=True, using=using)
+        return instances
+
     def update_object(self, instance, data):
+        '''
+        Only the fields that changed since the instance was fetched are written, and nothing at all (not even `pre_save`
+        and `post_save` signals are sent) if none did. Instances not fetched by this component are saved as a whole.
+        '''
+        self.clear_identity_map()
         for k, v in data.items():
             setattr(instance, k, v)
-        instance.save()
+        update_fields = get_update_fields(instance)
+        if update_fields is None or update_fields:
+            instance.save(update_fields=update_fields)
+            remember_loaded_values(instance)
         return instance
 
+    def update_objects(self, queryset, changes):
+        self.clear_identity_map()
+        return update_rows(queryset, changes)
+
     def delete_object(self, instance):
+        self.clear_identity_map()
         instance.delete()
+
+    def delete_objects(self, queryset):
+        self.clear_identity_map()
+        return delete_rows(queryset)
+
+    def delete_object_by_pk(self, queryset, pk):
+        # Like `Model.delete`, `QuerySet.delete` takes care of cascades and signals (fetching the rows only if needed)
+        if not self.delete_objects(queryset.filter(pk=pk)):
+            raise APIError(404)
+        return True
@@ -0,0 +1,75 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+
+from wrf.base import APIError
+
+from .aio import BaseAsyncORMComponent
+from .django import delete_rows, get_column_names, get_queryset_key, get_update_fields, remember_loaded_values, update_rows
+
+
+class DjangoAsyncORMComponent(BaseAsyncORMComponent):
+    '''
+    Relies on the asynchronous queryset and model methods (`aget`, `asave`, `adelete`), available as of Django 4.2.
+    '''
+    async def get_queryset(self, queryset):
+        return queryset
+
+    def get_queryset_key(self, queryset):
+        return get_queryset_key(queryset)
+
+    async def fetch_object(self, queryset, pk):
+        try:
+            return remember_loaded_values(await queryset.aget(pk=pk))
+        except ObjectDoesNotExist:
+            raise APIError(404)
+
+    async def create_object(self, data):
+        instance = self.context['model_class'](**data)
+        await instance.asave()
+        return instance
+
+    async def update_object(self, instance, data):
+        # As `DjangoORMComponent.update_object`, only changed fields are written
+        self.clear_identity_map()
+        for k, v in data.items():
+            setattr(instance, k, v)
+        update_fields = get_update_fields(instance)
+        if update_fields is None or update_fields:
+            await instance.asave(update_fields=update_fields)
+            remember_loaded_values(instance)
+        return instance
+
+    def filter_queryset_by_pks(self, queryset, pks):
+        return queryset.filter(pk__in=pks)
+
+    def filter_queryset_by_fields(self, queryset, filters):
+        return queryset.filter(**filters)
+
+    def get_column_names(self):
+        return get_column_names(self.context['model_class'])
+
+    async def update_objects(self, queryset, changes):
+        # Transactions can't span `await`s, so the whole batch runs as synchronous code
+        self.clear_identity_map()
+        return await self.run_sync(update_rows, queryset, changes)
+
+    async def delete_object(self, instance):
+        self.clear_identity_map()
+        await instance.adelete()
+
+    async def delete_object_by_pk(self, queryset, pk):
+        self.clear_identity_map()
+        _, deleted_by_model = await queryset.filter(pk=pk).adelete()
+        if not deleted_by_model.get(self.context['model_class']._meta.label, 0):
+            raise APIError(404)
+        return True
+
+    async def delete_objects(self, queryset):
+        self.clear_identity_map()
+        return await self.run_sync(delete_rows, queryset)
+
+    async def run_sync(self, func, *args, **kwargs):
+        # Database connections are per thread: as Django does, always run in the same one
+        return await sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
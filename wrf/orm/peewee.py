@@ -1,32 +1,258 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from peewee import DoesNotExist
+import operator
+from collections import defaultdict
+from functools import reduce
+
+from peewee import JOIN, DoesNotExist, ForeignKeyField, PostgresqlDatabase, SqliteDatabase, fn, sqlite3
 
 from wrf.base import APIError
 
-from .base import BaseORMComponent
+from .base import BaseORMComponent, chunked, get_rows_from_explain
+
+_missing = object()
+
+
+def has_returning_clause(database):
+    # This peewee version predates SQLite's own support (3.35+)
+    if isinstance(database, SqliteDatabase):
+        return sqlite3.sqlite_version_info >= (3, 35, 0)
+    return database.returning_clause
 
 
 class PeeweeORMComponent(BaseORMComponent):
-    def get_queryset(self, queryset):
+    '''
+    With `write_by_pk=True`, `update` and `delete` (when permissions don't depend on the instance) write rows without
+    fetching them first: a single `UPDATE ... RETURNING` (on databases supporting it) or DELETE. Instances are not
+    involved then, so `Model.save` and `Model.delete_instance` (overrides, signals of `playhouse.signals`...) are
+    bypassed, as they are by bulk updates and deletes. Off by default.
+    '''
+    def __init__(self, context, batch_size=None, identity_map=True, write_by_pk=False):
+        super(PeeweeORMComponent, self).__init__(context, identity_map=identity_map)
+        self.batch_size = batch_size
+        self.write_by_pk = write_by_pk
+
+    def _split_eager_load(self):
+        '''
+        Foreign keys are joined in the query, while backrefs (e.g. `user.posts`) are loaded by `load_related`.
+        '''
+        model_meta = self.context['model_class']._meta
+        backrefs = {field.backref: field for field in model_meta.backrefs}
+        foreign_keys, backref_fields = [], []
+        for name in self.get_eager_load():
+            if name in backrefs:
+                backref_fields.append((name, backrefs[name]))
+            else:
+                foreign_keys.append(model_meta.fields[name])
+        return foreign_keys, backref_fields
+
+    def eager_load_queryset(self, queryset):
+        model_class = self.context['model_class']
+        foreign_keys, _ = self._split_eager_load()
+        for field in foreign_keys:
+            queryset = (queryset.select_extend(*field.rel_model._meta.sorted_fields)
+                        .join(field.rel_model, JOIN.LEFT_OUTER, on=field)
+                        .switch(model_class))
         return queryset
 
-    def get_object(self, queryset, pk):
+    def get_queryset(self, queryset):
+        return self.eager_load_queryset(queryset)
+
+    def load_related(self, instances):
+        _, backref_fields = self._split_eager_load()
+        if not backref_fields:
+            return instances
+
+        instances = list(instances)
+        instances_by_pk = {instance._pk: instance for instance in instances}
+        for name, field in backref_fields:
+            related_by_pk = defaultdict(list)
+            if instances_by_pk:
+                for related in field.model.select().where(field.in_(list(instances_by_pk))):
+                    instance = instances_by_pk[getattr(related, field.object_id_name)]
+                    setattr(related, field.name, instance)
+                    related_by_pk[instance._pk].append(related)
+            for pk, instance in instances_by_pk.items():
+                # Backref accessors are plain (non-data) descriptors, so the instance attribute takes precedence
+                instance.__dict__[name] = related_by_pk[pk]
+        return instances
+
+    def iterate_queryset(self, queryset, chunk_size):
+        return chunked(queryset.iterator(), chunk_size)
+
+    def _get_field(self, field_name):
+        return getattr(self.context['model_class'], field_name)
+
+    def order_queryset(self, queryset, field_names, reverse=False):
+        fields = [self._get_field(name) for name in field_names]
+        return queryset.order_by(*[field.desc() if reverse else field.asc() for field in fields])
+
+    def filter_queryset_after(self, queryset, field_names, values, reverse=False):
+        compare = operator.lt if reverse else operator.gt
+        fields = [self._get_field(name) for name in field_names]
+        conditions = []
+        for index, field in enumerate(fields):
+            condition = compare(field, values[index])
+            for previous_field, previous_value in zip(fields[:index], values[:index]):
+                condition &= (previous_field == previous_value)
+            conditions.append(condition)
+        return queryset.where(reduce(operator.or_, conditions))
+
+    def slice_queryset(self, queryset, offset, limit):
+        return queryset.offset(offset).limit(limit)
+
+    def count_queryset(self, queryset, limit=None):
+        if limit is not None:
+            queryset = queryset.limit(limit)
+        return queryset.count()
+
+    def estimate_count(self, queryset):
+        database = self.context['model_class']._meta.database
+        if not isinstance(database, PostgresqlDatabase):
+            return None
+        sql, params = queryset.sql()
+        cursor = database.execute_sql('EXPLAIN (FORMAT JSON) {}'.format(sql), params)
+        return get_rows_from_explain(cursor.fetchone()[0])
+
+    def project_queryset(self, queryset, attributes):
+        model_fields = self.context['model_class']._meta.fields
+        if not all(name in model_fields for name in attributes):
+            return queryset
+        primary_key = self.context['model_class']._meta.primary_key
+        columns = [model_fields[name] for name in attributes if model_fields[name] is not primary_key]
+        return queryset.select(primary_key, *columns)
+
+    def rows_queryset(self, queryset, attributes):
+        model_fields = self.context['model_class']._meta.fields
+        columns = [model_fields.get(name) for name in attributes]
+        if self.get_eager_load() or any(column is None or isinstance(column, ForeignKeyField) for column in columns):
+            return None
+        return queryset.select(*columns).dicts()
+
+    def filter_queryset_by_pks(self, queryset, pks):
+        return queryset.where(self.context['model_class'].id.in_(pks))
+
+    def filter_queryset_by_fields(self, queryset, filters):
+        return queryset.filter(**filters)
+
+    def get_column_names(self):
+        return set(self.context['model_class']._meta.fields)
+
+    def _get_pks_subquery(self, queryset):
+        model_class = self.context['model_class']
+        return model_class.id.in_(queryset.select(model_class.id))
+
+    def get_queryset_key(self, queryset):
+        sql, params = queryset.sql()
+        return sql, tuple(params)
+
+    def fetch_object(self, queryset, pk):
         try:
-            return queryset.filter(id=pk).get()
+            return self._remember_loaded_values(self.load_related([self.eager_load_queryset(queryset).filter(id=pk).get()])[0])
         except DoesNotExist:
             raise APIError(404)
 
+    def get_object_version(self, queryset, pk, field_name):
+        row = queryset.filter(id=pk).select(self._get_field(field_name)).tuples().first()
+        if row is None:
+            raise APIError(404)
+        return row[0]
+
+    def get_queryset_version(self, queryset, field_name):
+        model_class = self.context['model_class']
+        aggregates = (fn.MAX(self._get_field(field_name)), fn.COUNT(model_class.id))
+        return tuple(queryset.order_by().select(*aggregates).tuples().get())
+
     def create_object(self, data):
         instance = self.context['model_class'](**data)
         instance.save()
         return instance
 
+    def create_objects(self, data_list):
+        '''
+        `bulk_create` only sets the primary keys of the instances on databases with a `RETURNING` clause (as PostgreSQL), so
+        elsewhere rows are inserted one at a time (still in a single transaction).
+        '''
+        model_class = self.context['model_class']
+        instances = [model_class(**data) for data in data_list]
+        database = model_class._meta.database
+        with database.atomic():
+            if database.returning_clause or not model_class._meta.auto_increment:
+                model_class.bulk_create(instances, batch_size=self.batch_size)
+            else:
+                for instance in instances:
+                    instance.save(force_insert=True)
+        return instances
+
+    def _remember_loaded_values(self, instance):
+        instance._wrf_loaded_values = dict(instance.__data__)
+        return instance
+
+    def _get_update_fields(self, instance):
+        '''
+        The fields changed since `_remember_loaded_values`, or `None` if all of them are to be saved.
+        '''
+        loaded_values = instance.__dict__.get('_wrf_loaded_values')
+        if loaded_values is None:
+            return None
+        update_fields = [name for name, value in instance.__data__.items() if value != loaded_values.get(name, _missing)]
+        if instance._meta.primary_key.name in update_fields:
+            return None
+        return update_fields
+
     def update_object(self, instance, data):
+        '''
+        Only the fields that changed since the instance was fetched are written (i.e.: `save(only=...)`), and nothing at
+        all if none did. Instances not fetched by this component are saved as a whole. Note fields set by an overridden
+        `save` (e.g. a modification datetime) are not written then, unless they are part of the changes.
+        '''
+        self.clear_identity_map()
         for k, v in data.items():
             setattr(instance, k, v)
-        instance.save()
+        update_fields = self._get_update_fields(instance)
+        if update_fields is None or update_fields:
+            instance.save(only=update_fields)
+            self._remember_loaded_values(instance)
         return instance
 
+    def can_update_object_by_pk(self):
+        # On databases with a `RETURNING` clause, unless relations are to be eager loaded
+        if not self.write_by_pk or self.get_eager_load():
+            return False
+        return has_returning_clause(self.context['model_class']._meta.database)
+
+    def update_object_by_pk(self, queryset, pk, data):
+        model_class = self.context['model_class']
+        if not data:
+            return self.get_object(queryset, pk)
+        self.clear_identity_map()
+        query = model_class.update(**data).where(self._get_pks_subquery(queryset.filter(id=pk))).returning(model_class)
+        instances = list(query.execute())
+        if not instances:
+            raise APIError(404)
+        return self._remember_loaded_values(instances[0])
+
+    def update_objects(self, queryset, changes):
+        self.clear_identity_map()
+        model_class = self.context['model_class']
+        with model_class._meta.database.atomic():
+            return sum(
+                model_class.update(**data).where(self._get_pks_subquery(self.filter_queryset_by_pks(queryset, pks))).execute()
+                for pks, data in changes
+            )
+
     def delete_object(self, instance):
+        self.clear_identity_map()
         instance.delete_instance()
+
+    def delete_objects(self, queryset):
+        self.clear_identity_map()
+        model_class = self.context['model_class']
+        return model_class.delete().where(self._get_pks_subquery(queryset)).execute()
+
+    def delete_object_by_pk(self, queryset, pk):
+        if not self.write_by_pk:
+            return None
+        if not self.delete_objects(queryset.filter(id=pk)):
+            raise APIError(404)
+        return True
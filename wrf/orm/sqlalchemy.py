@@ -1,27 +1,135 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import operator
+
+from sqlalchemy import and_, func, inspect, or_
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm.interfaces import MANYTOONE
 
 from wrf.base import APIError
 
-from .base import BaseORMComponent
+from .base import BaseORMComponent, chunked, get_rows_from_explain
+
+
+def has_dependent_rows(model_class):
+    '''
+    Whether rows of other tables depend on the ones of `model_class` through relationships (other than many-to-one), which
+    `Session.delete` takes care of (deleting or unlinking them) while a plain DELETE does not.
+    '''
+    return any(relationship.direction is not MANYTOONE for relationship in inspect(model_class).relationships)
+
+
+def get_queryset_key(queryset):
+    compiled = queryset.statement.compile()
+    return str(compiled), tuple(sorted(compiled.params.items()))
+
+
+def delete_rows(session, queryset, model_class):
+    if has_dependent_rows(model_class):
+        instances = queryset.all()
+        for instance in instances:
+            session.delete(instance)
+        return len(instances)
+    return queryset.order_by(False).delete(synchronize_session=False)
 
 
 class SQLAlchemyORMComponent(BaseORMComponent):
-    def __init__(self, context, session, commit=True):
-        super(SQLAlchemyORMComponent, self).__init__(context)
+    def __init__(self, context, session, commit=True, identity_map=True):
+        super(SQLAlchemyORMComponent, self).__init__(context, identity_map=identity_map)
         self.session = session
         self.commit = commit
 
+    def eager_load_queryset(self, queryset):
+        model_class = self.context['model_class']
+        relationships = inspect(model_class).relationships
+        options = []
+        for name in self.get_eager_load():
+            loader = selectinload if relationships[name].uselist else joinedload
+            options.append(loader(getattr(model_class, name)))
+        return queryset.options(*options) if options else queryset
+
     def get_queryset(self, queryset):
-        return queryset
+        return self.eager_load_queryset(queryset)
+
+    def iterate_queryset(self, queryset, chunk_size):
+        return chunked(queryset.yield_per(chunk_size), chunk_size)
+
+    def _get_column(self, field_name):
+        return getattr(self.context['model_class'], field_name)
+
+    def order_queryset(self, queryset, field_names, reverse=False):
+        columns = [self._get_column(name) for name in field_names]
+        return queryset.order_by(None).order_by(*[column.desc() if reverse else column.asc() for column in columns])
+
+    def filter_queryset_after(self, queryset, field_names, values, reverse=False):
+        compare = operator.lt if reverse else operator.gt
+        columns = [self._get_column(name) for name in field_names]
+        conditions = []
+        for index, column in enumerate(columns):
+            previous_conditions = [previous_column == previous_value
+                                   for previous_column, previous_value in zip(columns[:index], values[:index])]
+            conditions.append(and_(compare(column, values[index]), *previous_conditions))
+        return queryset.filter(or_(*conditions))
+
+    def slice_queryset(self, queryset, offset, limit):
+        return queryset.offset(offset).limit(limit)
+
+    def count_queryset(self, queryset, limit=None):
+        if limit is not None:
+            queryset = queryset.limit(limit)
+        return queryset.count()
+
+    def estimate_count(self, queryset):
+        connection = self.session.connection()
+        if connection.dialect.name != 'postgresql':
+            return None
+        compiled = queryset.statement.compile(dialect=connection.dialect)
+        result = connection.execute('EXPLAIN (FORMAT JSON) {}'.format(compiled), compiled.params)
+        return get_rows_from_explain(result.scalar())
+
+    def project_queryset(self, queryset, attributes):
+        column_names = inspect(self.context['model_class']).column_attrs.keys()
+        if not set(attributes) <= set(column_names):
+            return queryset
+        return queryset.options(load_only(*attributes))
+
+    def rows_queryset(self, queryset, attributes):
+        column_names = inspect(self.context['model_class']).column_attrs.keys()
+        if self.get_eager_load() or not set(attributes) <= set(column_names):
+            return None
+        # Rows are named tuples, so the schema reads them by attribute
+        return queryset.with_entities(*[self._get_column(name) for name in attributes])
+
+    def filter_queryset_by_pks(self, queryset, pks):
+        return queryset.filter(self.context['model_class'].id.in_(pks))
 
-    def get_object(self, queryset, pk):
+    def filter_queryset_by_fields(self, queryset, filters):
+        return queryset.filter_by(**filters)
+
+    def get_column_names(self):
+        return set(inspect(self.context['model_class']).column_attrs.keys())
+
+    def get_queryset_key(self, queryset):
+        return get_queryset_key(queryset)
+
+    def fetch_object(self, queryset, pk):
         try:
-            return queryset.filter_by(id=pk).one()
+            return self.eager_load_queryset(queryset).filter_by(id=pk).one()
         except NoResultFound:
             raise APIError(404)
 
+    def get_object_version(self, queryset, pk, field_name):
+        row = queryset.filter_by(id=pk).with_entities(self._get_column(field_name)).first()
+        if row is None:
+            raise APIError(404)
+        return row[0]
+
+    def get_queryset_version(self, queryset, field_name):
+        model_class = self.context['model_class']
+        aggregates = (func.max(self._get_column(field_name)), func.count(model_class.id))
+        return tuple(queryset.order_by(None).with_entities(*aggregates).one())
+
     def _maybe_commit(self):
         if self.commit:
             self.session.commit()
@@ -38,7 +146,18 @@ class SQLAlchemyORMComponent(BaseORMComponent):
         self._maybe_commit()
         return instance
 
+    def create_objects(self, data_list):
+        model_class = self.context['model_class']
+
+        # Marshmallow-SQLAlchemy transforms the schema results into instances, that's why we have the conditional below
+        instances = [model_class(**data) if isinstance(data, dict) else data for data in data_list]
+
+        self.session.add_all(instances)
+        self._maybe_commit()
+        return instances
+
     def update_object(self, instance, data):
+        self.clear_identity_map()
         # Marshmallow-SQLAlchemy transforms the schema results into a instance, that's why we have the conditional below
         if isinstance(data, dict):
             for key, value in data.items():
@@ -48,6 +167,32 @@ class SQLAlchemyORMComponent(BaseORMComponent):
         self._maybe_commit()
         return instance
 
+    def update_objects(self, queryset, changes):
+        self.clear_identity_map()
+        # `Query.update` refuses ordered queries (and `order_by(None)` counts as one), `False` really drops the ordering
+        queryset = queryset.order_by(False)
+        count = sum(self.filter_queryset_by_pks(queryset, pks).update(data, synchronize_session=False) for pks, data in changes)
+        self._maybe_commit()
+        return count
+
     def delete_object(self, instance):
+        self.clear_identity_map()
         self.session.delete(instance)
         self._maybe_commit()
+
+    def delete_objects(self, queryset):
+        '''
+        A single DELETE, unless other rows depend on the deleted ones (see `has_dependent_rows`): instances are fetched and
+        deleted through the session then.
+        '''
+        self.clear_identity_map()
+        count = delete_rows(self.session, queryset, self.context['model_class'])
+        self._maybe_commit()
+        return count
+
+    def delete_object_by_pk(self, queryset, pk):
+        if has_dependent_rows(self.context['model_class']):
+            return None
+        if not self.delete_objects(queryset.filter_by(id=pk)):
+            raise APIError(404)
+        return True
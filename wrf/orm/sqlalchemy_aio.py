@@ -0,0 +1,108 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from functools import partial
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query
+
+from wrf.base import APIError
+
+from .aio import BaseAsyncORMComponent
+from .sqlalchemy import delete_rows, get_queryset_key
+
+
+class SQLAlchemyAsyncORMComponent(BaseAsyncORMComponent):
+    '''
+    Works on top of an `sqlalchemy.ext.asyncio.AsyncSession` (SQLAlchemy 1.4+).
+    Querysets are expected to be unbound queries (e.g. `Query(User)`): they get bound to the session's synchronous
+    counterpart and run via `AsyncSession.run_sync`, which does not block the event loop. This way pagination components
+    (which count and slice querysets) keep working unchanged.
+    Bear in mind serialization must not trigger lazy loads, so consider `expire_on_commit=False` in your session.
+    '''
+    def __init__(self, context, session, commit=True, identity_map=True):
+        super(SQLAlchemyAsyncORMComponent, self).__init__(context, identity_map=identity_map)
+        self.session = session
+        self.commit = commit
+
+    def _bind(self, sync_session, value):
+        if isinstance(value, Query):
+            return value.with_session(sync_session)
+        return value
+
+    def _call_bound(self, func, args, kwargs, sync_session):
+        args = [self._bind(sync_session, arg) for arg in args]
+        kwargs = {key: self._bind(sync_session, value) for key, value in kwargs.items()}
+        return func(*args, **kwargs)
+
+    async def run_sync(self, func, *args, **kwargs):
+        return await self.session.run_sync(partial(self._call_bound, func, args, kwargs))
+
+    async def get_queryset(self, queryset):
+        return queryset
+
+    def filter_queryset_by_pks(self, queryset, pks):
+        return queryset.filter(self.context['model_class'].id.in_(pks))
+
+    def filter_queryset_by_fields(self, queryset, filters):
+        return queryset.filter_by(**filters)
+
+    def get_column_names(self):
+        return set(inspect(self.context['model_class']).column_attrs.keys())
+
+    def get_queryset_key(self, queryset):
+        return get_queryset_key(queryset)
+
+    async def fetch_object(self, queryset, pk):
+        instance = await self.run_sync(lambda queryset: queryset.filter_by(id=pk).one_or_none(), queryset)
+        if instance is None:
+            raise APIError(404)
+        return instance
+
+    async def _maybe_commit(self):
+        if self.commit:
+            await self.session.commit()
+
+    async def create_object(self, data):
+        model_class = self.context['model_class']
+
+        # Marshmallow-SQLAlchemy transforms the schema results into a instance, that's why we have the conditional below
+        instance = data
+        if isinstance(data, dict):
+            instance = model_class(**data)
+
+        self.session.add(instance)
+        await self._maybe_commit()
+        return instance
+
+    async def update_object(self, instance, data):
+        self.clear_identity_map()
+        # Marshmallow-SQLAlchemy transforms the schema results into a instance, that's why we have the conditional below
+        if isinstance(data, dict):
+            for key, value in data.items():
+                setattr(instance, key, value)
+
+        self.session.add(instance)
+        await self._maybe_commit()
+        return instance
+
+    async def delete_object(self, instance):
+        self.clear_identity_map()
+        await self.session.delete(instance)
+        await self._maybe_commit()
+
+    def _update_rows(self, queryset, changes):
+        # As in `SQLAlchemyORMComponent.update_objects`, `False` really drops the ordering
+        queryset = queryset.order_by(False)
+        return sum(self.filter_queryset_by_pks(queryset, pks).update(data, synchronize_session=False) for pks, data in changes)
+
+    async def update_objects(self, queryset, changes):
+        self.clear_identity_map()
+        count = await self.run_sync(self._update_rows, queryset, changes)
+        await self._maybe_commit()
+        return count
+
+    async def delete_objects(self, queryset):
+        self.clear_identity_map()
+        count = await self.run_sync(lambda queryset: delete_rows(queryset.session, queryset, self.context['model_class']), queryset)
+        await self._maybe_commit()
+        return count
@@ -1,19 +1,104 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import base64
+import binascii
+import uuid
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
 from paginate import Page
 
-from wrf.base import BaseComponent
-from wrf.compat import parse_qsl, urlencode, urlparse, urlunparse
+from wrf.base import APIError, BaseComponent
+from wrf.compat import parse_qsl, urlencode, urlparse, urlunparse, utc
+
+CURSOR_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+CURSOR_DATE_FORMAT = '%Y-%m-%d'
+
+
+def encode_cursor_value(value):
+    '''
+    Makes an ordering value JSON-serializable. Values JSON has no type for are tagged, so `decode_cursor_value` gets them
+    back as they were (comparing a column to their string representation would not be reliable).
+    '''
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return {'datetime': value.strftime(CURSOR_DATETIME_FORMAT)}
+        return {'datetime': value.astimezone(utc).strftime(CURSOR_DATETIME_FORMAT), 'utc': True}
+    if isinstance(value, date):
+        return {'date': value.strftime(CURSOR_DATE_FORMAT)}
+    if isinstance(value, Decimal):
+        return {'decimal': str(value)}
+    if isinstance(value, uuid.UUID):
+        return {'uuid': value.hex}
+    return value
+
+
+def decode_cursor_value(value):
+    '''
+    The reverse of `encode_cursor_value`. Raises `ValueError`, `KeyError` or `InvalidOperation` on malformed values.
+    '''
+    if not isinstance(value, dict):
+        return value
+    if 'datetime' in value:
+        decoded = datetime.strptime(value['datetime'], CURSOR_DATETIME_FORMAT)
+        return decoded.replace(tzinfo=utc) if value.get('utc') else decoded
+    if 'date' in value:
+        return datetime.strptime(value['date'], CURSOR_DATE_FORMAT).date()
+    if 'decimal' in value:
+        return Decimal(value['decimal'])
+    return uuid.UUID(value['uuid'])
 
 
 class BasePaginationComponent(BaseComponent):
     def paginate(self, schema, instances):
         raise NotImplementedError()  # pragma: no cover
 
+    def get_required_attributes(self):
+        '''
+        Model attributes read by the component itself, so they're loaded even if the client asks for a sparse fieldset.
+        '''
+        return ()
+
+    def serialize_items(self, schema, items):
+        return schema.serialize(self.get_instance_from_context('orm').load_related(items), many=True)
+
+    def _add_querystring_to_url(self, url, **params):
+        url_parts = list(urlparse(url))
+        query = dict(parse_qsl(url_parts[4]))
+        query.update(params)
+        url_parts[4] = urlencode(query)
+        return urlunparse(url_parts)
+
+
+class StreamedResults(object):
+    '''
+    Results to be streamed: `chunks` is an iterable of lists of already serialized items.
+    '''
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return iter(self.chunks)
+
 
 class NoPaginationComponent(BasePaginationComponent):
+    '''
+    With `stream=True` the queryset is read `chunk_size` instances at a time (see `BaseORMComponent.iterate_queryset`),
+    and each chunk is serialized and sent as soon as it's read, so memory usage does not grow with the results size.
+    '''
+    def __init__(self, context, stream=False, chunk_size=500):
+        super(NoPaginationComponent, self).__init__(context)
+        self.stream = stream
+        self.chunk_size = chunk_size
+
+    def _iter_serialized_chunks(self, schema, instances):
+        for chunk in self.get_instance_from_context('orm').iterate_queryset(instances, self.chunk_size):
+            yield self.serialize_items(schema, chunk)
+
     def paginate(self, schema, instances):
-        return schema.serialize(instances, many=True)
+        if self.stream:
+            return StreamedResults(self._iter_serialized_chunks(schema, instances))
+        return self.serialize_items(schema, instances)
 
 
 class OrmWrapper(object):
@@ -33,18 +118,28 @@ class OrmPage(Page):
 
 
 class PagePaginationComponent(BasePaginationComponent):
-    def __init__(self, context, default_per_page=10, page_param='page', per_page_param='per_page'):
+    '''
+    `count_mode` tells how the total number of items (`count`) is computed:
+    - `exact`: a full `COUNT`.
+    - `none`: no counting at all, `count` is `None`. One extra item is fetched to find out whether there's a next page.
+    - `capped`: counts up to `count_cap` items. Above that, `count` is reported as `"<count_cap>+"`.
+    - `estimated`: the database planner estimate, where supported (PostgreSQL). Falls back to `exact` elsewhere.
+    The mode actually used is returned as `count_mode`.
+    Clients can't ask for more than `max_per_page` items per page (`None` for no limit).
+    '''
+    COUNT_MODES = ('exact', 'none', 'capped', 'estimated')
+
+    def __init__(self, context, default_per_page=10, page_param='page', per_page_param='per_page', count_mode='exact',
+                 count_cap=1000, max_per_page=100):
         super(PagePaginationComponent, self).__init__(context)
+        if count_mode not in self.COUNT_MODES:
+            raise ValueError('Invalid count_mode "{}". Choose one of: {}.'.format(count_mode, ', '.join(self.COUNT_MODES)))
         self.default_per_page = default_per_page
         self.page_param = page_param
         self.per_page_param = per_page_param
-
-    def _add_querystring_to_url(self, url, **params):
-        url_parts = list(urlparse(url))
-        query = dict(parse_qsl(url_parts[4]))
-        query.update(params)
-        url_parts[4] = urlencode(query)
-        return urlunparse(url_parts)
+        self.count_mode = count_mode
+        self.count_cap = count_cap
+        self.max_per_page = max_per_page
 
     def _get_page_number(self, request_query):
         try:
@@ -53,21 +148,143 @@ class PagePaginationComponent(BasePaginationComponent):
             return 1
 
     def _get_items_per_page(self, request_query):
+        # A `LIMIT` of 0 (or less) is no limit at all for some databases and an error for others
         try:
-            return int(request_query.get(self.per_page_param))
+            per_page = max(int(request_query.get(self.per_page_param)), 1)
         except (TypeError, ValueError):
-            return self.default_per_page
+            per_page = self.default_per_page
+        if self.max_per_page is not None:
+            per_page = min(per_page, self.max_per_page)
+        return per_page
+
+    def _get_page_url(self, request_url, page_number):
+        return self._add_querystring_to_url(request_url, **{self.page_param: page_number})
+
+    def _paginate_with_exact_count(self, schema, instances, page_number, per_page, request_url):
+        page = OrmPage(instances, page_number, per_page)
+
+        return {
+            'count': page.item_count,
+            'count_mode': 'exact',
+            'next_page': self._get_page_url(request_url, page.next_page) if page.next_page else None,
+            'prev_page': self._get_page_url(request_url, page.previous_page) if page.previous_page else None,
+            'results': self.serialize_items(schema, page.items),
+        }
+
+    def _get_inexact_count(self, orm, instances):
+        if self.count_mode == 'capped':
+            count = orm.count_queryset(instances, limit=self.count_cap + 1)
+            return '{}+'.format(self.count_cap) if count > self.count_cap else count
+        return None
 
     def paginate(self, schema, instances):
         framework = self.get_instance_from_context('framework')
         request_query = framework.get_request_query()
         request_url = framework.get_request_url()
+        page_number = max(self._get_page_number(request_query), 1)
+        per_page = self._get_items_per_page(request_query)
+
+        if self.count_mode == 'exact':
+            return self._paginate_with_exact_count(schema, instances, page_number, per_page, request_url)
 
-        page = OrmPage(instances, self._get_page_number(request_query), self._get_items_per_page(request_query))
+        orm = self.get_instance_from_context('orm')
+        count_mode = self.count_mode
+        if count_mode == 'estimated':
+            count = orm.estimate_count(instances)
+            if count is None:
+                return self._paginate_with_exact_count(schema, instances, page_number, per_page, request_url)
+        else:
+            count = self._get_inexact_count(orm, instances)
+
+        # One extra item tells whether there is a next page.
+        items = list(orm.slice_queryset(instances, (page_number - 1) * per_page, per_page + 1))
+        has_next = len(items) > per_page
 
         return {
-            'count': page.item_count,
-            'next_page': self._add_querystring_to_url(request_url, page=page.next_page) if page.next_page else None,
-            'prev_page': self._add_querystring_to_url(request_url, page=page.previous_page) if page.previous_page else None,
-            'results': schema.serialize(page.items, many=True),
+            'count': count,
+            'count_mode': count_mode,
+            'next_page': self._get_page_url(request_url, page_number + 1) if has_next else None,
+            'prev_page': self._get_page_url(request_url, page_number - 1) if page_number > 1 else None,
+            'results': self.serialize_items(schema, items[:per_page]),
+        }
+
+
+class CursorPaginationComponent(BasePaginationComponent):
+    '''
+    Keyset pagination: instead of skipping rows (OFFSET), each page is fetched by filtering on the values of `ordering`
+    for the last (or first) item of the previous page, so any page costs the same and concurrent writes never make pages
+    skip or repeat rows.
+    `ordering` must identify rows uniquely (e.g. `('id',)` or `('last_name', 'id')`) and should be covered by an index. Its
+    values must be JSON-serializable, or datetimes, dates, decimals or UUIDs. Cursors are opaque to clients: they just
+    follow `next_page` and `prev_page`. Clients can't ask for more than `max_per_page` items per page (`None` for no limit).
+    '''
+    def __init__(self, context, ordering=('id',), default_per_page=10, cursor_param='cursor', per_page_param='per_page',
+                 max_per_page=100):
+        super(CursorPaginationComponent, self).__init__(context)
+        self.ordering = tuple(ordering)
+        self.default_per_page = default_per_page
+        self.cursor_param = cursor_param
+        self.per_page_param = per_page_param
+        self.max_per_page = max_per_page
+
+    def get_required_attributes(self):
+        return self.ordering
+
+    def _encode_cursor(self, framework, values, reverse):
+        data = framework.encode_json({'v': [encode_cursor_value(value) for value in values], 'r': reverse})
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def _decode_cursor(self, framework, cursor):
+        try:
+            data = framework.json_encoder.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            values, reverse = data['v'], bool(data['r'])
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError()
+            values = [decode_cursor_value(value) for value in values]
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error, InvalidOperation):
+            raise APIError(400, {self.cursor_param: ['Invalid cursor.']})
+        return values, reverse
+
+    def _get_items_per_page(self, request_query):
+        try:
+            per_page = max(int(request_query.get(self.per_page_param)), 1)
+        except (TypeError, ValueError):
+            per_page = self.default_per_page
+        if self.max_per_page is not None:
+            per_page = min(per_page, self.max_per_page)
+        return per_page
+
+    def _get_cursor_url(self, framework, request_url, orm, instance, reverse):
+        values = [orm.get_field_value(instance, name) for name in self.ordering]
+        cursor = self._encode_cursor(framework, values, reverse)
+        return self._add_querystring_to_url(request_url, **{self.cursor_param: cursor})
+
+    def paginate(self, schema, instances):
+        orm = self.get_instance_from_context('orm')
+        framework = self.get_instance_from_context('framework')
+        request_query = framework.get_request_query()
+        request_url = framework.get_request_url()
+        per_page = self._get_items_per_page(request_query)
+
+        cursor = request_query.get(self.cursor_param)
+        values, reverse = self._decode_cursor(framework, cursor) if cursor else (None, False)
+
+        queryset = orm.order_queryset(instances, self.ordering, reverse=reverse)
+        if values is not None:
+            queryset = orm.filter_queryset_after(queryset, self.ordering, values, reverse=reverse)
+
+        # One extra item tells whether there is something beyond this page.
+        items = list(orm.slice_queryset(queryset, 0, per_page + 1))
+        has_more = len(items) > per_page
+        items = items[:per_page]
+        if reverse:
+            items.reverse()
+
+        has_next = has_more if not reverse else True
+        has_prev = has_more if reverse else values is not None
+
+        return {
+            'next_page': self._get_cursor_url(framework, request_url, orm, items[-1], False) if items and has_next else None,
+            'prev_page': self._get_cursor_url(framework, request_url, orm, items[0], True) if items and has_prev else None,
+            'results': self.serialize_items(schema, items),
         }
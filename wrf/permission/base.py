@@ -4,16 +4,46 @@ from wrf.base import APIError, BaseComponent
 
 
 class BasePermissionComponent(BaseComponent):
+    # Whether the decision depends on the instance. If it doesn't, bulk operations, `update` and `delete` don't fetch the rows
+    # they touch, and `retrieve` responses may be cached. See `is_instance_dependent`.
+    instance_dependent = True
+
+    @classmethod
+    def is_instance_dependent(cls):
+        '''
+        `instance_dependent` as declared by the class itself or its closest ancestor, unless some class in between
+        overrides `check_permission` or `check_permissions`: such subclasses (e.g. adding an ownership check on top of
+        `AllowAuthenticatedPermissionComponent`) get the instance, unless they set `instance_dependent = False` themselves.
+        '''
+        for klass in cls.__mro__:
+            attributes = vars(klass)
+            if 'instance_dependent' in attributes:
+                return bool(attributes['instance_dependent'])
+            if 'check_permission' in attributes or 'check_permissions' in attributes:
+                return True
+        return True
+
     def check_permission(self, instance=None):
         raise NotImplementedError()  # pragma: no cover
 
+    def check_permissions(self, instances):
+        '''
+        Checks a batch of instances. Override it to decide on the whole batch at once.
+        '''
+        for instance in instances:
+            self.check_permission(instance)
+
 
 class AllowAllPermissionComponent(BasePermissionComponent):
+    instance_dependent = False
+
     def check_permission(self, instance=None):
         pass
 
 
 class AllowAuthenticatedPermissionComponent(BasePermissionComponent):
+    instance_dependent = False
+
     def check_permission(self, instance=None):
         if self.context['current_user'] is None:
             raise APIError(401)
@@ -21,6 +51,7 @@ class AllowAuthenticatedPermissionComponent(BasePermissionComponent):
 
 class ReadOnlyPermissionComponent(BasePermissionComponent):
     SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    instance_dependent = False
 
     def check_permission(self, instance=None):
         if self.get_instance_from_context('framework').get_request_method() not in self.SAFE_METHODS:
@@ -1,11 +1,86 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import threading
+from collections import OrderedDict
+
 from wrf.base import BaseComponent
 
 
+class SchemaCache(object):
+    '''
+    A bounded (least recently used entries are evicted first) cache of schema instances, keyed by schema class and options.
+    Schema instances are not guaranteed to be thread-safe (e.g. marshmallow updates its fields while dumping), so each
+    thread has its own cache.
+    Schemas restricted to a subset of their fields (`only`, e.g. a sparse fieldset chosen by the client) are built on each
+    call instead: there are too many possible subsets, and caching them would evict the schemas every request shares.
+    '''
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self._local = threading.local()
+
+    def _get_cache(self):
+        cache = getattr(self._local, 'cache', None)
+        if cache is None:
+            cache = self._local.cache = OrderedDict()
+        return cache
+
+    def get(self, schema_class, **options):
+        if options.get('only'):
+            return schema_class(**options)
+
+        cache = self._get_cache()
+        key = (schema_class, tuple(sorted(options.items())))
+        try:
+            schema = cache.pop(key)
+        except KeyError:
+            schema = schema_class(**options)
+            if len(cache) >= self.max_size:
+                cache.popitem(last=False)
+        cache[key] = schema
+        return schema
+
+    def clear(self):
+        self._get_cache().clear()
+
+
 class BaseSchemaComponent(BaseComponent):
-    def deserialize(self, data, instance=None):
+    # Set it to a `SchemaCache` to reuse schema instances across requests.
+    schema_cache = None
+
+    def get_schema(self, **options):
+        schema_class = self.context['schema_class']
+        if self.schema_cache is None:
+            return schema_class(**options)
+        return self.schema_cache.get(schema_class, **options)
+
+    def deserialize(self, data, instance=None, many=False):
+        '''
+        With `many=True`, `data` is a list and errors are reported per item index.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def deserialize_partial(self, data):
+        '''
+        Validates a partial payload that's not bound to any instance, returning a `dict` of field values.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_field_names(self):
+        raise NotImplementedError()  # pragma: no cover
+
+    def get_field_attributes(self, field_names):
+        '''
+        The model attributes the given fields are read from, or `None` if any of them doesn't map to a single attribute
+        (e.g. fields computed by a method).
+        '''
         raise NotImplementedError()  # pragma: no cover
 
+    def get_serialization_options(self):
+        '''
+        The sparse fieldset requested by the client (see `BaseAPI.get_requested_fields`), if any, restricts what is dumped.
+        '''
+        fields = self.context.get('fields')
+        return {'only': fields} if fields else {}
+
     def serialize(self, instance_or_queryset, many=False):
         raise NotImplementedError()  # pragma: no cover
@@ -0,0 +1,242 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import marshmallow
+from marshmallow import fields, utils
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.exceptions import ValidationError
+
+from .marshmallow import MarshmallowSchemaComponent
+from .marshmallow_sqlalchemy import MarshmallowSQLAlchemySchemaComponent
+
+try:
+    from marshmallow.compat import basestring, text_type
+except ImportError:  # pragma: no cover
+    basestring = text_type = str
+
+# The generated functions mirror marshmallow 2 internals (e.g. `_types_seen`, `__accessor__`, `_CHECK_ATTRIBUTE`), so with
+# any other version everything is dumped by marshmallow itself.
+COMPILATION_SUPPORTED = marshmallow.__version__.split('.')[0] == '2'
+
+# Raised by values marshmallow fields can't dump (e.g. `'x'` for an `Integer`, a string for a `DateTime`), which marshmallow
+# reports as errors instead. Anything else is raised by marshmallow as well.
+_FIELD_ERRORS = (TypeError, ValueError, AttributeError, ValidationError)
+
+
+class _NotReady(Exception):
+    '''
+    Raised while compiling a schema whose nested schemas have not been used by marshmallow yet.
+    '''
+
+
+def _call_attribute(value):
+    # As marshmallow does, callable attributes are called and `AttributeError`s mean the attribute is missing.
+    try:
+        return value()
+    except AttributeError:
+        return utils.missing
+
+
+def _choose_variant(obj_type, attribute_variant, keyed_variant, dict_variant):
+    if obj_type is dict:
+        return dict_variant
+    # Tuples (e.g. rows of column queries) raise `TypeError` for string keys, so marshmallow ends up using `getattr` too
+    if not hasattr(obj_type, '__getitem__') or (issubclass(obj_type, tuple) and obj_type.__getitem__ is tuple.__getitem__):
+        return attribute_variant
+    return keyed_variant
+
+
+def _is_compilable(schema):
+    if schema.extra or schema.__accessor__ is not None or type(schema).get_attribute is not marshmallow.Schema.get_attribute:
+        return False
+    if schema._has_processors:
+        processors = schema.__processors__
+        if any(processors.get((tag, pass_many)) for tag in (PRE_DUMP, POST_DUMP) for pass_many in (False, True)):
+            return False
+    return True
+
+
+class _SchemaCompiler(object):
+    '''
+    Generates the source code of a function dumping a single object as `schema` would. Fields of the most common types
+    are dumped inline, others are delegated to the field itself.
+    '''
+    def __init__(self, schema, namespace, prefix):
+        self.schema = schema
+        self.namespace = namespace
+        self.prefix = prefix
+        self.lines = []
+
+    def constant(self, value):
+        name = '{}_c{}'.format(self.prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def get_value_expression(self, field_type, field):
+        '''
+        The expression dumping the (present) value `v` of `field`, or `None` if the field must be delegated.
+        '''
+        if field_type is fields.Field:
+            return 'v'
+        if field_type is fields.String:
+            return 'None if v is None else (v if type(v) is _text_type else _ensure_text_type(v))'
+        if field_type in (fields.Integer, fields.Float) and not field.as_string:
+            num_type = self.constant(field.num_type)
+            return 'None if v is None else (v if type(v) is {0} else {0}(v))'.format(num_type)
+        if field_type is fields.Boolean:
+            return 'None if v is None else (True if v in {} else (False if v in {} else bool(v)))'.format(
+                self.constant(field.truthy), self.constant(field.falsy))
+        if field_type is fields.DateTime:
+            dateformat = field.dateformat or field.DEFAULT_FORMAT
+            format_func = field.DATEFORMAT_SERIALIZATION_FUNCS.get(dateformat)
+            if format_func is None:
+                return 'None if v is None else v.strftime({})'.format(self.constant(dateformat))
+            return 'None if v is None else {}(v, localtime={!r})'.format(self.constant(format_func), bool(field.localtime))
+        if field_type is fields.Nested and not isinstance(field.only, basestring):
+            if not field._Nested__updated_fields:
+                raise _NotReady()
+            nested_dump = compile_dump_function(field.schema, self.namespace, '{}_n{}'.format(self.prefix, len(self.namespace)))
+            if nested_dump is None:
+                return None
+            nested_dump = self.constant(nested_dump)
+            if field.many:
+                return 'None if v is None else [{}(item) for item in v]'.format(nested_dump)
+            return 'None if v is None else {}(v)'.format(nested_dump)
+        return None
+
+    def add_field(self, name, field, variant):
+        key = '{}{}'.format(self.schema.prefix or '', field.dump_to or name)
+        expression = self.get_value_expression(type(field), field) if field._CHECK_ATTRIBUTE else None
+        if expression is None:
+            self.lines.append('    v = {}.serialize({!r}, obj, accessor=_accessor)'.format(self.constant(field), name))
+            self.lines.append('    if v is not _missing:')
+            self.lines.append('        result[{!r}] = v'.format(key))
+            return
+
+        attribute = field.attribute or name
+        if '.' in attribute or variant == 'keyed':
+            self.lines.append('    v = _get_value({!r}, obj, _missing)'.format(attribute))
+        elif variant == 'dict':
+            self.lines.append('    v = obj[{0!r}] if {0!r} in obj else _get_value({0!r}, obj, _missing)'.format(attribute))
+        else:
+            self.lines.append('    v = getattr(obj, {!r}, _missing)'.format(attribute))
+            self.lines.append('    if v is not _missing and callable(v):')
+            self.lines.append('        v = _call_attribute(v)')
+        self.lines.append('    if v is not _missing:')
+        self.lines.append('        result[{!r}] = {}'.format(key, expression))
+        if field.default is not utils.missing:
+            default = self.constant(field.default)
+            self.lines.append('    else:')
+            self.lines.append('        result[{!r}] = {}'.format(key, '{0}() if callable({0}) else {0}'.format(default)))
+
+    def compile_variant(self, variant):
+        '''
+        Values are read as marshmallow does (`obj[key]`, then `getattr(obj, key)`), but the `attribute` variant (for
+        objects that can't be subscripted with strings) and the `dict` one (for plain dicts) skip what can't succeed.
+        '''
+        self.lines = ['def {}_{}(obj):'.format(self.prefix, variant)]
+        self.lines.append('    result = {}'.format('{}' if self.schema.dict_class is dict else '_dict_class()'))
+        for name, field in self.schema.fields.items():
+            if not field.load_only:
+                self.add_field(name, field, variant)
+        self.lines.append('    return result')
+        return '\n'.join(self.lines)
+
+    def compile(self):
+        sources = [self.compile_variant(variant) for variant in ('attribute', 'keyed', 'dict')]
+        variants = self.constant({})
+        sources.append('\n'.join([
+            'def {}(obj):'.format(self.prefix),
+            '    variant = {}.get(type(obj))'.format(variants),
+            '    if variant is None:',
+            '        variant = {0}[type(obj)] = _choose_variant(type(obj), {1}_attribute, {1}_keyed, {1}_dict)'.format(
+                variants, self.prefix),
+            '    return variant(obj)',
+        ]))
+        return '\n\n'.join(sources)
+
+
+def compile_dump_function(schema, namespace=None, prefix='dump'):
+    '''
+    Returns a function dumping a single object exactly as `schema.dump(obj).data` would, or `None` if the schema uses
+    features that are not supported (dump hooks, `extra`, custom accessors) or the marshmallow version is (see
+    `COMPILATION_SUPPORTED`).
+    '''
+    if not COMPILATION_SUPPORTED or not _is_compilable(schema):
+        return None
+
+    namespace = namespace if namespace is not None else {}
+    namespace.update({
+        '_missing': utils.missing,
+        '_text_type': text_type,
+        '_ensure_text_type': utils.ensure_text_type,
+        '_get_value': utils.get_value,
+        '_call_attribute': _call_attribute,
+        '_choose_variant': _choose_variant,
+    })
+    source = _SchemaCompiler(schema, namespace, prefix).compile()
+
+    # Each generated function has its own accessor and dict class, taken from its schema (they may differ for nested ones).
+    local_namespace = dict(namespace, _accessor=schema.get_attribute, _dict_class=schema.dict_class)
+    exec(compile(source, '<compiled {}>'.format(type(schema).__name__), 'exec'), local_namespace)
+    return local_namespace[prefix]
+
+
+def _get_dump_function(schema, obj, many):
+    # Marshmallow infers the type of implicit fields (e.g. from `Meta.fields`) from the first object of each type it
+    # dumps, and may update `schema.fields` then. Until it has done so for this type, it's left to dump by itself.
+    if not COMPILATION_SUPPORTED or type(obj) not in schema._types_seen:
+        return None
+
+    compiled = schema.__dict__.get('_wrf_compiled')
+    if compiled is not None and compiled[0] is schema.fields:
+        return compiled[1]
+
+    try:
+        dump_function = compile_dump_function(schema)
+    except _NotReady:
+        return None
+    schema._wrf_compiled = (schema.fields, dump_function)
+    return dump_function
+
+
+def dump(schema, obj, many=False):
+    '''
+    Same as `schema.dump(obj, many=many).data`, through a function compiled for `schema` whenever possible.
+    '''
+    if many and utils.is_iterable_but_not_string(obj):
+        obj = list(obj)
+
+    dump_function = _get_dump_function(schema, obj, many) if obj is not None else None
+    if dump_function is not None:
+        try:
+            if many:
+                return [dump_function(item) for item in obj]
+            return dump_function(obj)
+        except _FIELD_ERRORS:
+            pass  # Marshmallow reports errors its own way.
+
+    return schema.dump(obj, many=many).data
+
+
+class CompiledSchemaComponent(MarshmallowSchemaComponent):
+    '''
+    Serializes through Python functions generated (once per schema instance, so keep `schema_cache` set) from the
+    marshmallow schemas, which skip most of marshmallow's per-field and per-row overhead. The output is the same as
+    `MarshmallowSchemaComponent`'s: fields of unusual types are dumped by marshmallow itself, and schemas with dump hooks
+    are not compiled at all, nor are sparse fieldsets (their schemas are not cached). With marshmallow versions other than 2
+    it's just a `MarshmallowSchemaComponent`.
+    '''
+    def serialize(self, instance_or_queryset, many=False):
+        if not COMPILATION_SUPPORTED:
+            return super(CompiledSchemaComponent, self).serialize(instance_or_queryset, many=many)
+        return dump(self.get_schema(many=many, **self.get_serialization_options()), instance_or_queryset, many=many)
+
+
+class CompiledSQLAlchemySchemaComponent(MarshmallowSQLAlchemySchemaComponent):
+    '''
+    The `CompiledSchemaComponent` counterpart of `MarshmallowSQLAlchemySchemaComponent`.
+    '''
+    def serialize(self, instance_or_queryset, many=False):
+        if not COMPILATION_SUPPORTED:
+            return super(CompiledSQLAlchemySchemaComponent, self).serialize(instance_or_queryset, many=many)
+        return dump(self.get_schema(many=many, **self.get_serialization_options()), instance_or_queryset, many=many)
@@ -1,18 +1,48 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from marshmallow import fields
+
 from wrf.base import APIError
 
-from .base import BaseSchemaComponent
+from .base import BaseSchemaComponent, SchemaCache
 
 
 class MarshmallowSchemaComponent(BaseSchemaComponent):
-    def deserialize(self, data, instance=None):
+    schema_cache = SchemaCache()
+
+    def deserialize(self, data, instance=None, many=False):
         partial = bool(instance)
-        unmarshal_result = self.context['schema_class'](partial=partial).load(data)
+        unmarshal_result = self.load(self.get_schema(partial=partial, many=many), data, instance)
         if unmarshal_result.errors:
-            raise APIError(400, extra=unmarshal_result.errors)
+            errors = unmarshal_result.errors
+            if many:
+                # Item indexes become string keys so they can live next to "status_code" in the error body
+                errors = {str(key): value for key, value in errors.items()}
+            raise APIError(400, extra=errors)
+
+        return unmarshal_result.data
 
+    def deserialize_partial(self, data):
+        unmarshal_result = self.load(self.get_schema(partial=True), data)
+        if unmarshal_result.errors:
+            raise APIError(400, extra=unmarshal_result.errors)
         return unmarshal_result.data
 
+    def load(self, schema, data, instance=None):
+        return schema.load(data)
+
+    def get_field_names(self):
+        return list(self.get_schema().fields)
+
+    def get_field_attributes(self, field_names):
+        schema_fields = self.get_schema().fields
+        attributes = []
+        for name in field_names:
+            field = schema_fields[name]
+            if isinstance(field, (fields.Method, fields.Function)):
+                return None
+            attributes.append(field.attribute or name)
+        return attributes
+
     def serialize(self, instance_or_queryset, many=False):
-        return self.context['schema_class'](many=many).dump(instance_or_queryset).data
+        return self.get_schema(many=many, **self.get_serialization_options()).dump(instance_or_queryset).data
@@ -2,17 +2,24 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from wrf.base import APIError
 
-from .base import BaseSchemaComponent
+from .base import SchemaCache
+from .marshmallow import MarshmallowSchemaComponent
 
 
-class MarshmallowSQLAlchemySchemaComponent(BaseSchemaComponent):
-    def deserialize(self, data, instance=None):
-        partial = bool(instance)
-        unmarshal_result = self.context['schema_class'](partial=partial).load(data, instance=instance)
+class _Attributes(object):
+    pass
+
+
+class MarshmallowSQLAlchemySchemaComponent(MarshmallowSchemaComponent):
+    schema_cache = SchemaCache()
+
+    def deserialize_partial(self, data):
+        # `ModelSchema` sets the loaded data on the instance it is given (a `post_load` hook), so loading into a plain
+        # holder keeps it from building a model instance here
+        unmarshal_result = self.load(self.get_schema(partial=True), data, instance=_Attributes())
         if unmarshal_result.errors:
             raise APIError(400, extra=unmarshal_result.errors)
+        return vars(unmarshal_result.data)
 
-        return unmarshal_result.data
-
-    def serialize(self, instance_or_queryset, many=False):
-        return self.context['schema_class'](many=many).dump(instance_or_queryset).data
+    def load(self, schema, data, instance=None):
+        return schema.load(data, instance=instance)
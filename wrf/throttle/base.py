@@ -0,0 +1,157 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from wrf.base import APIError, BaseComponent
+
+
+class BaseThrottleBackend(object):
+    '''
+    Where request counts are kept. Implement it on top of a shared store (e.g. redis, with the update done atomically in
+    a script) so that limits hold across processes.
+    '''
+    def hit(self, key, limit, period):
+        '''
+        Records a request for `key`, which is allowed up to `limit` times per `period` seconds.
+        Returns `0` if the request is allowed, otherwise the seconds to wait before retrying (refused requests don't count).
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+
+class _LocalThrottleBackend(BaseThrottleBackend):
+    '''
+    Keeps a fixed-size state per key in process memory, tracking at most `max_size` keys (the least recently used are
+    forgotten first, which resets their limits). It is thread-safe, but each process enforces its limits on its own.
+    '''
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, state, limit, period, now):
+        '''
+        Returns the new state of a key (`None` if it has none yet) and the seconds to wait (`0` if the request is allowed).
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+    def hit(self, key, limit, period):
+        now = time.time()
+        with self._lock:
+            state, wait = self.update(self._entries.pop(key, None), limit, period, now)
+            if len(self._entries) >= self.max_size:
+                self._entries.popitem(last=False)
+            self._entries[key] = state
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LocalTokenBucketThrottleBackend(_LocalThrottleBackend):
+    '''
+    Each key has a bucket of `limit` tokens, refilled at `limit / period` tokens per second. Every request takes a token,
+    so bursts of up to `limit` requests are allowed, and then requests are allowed as tokens come back.
+    '''
+    def update(self, state, limit, period, now):
+        rate = limit / period
+        tokens, updated_at = state if state is not None else (limit, now)
+        tokens = min(limit, tokens + (now - updated_at) * rate)
+        if tokens >= 1:
+            return (tokens - 1, now), 0
+        return (tokens, now), (1 - tokens) / rate
+
+
+class LocalSlidingWindowThrottleBackend(_LocalThrottleBackend):
+    '''
+    Allows `limit` requests in any window of `period` seconds. To keep a fixed-size state per key, requests in the
+    previous window are assumed to be evenly spread over it (the approximation used by most API gateways).
+    '''
+    def update(self, state, limit, period, now):
+        window = int(now // period)
+        state_window, count, previous_count = state if state is not None else (window, 0, 0)
+        if state_window != window:
+            previous_count = count if state_window == window - 1 else 0
+            count = 0
+
+        elapsed = now - window * period
+        if previous_count * (1 - elapsed / period) + count + 1 <= limit:
+            return (window, count + 1, previous_count), 0
+
+        # The weight of the previous window decreases until the request fits, or until the window ends.
+        wait = period - elapsed
+        if count + 1 <= limit:
+            wait = min(wait, period * (1 - (limit - count - 1) / previous_count) - elapsed)
+        return (window, count, previous_count), wait
+
+
+class BaseThrottleComponent(BaseComponent):
+    def check_throttle(self):
+        '''
+        Raises `APIError(429)` (with a `Retry-After` header) if the request goes over the limit.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+
+class NoThrottleComponent(BaseThrottleComponent):
+    def check_throttle(self):
+        pass
+
+
+class ThrottleComponent(BaseThrottleComponent):
+    '''
+    Allows `limit` requests per `period` seconds, checked before anything else is done for the request.
+    Requests are counted together when they share the parts listed in `scope`:
+    - `'user'`: the current user (or the client IP address, for anonymous requests);
+    - `'ip'`: the client IP address (as seen by the server, so mind proxies);
+    - `'endpoint'`: the API method.
+    Counts are always per model, so `scope=('user',)` limits each user on each API (but across its methods), and
+    `scope=('endpoint',)` limits an API method as a whole.
+    '''
+    def __init__(self, context, limit=60, period=60, scope=('user',), backend=None):
+        super(ThrottleComponent, self).__init__(context)
+        self.limit = limit
+        self.period = period
+        self.scope = scope
+        self.backend = backend if backend is not None else default_backend
+
+    def get_namespace(self):
+        model_class = self.context['model_class']
+        return 'wrf:throttle:{}.{}'.format(model_class.__module__, model_class.__name__)
+
+    def get_remote_addr(self):
+        return 'ip:{}'.format(self.get_instance_from_context('framework').get_request_remote_addr())
+
+    def get_user_scope(self):
+        user = self.context['current_user']
+        if user is not None:
+            for attr_name in ('pk', 'id'):
+                value = getattr(user, attr_name, None)
+                if value is not None:
+                    return '{}:{}'.format(attr_name, value)
+        return self.get_remote_addr()
+
+    def get_key(self):
+        parts = [self.get_namespace()]
+        for name in self.scope:
+            if name == 'user':
+                parts.append(self.get_user_scope())
+            elif name == 'ip':
+                parts.append(self.get_remote_addr())
+            elif name == 'endpoint':
+                parts.append(self.context['api_method_name'])
+            else:
+                raise ValueError('Unknown throttling scope: {}'.format(name))
+        return ':'.join(parts)
+
+    def check_throttle(self):
+        wait = self.backend.hit(self.get_key(), self.limit, self.period)
+        if wait > 0:
+            raise APIError(429, headers={'Retry-After': str(int(math.ceil(wait)))})
+
+
+# Shared by the `ThrottleComponent`s not given a backend.
+default_backend = LocalTokenBucketThrottleBackend()
@@ -0,0 +1,114 @@
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from timeit import default_timer
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseTimer(object):
+    '''
+    Accumulates the time spent in each phase of a request. Phases may nest (e.g. pagination calling the schema), in which
+    case the time goes to the innermost one only, so durations add up to (at most) the total.
+    '''
+    def __init__(self):
+        self.started_at = default_timer()
+        self.total = None
+        self.durations = OrderedDict()
+        self._stack = []
+
+    def _add(self, name, duration):
+        self.durations[name] = self.durations.get(name, 0) + duration
+
+    def start(self, name):
+        now = default_timer()
+        if self._stack:
+            outer_name, outer_started_at = self._stack[-1]
+            self._add(outer_name, now - outer_started_at)
+        self._stack.append([name, now])
+
+    def stop(self):
+        now = default_timer()
+        name, started_at = self._stack.pop()
+        self._add(name, now - started_at)
+        if self._stack:
+            self._stack[-1][1] = now
+
+    @contextmanager
+    def phase(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def finish(self):
+        self.total = default_timer() - self.started_at
+
+    def get_timings(self):
+        '''
+        Returns the duration (in seconds) of each phase, plus the `total` one (once finished).
+        '''
+        timings = OrderedDict(self.durations)
+        if self.total is not None:
+            timings['total'] = self.total
+        return timings
+
+    def get_header_value(self):
+        return ', '.join('{};dur={:.2f}'.format(name, duration * 1000) for name, duration in self.get_timings().items())
+
+
+class TimedComponent(object):
+    '''
+    Proxies a component, timing its method calls as the phase `phase`. It passes `isinstance` checks as the component
+    itself would.
+    '''
+    def __init__(self, component, phase, timer):
+        self.__dict__.update(_component=component, _phase=phase, _timer=timer)
+
+    @property
+    def __class__(self):
+        return self._component.__class__
+
+    def __getattr__(self, name):
+        value = getattr(self._component, name)
+        if not callable(value):
+            return value
+
+        timer = self._timer
+        phase = self._phase
+
+        @wraps(value)
+        def timed(*args, **kwargs):
+            with timer.phase(phase):
+                return value(*args, **kwargs)
+        return timed
+
+    def __setattr__(self, name, value):
+        setattr(self._component, name, value)
+
+
+class BaseTimingSink(object):
+    '''
+    Receives the phase timings of every request of the APIs it's set on (see `BaseAPI.timing_sink`), e.g. to send them to
+    a metrics system. It's called synchronously at the end of the request, so it should be quick.
+    '''
+    def record(self, api_name, api_method_name, timings):
+        '''
+        `timings` maps phase names to durations (in seconds), see `PhaseTimer.get_timings`.
+        '''
+        raise NotImplementedError()  # pragma: no cover
+
+
+class LoggingTimingSink(BaseTimingSink):
+    def __init__(self, logger=logger, level=logging.DEBUG):
+        self.logger = logger
+        self.level = level
+
+    def record(self, api_name, api_method_name, timings):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, '%s.%s: %s', api_name, api_method_name,
+                            ', '.join('{}={:.2f}ms'.format(name, duration * 1000) for name, duration in timings.items()))